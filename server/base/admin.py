@@ -6,4 +6,8 @@ admin.site.register(Review)
 admin.site.register(Order)
 admin.site.register(OrderItem)
 admin.site.register(ShippingAddress)
-admin.site.register(ProductView)
\ No newline at end of file
+admin.site.register(ProductView)
+admin.site.register(PrecomputedRecommendation)
+admin.site.register(ProductInfoCache)
+admin.site.register(AIGenerationJob)
+admin.site.register(ChatAnswerCache)
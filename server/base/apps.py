@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class BaseConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'base'
+
+    def ready(self):
+        # 모델 변경 시그널 등록 (상품 피처 스토어 delta 갱신 등)
+        from base import signals  # noqa: F401
@@ -0,0 +1,70 @@
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from django.conf import settings
+from openai import OpenAI
+import httpx
+import statistics
+import time
+from base.services.openai_stub import OpenAIStubServer
+from base.services.ai_clients import get_openai_client, close_ai_clients
+
+class Command(BaseCommand):
+    help = 'Compare per-request OpenAI clients with the shared pooled client against a local stub server'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--calls', type=int, default=200, help='Chat completion calls per mode')
+        parser.add_argument('--latency', type=float, default=0.0, help='Stub server response delay (seconds)')
+
+    def _call(self, client):
+        client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": "bench"}],
+            max_tokens=10,
+        )
+
+    def _run(self, label, stub, make_client, calls):
+        before = dict(stub.stats)
+        timings = []
+        for _ in range(calls):
+            started = time.perf_counter()
+            make_client()
+            timings.append((time.perf_counter() - started) * 1000)
+
+        connections = stub.stats['connections'] - before['connections']
+        timings.sort()
+        result = {
+            'mean': statistics.mean(timings),
+            'p50': timings[len(timings) // 2],
+            'p95': timings[int(len(timings) * 0.95) - 1],
+        }
+        self.stdout.write(
+            f"{label:<12} mean {result['mean']:.2f}ms, p50 {result['p50']:.2f}ms, "
+            f"p95 {result['p95']:.2f}ms, TCP 연결 {connections}개"
+        )
+        return result
+
+    def handle(self, *args, **options):
+        calls = options['calls']
+        stub = OpenAIStubServer(latency=options['latency']).start()
+        self.stdout.write(self.style.WARNING(f'🚀 스텁 서버 {stub.base_url} 에 모드별 {calls}회 호출...'))
+
+        try:
+            # 1. 기존 방식: 요청마다 httpx.Client + OpenAI 생성
+            def per_request():
+                with httpx.Client() as http_client:
+                    self._call(OpenAI(api_key="stub", base_url=stub.base_url, http_client=http_client))
+
+            # 2. 공용 클라이언트 (연결 풀 재사용)
+            close_ai_clients()
+            with override_settings(OPENAI_BASE_URL=stub.base_url, OPENAI_API_KEY="stub"):
+                self._call(get_openai_client()) # 워밍업 (첫 연결)
+                old = self._run('per-request', stub, per_request, calls)
+                new = self._run('shared', stub, lambda: self._call(get_openai_client()), calls)
+            close_ai_clients()
+        finally:
+            stub.stop()
+
+        saved = old['mean'] - new['mean']
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ 호출당 {saved:.2f}ms 절약 ({old['mean'] / new['mean']:.1f}x, 최대 연결 수 {settings.AI_HTTP_MAX_CONNECTIONS})"
+        ))
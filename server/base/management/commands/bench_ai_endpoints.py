@@ -0,0 +1,111 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from rest_framework_simplejwt.tokens import RefreshToken
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+import httpx
+import io
+import time
+
+# 엔드포인트 이름 → (메서드, 경로)
+ENDPOINTS = {
+    'recommendations': ('GET', '/api/recommendations/'),
+    'product-info': ('POST', '/api/ai/generate-product-info/'),
+    'product-info-langgraph': ('POST', '/api/ai/generate-product-info-langgraph/'),
+    'chatbot': ('POST', '/api/ai/chatbot/'),
+}
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def _png_bytes(size=512):
+    """벤치마크용 테스트 이미지"""
+    buffer = io.BytesIO()
+    Image.new('RGB', (size, size), (200, 120, 80)).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive the AI endpoints of a running server at fixed concurrency levels and report '
+        'throughput and p50/p95/p99 (run the server with OPENAI_BASE_URL pointing at run_openai_stub)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--server', default='http://127.0.0.1:8000', help='Base URL of the running Django server')
+        parser.add_argument('--endpoints', default=','.join(ENDPOINTS), help=f'Comma separated: {", ".join(ENDPOINTS)}')
+        parser.add_argument('--concurrency', default='1,4,16', help='Comma separated concurrency levels')
+        parser.add_argument('--requests', type=int, default=50, help='Requests per endpoint per concurrency level')
+        parser.add_argument('--timeout', type=float, default=60.0, help='Per-request timeout (seconds)')
+
+    def handle(self, *args, **options):
+        endpoints = [name.strip() for name in options['endpoints'].split(',') if name.strip()]
+        unknown = [name for name in endpoints if name not in ENDPOINTS]
+        if unknown:
+            raise CommandError(f'알 수 없는 엔드포인트: {", ".join(unknown)}')
+        levels = [int(level) for level in options['concurrency'].split(',')]
+
+        # 1단계: 벤치마크 사용자 토큰 + 테스트 이미지 준비
+        user, _ = User.objects.get_or_create(username='bench_ai_user', defaults={'email': 'bench_ai_user@example.com'})
+        token = str(RefreshToken.for_user(user).access_token)
+        image = _png_bytes()
+        image_name = default_storage.save('bench/bench_ai.png', ContentFile(image))
+        image_url = f'/media/{image_name}'
+
+        def build_request(name):
+            method, path = ENDPOINTS[name]
+            if name == 'product-info':
+                return method, path, {'data': {'name': '벤치마크 텀블러'}, 'files': {'image': ('bench.png', image, 'image/png')}}
+            if name == 'product-info-langgraph':
+                return method, path, {'json': {'name': '벤치마크 텀블러', 'image_url': image_url}}
+            if name == 'chatbot':
+                return method, path, {'json': {'question': '배송은 얼마나 걸리나요?'}}
+            return method, path, {}
+
+        self.stdout.write(self.style.WARNING(
+            f"🚀 {options['server']} 대상, 엔드포인트 {len(endpoints)}개 x 동시성 {levels} x {options['requests']}회"
+        ))
+        self.stdout.write(f"{'endpoint':<24}{'conc':>5}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'errors':>8}")
+
+        limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))
+        try:
+            with httpx.Client(base_url=options['server'], headers={'Authorization': f'Bearer {token}'},
+                              limits=limits, timeout=options['timeout']) as client:
+                for name in endpoints:
+                    method, path, kwargs = build_request(name)
+
+                    def call(_):
+                        started = time.perf_counter()
+                        try:
+                            response = client.request(method, path, **kwargs)
+                            ok = response.status_code < 400
+                        except httpx.HTTPError:
+                            ok = False
+                        return (time.perf_counter() - started) * 1000, ok
+
+                    for level in levels:
+                        # 2단계: 동시성 단계별로 요청 실행
+                        started = time.perf_counter()
+                        with ThreadPoolExecutor(max_workers=level) as executor:
+                            results = list(executor.map(call, range(options['requests'])))
+                        elapsed = time.perf_counter() - started
+
+                        # 3단계: 처리량 / 지연 분포 보고
+                        latencies = sorted(ms for ms, _ in results)
+                        errors = sum(1 for _, ok in results if not ok)
+                        self.stdout.write(
+                            f"{name:<24}{level:>5}{len(results) / elapsed:>9.1f}"
+                            f"{_percentile(latencies, 50):>8.0f}ms{_percentile(latencies, 95):>7.0f}ms"
+                            f"{_percentile(latencies, 99):>7.0f}ms{errors:>8}"
+                        )
+        finally:
+            default_storage.delete(image_name)
+
+        self.stdout.write(self.style.SUCCESS('✅ 벤치마크 완료'))
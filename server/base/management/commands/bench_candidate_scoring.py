@@ -0,0 +1,77 @@
+from django.core.management.base import BaseCommand
+from base.services.product_scoring import encode_column, score_products, top_k_indices
+from types import SimpleNamespace
+import numpy as np
+import random
+import time
+
+CATEGORIES = ["패션", "신발", "가방", "액세서리", "뷰티", "명품", "전자제품", "생활용품", "식품", "가구", None]
+BRANDS = [f"brand-{i}" for i in range(300)] + [None]
+
+class Command(BaseCommand):
+    help = 'Benchmark vectorized candidate scoring against the per-product Python loop at 10k/100k/1M products'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+        parser.add_argument('--limit', type=int, default=20, help='Top-k size')
+
+    def handle(self, *args, **options):
+        category_prefs = {"신발": 60.0, "액세서리": 25.0, "전자제품": 15.0}
+        brand_prefs = {"brand-1": 12, "brand-7": 5, "brand-42": 30}
+        limit = options['limit']
+
+        for size in options['sizes']:
+            rng = random.Random(size)
+            products = [
+                SimpleNamespace(
+                    _id=i,
+                    category=rng.choice(CATEGORIES),
+                    brand=rng.choice(BRANDS),
+                    numReviews=rng.choice([0, 0, rng.randint(1, 200)]),
+                    rating=round(rng.uniform(0, 5), 2),
+                )
+                for i in range(size)
+            ]
+
+            # 1. 기존 방식: 상품별 Python 루프 + 전체 정렬
+            started = time.perf_counter()
+            loop_ids = self._python_loop(products, category_prefs, brand_prefs, limit)
+            loop_ms = (time.perf_counter() - started) * 1000
+
+            # 2. 벡터화 방식: 컬럼 배열 변환 + 점수 계산 + argpartition
+            started = time.perf_counter()
+            category_codes, category_vocab = encode_column([p.category for p in products])
+            brand_codes, brand_vocab = encode_column([p.brand for p in products])
+            num_reviews = np.fromiter((p.numReviews for p in products), dtype=np.float64, count=size)
+            ratings = np.fromiter((p.rating for p in products), dtype=np.float64, count=size)
+            encode_ms = (time.perf_counter() - started) * 1000
+
+            started = time.perf_counter()
+            scores = score_products(
+                category_codes, category_vocab, brand_codes, brand_vocab,
+                num_reviews, ratings, category_prefs, brand_prefs,
+            )
+            vector_ids = [products[i]._id for i in top_k_indices(scores, limit)]
+            score_ms = (time.perf_counter() - started) * 1000
+
+            same = "✅" if vector_ids == loop_ids else "❌"
+            self.stdout.write(
+                f"{size:>9,} products | loop {loop_ms:9.1f}ms | "
+                f"numpy {encode_ms + score_ms:8.1f}ms (encode {encode_ms:.1f} + score/top-k {score_ms:.1f}) | "
+                f"x{loop_ms / (encode_ms + score_ms):.1f} | same top-{limit} {same}"
+            )
+
+    def _python_loop(self, products, category_prefs, brand_prefs, limit):
+        """기존 CandidateFilterService 점수 루프"""
+        scored = []
+        for product in products:
+            score = 10.0
+            if product.category in category_prefs:
+                score += float(category_prefs[product.category]) * 0.5
+            if product.brand in brand_prefs:
+                score += min(float(brand_prefs[product.brand]) * 3.0, 50.0)
+            if product.numReviews > 0:
+                score += min(float(product.numReviews) * 0.5, 15.0) + float(product.rating) * 3.0
+            scored.append((product, score))
+        scored.sort(key=lambda x: x[1], reverse=True)
+        return [product._id for product, _ in scored[:limit]]
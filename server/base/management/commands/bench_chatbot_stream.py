@@ -0,0 +1,134 @@
+from django.core.management.base import BaseCommand
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+from collections import defaultdict
+import json
+import time
+import uuid
+
+QUESTIONS = [
+    '배송은 얼마나 걸리나요?',
+    '환불은 언제까지 가능한가요?',
+    '현금영수증 발급되나요?',
+    '무료 배송 기준이 얼마인가요?',
+]
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare time-to-first-token of the streaming chatbot endpoint (chatbot/stream/) with the '
+        'full-response time of the JSON endpoint (chatbot/) on a running server, per serving path (faq / answer_cache / llm). '
+        'Without --allow-cache the questions ask the server to skip the FAQ and answer caches '
+        '(needs CHATBOT_ALLOW_CACHE_BYPASS=True on the server)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--server', default='http://127.0.0.1:8000', help='Base URL of the running Django server')
+        parser.add_argument('--concurrency', default='1,4', help='Comma separated concurrency levels')
+        parser.add_argument('--requests', type=int, default=20, help='Requests per endpoint per concurrency level')
+        parser.add_argument('--timeout', type=float, default=60.0, help='Per-request timeout (seconds)')
+        parser.add_argument('--allow-cache', action='store_true',
+                            help='Send the same questions every time and let the server use the FAQ / answer caches')
+
+    def handle(self, *args, **options):
+        levels = [int(level) for level in options['concurrency'].split(',')]
+
+        def payload(i):
+            # 캐시를 쓰지 않을 때는 "cache": false + 매번 다른 질문 (서버에서 FAQ/답변 캐시를 건너뜀)
+            text = QUESTIONS[i % len(QUESTIONS)]
+            if options['allow_cache']:
+                return {'question': text}
+            return {'question': f"{text} ({uuid.uuid4().hex[:6]})", 'cache': False}
+
+        def call_json(client, i):
+            started = time.perf_counter()
+            served_by = None
+            try:
+                response = client.post('/api/ai/chatbot/', json=payload(i))
+                ok = response.status_code < 400
+                if ok:
+                    served_by = response.json().get('served_by')
+            except httpx.HTTPError:
+                ok = False
+            total = (time.perf_counter() - started) * 1000
+            return {'sources': total, 'first_token': total, 'total': total, 'ok': ok, 'served_by': served_by}
+
+        def call_stream(client, i):
+            started = time.perf_counter()
+            result = {'sources': None, 'first_token': None, 'total': None, 'ok': False, 'served_by': None}
+            try:
+                with client.stream('POST', '/api/ai/chatbot/stream/', json=payload(i),
+                                   headers={'Accept': 'text/event-stream'}) as response:
+                    event = None
+                    for line in response.iter_lines():
+                        elapsed = (time.perf_counter() - started) * 1000
+                        if line.startswith('event: '):
+                            event = line[len('event: '):]
+                        elif line.startswith('data: '):
+                            if event == 'sources' and result['sources'] is None:
+                                result['sources'] = elapsed
+                            elif event == 'token' and result['first_token'] is None:
+                                result['first_token'] = elapsed
+                            elif event == 'done':
+                                result['ok'] = True
+                                result['served_by'] = json.loads(line[len('data: '):]).get('served_by')
+                            elif event == 'error':
+                                self.stderr.write(json.loads(line[len('data: '):])['error'])
+            except httpx.HTTPError:
+                pass
+            result['total'] = (time.perf_counter() - started) * 1000
+            return result
+
+        self.stdout.write(self.style.WARNING(
+            f"🚀 {options['server']} 대상, 동시성 {levels} x {options['requests']}회 "
+            f"({'같은 질문 반복, 캐시 사용' if options['allow_cache'] else '매번 다른 질문, 캐시 건너뜀'})"
+        ))
+        self.stdout.write(
+            f"{'endpoint':<10}{'conc':>5}{'served_by':>14}{'n':>5}{'sources p50':>13}{'TTFT p50':>11}{'TTFT p95':>11}"
+            f"{'total p50':>12}{'total p95':>12}{'errors':>8}"
+        )
+        cached_results = 0
+
+        limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))
+        with httpx.Client(base_url=options['server'], limits=limits, timeout=options['timeout']) as client:
+            for name, call in (('json', call_json), ('stream', call_stream)):
+                for level in levels:
+                    # 1단계: 동시성 단계별로 요청 실행
+                    with ThreadPoolExecutor(max_workers=level) as executor:
+                        results = list(executor.map(lambda i: call(client, i), range(options['requests'])))
+
+                    # 2단계: 응답 경로(served_by)별 출처 도착 / 첫 토큰(TTFT) / 전체 응답 시간 보고
+                    # (json 은 셋 다 전체 응답 시간, 캐시 응답과 GPT 응답 시간이 섞이지 않도록 경로별로 나눔)
+                    by_path = defaultdict(list)
+                    for result in results:
+                        if result['ok']:
+                            by_path[result['served_by'] or 'unknown'].append(result)
+                    errors = len(results) - sum(len(ok) for ok in by_path.values())
+                    for served_by, ok in sorted(by_path.items()):
+                        if served_by != 'llm':
+                            cached_results += len(ok)
+                        sources = sorted(result['sources'] for result in ok if result['sources'] is not None)
+                        first_token = sorted(result['first_token'] for result in ok if result['first_token'] is not None)
+                        total = sorted(result['total'] for result in ok)
+                        self.stdout.write(
+                            f"{name:<10}{level:>5}{served_by:>14}{len(ok):>5}{_percentile(sources, 50):>11.0f}ms"
+                            f"{_percentile(first_token, 50):>9.0f}ms{_percentile(first_token, 95):>9.0f}ms"
+                            f"{_percentile(total, 50):>10.0f}ms{_percentile(total, 95):>10.0f}ms"
+                            f"{errors:>8}"
+                        )
+                    if not by_path:
+                        self.stdout.write(f"{name:<10}{level:>5}{'-':>14}{0:>5}{'':>52}{errors:>8}")
+
+        if cached_results and not options['allow_cache']:
+            self.stdout.write(self.style.WARNING(
+                f"⚠️ GPT가 아닌 경로(faq/answer_cache)로 응답한 요청 {cached_results}개 - "
+                f"서버에 CHATBOT_ALLOW_CACHE_BYPASS=True 를 설정해야 llm 행이 전체 요청을 측정합니다."
+            ))
+        self.stdout.write(self.style.SUCCESS('✅ 벤치마크 완료'))
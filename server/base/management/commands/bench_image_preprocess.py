@@ -0,0 +1,109 @@
+from django.core.management.base import BaseCommand
+from django.conf import settings
+from PIL import Image
+from pathlib import Path
+import base64
+import io
+import math
+import random
+import time
+import httpx
+from base.services.openai_stub import OpenAIStubServer
+from base.services.image_preprocess_service import preprocess_image, _encode, _options
+
+
+def _vision_tokens(width, height):
+    """OpenAI 비전 토큰 추정 (detail=high: 2048 이내로 축소 → 짧은 변 768 → 512px 타일당 170 + 85)"""
+    scale = min(1.0, 2048 / max(width, height))
+    width, height = width * scale, height * scale
+    scale = min(1.0, 768 / min(width, height))
+    width, height = width * scale, height * scale
+    return 85 + 170 * math.ceil(width / 512) * math.ceil(height / 512)
+
+
+def _synthetic_photo(width=4032, height=3024):
+    """휴대폰 사진 크기의 테스트 이미지 (노이즈 포함 JPEG + EXIF)"""
+    small = Image.new('RGB', (width // 16, height // 16))
+    small.putdata([(random.randint(0, 255), random.randint(0, 255), random.randint(0, 255)) for _ in range(small.width * small.height)])
+    image = small.resize((width, height), Image.BICUBIC)
+    exif = Image.Exif()
+    exif[0x0112] = 6 # Orientation: 90도 회전
+    exif[0x010F] = 'BenchPhone' # Make
+    output = io.BytesIO()
+    image.save(output, format='JPEG', quality=92, exif=exif)
+    return output.getvalue()
+
+
+class Command(BaseCommand):
+    help = 'Measure bytes, estimated vision tokens and upload latency saved by the vision image preprocessing stage'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--images', help='Directory of sample images (default: synthetic 12MP photos)')
+        parser.add_argument('--count', type=int, default=5, help='Synthetic images to generate when --images is not set')
+        parser.add_argument('--bandwidth-mbps', type=float, default=20.0, help='Uplink used to estimate upload time')
+
+    def handle(self, *args, **options):
+        if options['images']:
+            samples = [p.read_bytes() for p in sorted(Path(options['images']).iterdir()) if p.is_file()]
+        else:
+            samples = [_synthetic_photo() for _ in range(options['count'])]
+
+        image_format, max_side, quality = _options()
+        self.stdout.write(self.style.WARNING(
+            f'🚀 이미지 {len(samples)}개 전처리 ({image_format}, 긴 변 {max_side}px, 품질 {quality})'
+        ))
+
+        stub = OpenAIStubServer().start()
+        totals = {'bytes_in': 0, 'bytes_out': 0, 'tokens_in': 0, 'tokens_out': 0,
+                  'encode': 0.0, 'post_raw': 0.0, 'post_processed': 0.0}
+        try:
+            with httpx.Client(base_url=stub.base_url) as client:
+                def post(image_bytes, mime):
+                    payload = {
+                        'model': 'gpt-4o-mini',
+                        'messages': [{'role': 'user', 'content': [
+                            {'type': 'text', 'text': 'bench'},
+                            {'type': 'image_url', 'image_url': {'url': f'data:{mime};base64,{base64.b64encode(image_bytes).decode()}'}},
+                        ]}],
+                    }
+                    started = time.perf_counter()
+                    client.post('/chat/completions', json=payload).raise_for_status()
+                    return time.perf_counter() - started
+
+                for raw in samples:
+                    started = time.perf_counter()
+                    processed = _encode(raw, image_format, max_side, quality) # 캐시 없이 순수 처리 시간
+                    totals['encode'] += time.perf_counter() - started
+                    preprocess_image(raw) # 캐시에 저장
+
+                    with Image.open(io.BytesIO(raw)) as image:
+                        raw_size = image.size
+                    with Image.open(io.BytesIO(processed)) as image:
+                        processed_size = image.size
+
+                    totals['bytes_in'] += len(raw)
+                    totals['bytes_out'] += len(processed)
+                    totals['tokens_in'] += _vision_tokens(*raw_size)
+                    totals['tokens_out'] += _vision_tokens(*processed_size)
+                    totals['post_raw'] += post(raw, 'image/jpeg')
+                    totals['post_processed'] += post(processed, f'image/{image_format}')
+        finally:
+            stub.stop()
+
+        n = len(samples)
+        # base64 로 약 4/3 배가 되어 전송됨
+        upload = lambda size: size * 4 / 3 * 8 / (options['bandwidth_mbps'] * 1_000_000)
+        saved_bytes = (totals['bytes_in'] - totals['bytes_out']) / n
+        self.stdout.write(f"평균 크기: {totals['bytes_in'] / n / 1024:.0f}KB → {totals['bytes_out'] / n / 1024:.0f}KB")
+        self.stdout.write(f"예상 비전 토큰: {totals['tokens_in'] / n:.0f} → {totals['tokens_out'] / n:.0f}")
+        self.stdout.write(f"전처리 시간: 평균 {totals['encode'] / n * 1000:.0f}ms (이후 같은 이미지는 캐시 사용)")
+        self.stdout.write(
+            f"로컬 스텁 왕복: {totals['post_raw'] / n * 1000:.0f}ms → {totals['post_processed'] / n * 1000:.0f}ms"
+        )
+        self.stdout.write(
+            f"{options['bandwidth_mbps']:.0f}Mbps 업로드 예상: {upload(totals['bytes_in'] / n) * 1000:.0f}ms → "
+            f"{upload(totals['bytes_out'] / n) * 1000:.0f}ms"
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ 호출당 {saved_bytes / 1024:.0f}KB 절약, 예상 업로드 {(upload(totals['bytes_in'] / n) - upload(totals['bytes_out'] / n)) * 1000:.0f}ms 절약"
+        ))
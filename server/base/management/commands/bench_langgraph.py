@@ -0,0 +1,75 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from PIL import Image
+import re
+import statistics
+import tempfile
+from base.services.openai_stub import OpenAIStubServer
+from base.services.ai_clients import close_ai_clients
+from base.services.langgraph_service import is_langgraph_available, get_langgraph_generator, LangGraphProductGenerator
+import time
+
+STEP_TIME = re.compile(r"^(.+) 완료 \((\d+\.\d+)s\)$")
+
+
+class Command(BaseCommand):
+    help = 'Run the LangGraph product pipeline against a local stub server and report end-to-end vs serial node latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5)
+        parser.add_argument('--latency', type=float, default=0.5, help='Stub response delay per LLM call (seconds)')
+
+    def handle(self, *args, **options):
+        if not is_langgraph_available():
+            raise CommandError('LangGraph가 설치되지 않았습니다.')
+
+        stub = OpenAIStubServer(latency=options['latency']).start()
+        close_ai_clients() # 스텁 주소로 클라이언트를 다시 만들도록
+
+        with tempfile.NamedTemporaryFile(suffix='.png') as image_file, \
+                override_settings(OPENAI_BASE_URL=stub.base_url, OPENAI_API_KEY='stub'):
+            Image.new('RGB', (256, 256), (90, 140, 200)).save(image_file, format='PNG')
+            image_file.flush()
+
+            totals, serials = [], []
+            node_times = {}
+            try:
+                for _ in range(options['runs']):
+                    result = get_langgraph_generator('stub').generate_product_info('벤치마크 텀블러', image_file.name)
+                    if result.get('errors'):
+                        raise CommandError(f"워크플로우 오류: {result['errors']}")
+
+                    # processing_steps 의 "... 완료 (1.23s)" 를 노드별 시간으로 수집
+                    serial = 0.0
+                    for step in result['processing_steps']:
+                        match = STEP_TIME.match(step)
+                        if match:
+                            node_times.setdefault(match.group(1), []).append(float(match.group(2)))
+                            serial += float(match.group(2))
+                        elif step.startswith('전체 소요 시간'):
+                            totals.append(float(step.split('(')[1].rstrip('s)')))
+                    serials.append(serial)
+            finally:
+                close_ai_clients()
+                stub.stop()
+
+            # 요청마다 새로 생성(ChatOpenAI + StateGraph 컴파일)할 때와 캐시 재사용 시 준비 시간 비교
+            started = time.perf_counter()
+            for _ in range(options['runs']):
+                close_ai_clients() # 기존처럼 ChatOpenAI/HTTP 클라이언트까지 매번 새로 생성
+                LangGraphProductGenerator('stub')
+            uncached = (time.perf_counter() - started) / options['runs']
+            started = time.perf_counter()
+            for _ in range(options['runs']):
+                get_langgraph_generator('stub')
+            cached = (time.perf_counter() - started) / options['runs']
+            close_ai_clients()
+
+        for name, times in node_times.items():
+            self.stdout.write(f'  - {name}: 평균 {statistics.mean(times):.2f}s')
+
+        total, serial = statistics.mean(totals), statistics.mean(serials)
+        self.stdout.write(f'직렬 실행 시 예상(노드 시간 합): {serial:.2f}s')
+        self.stdout.write(f'실제 end-to-end: {total:.2f}s')
+        self.stdout.write(f'요청당 준비 시간: 새로 생성 {uncached * 1000:.1f}ms → 캐시 재사용 {cached * 1000:.3f}ms')
+        self.stdout.write(self.style.SUCCESS(f'✅ 지연 {(1 - total / serial) * 100:.0f}% 감소 (LLM 호출 {stub.stats["requests"]}회)'))
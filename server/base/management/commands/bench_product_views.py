@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+from django.contrib.auth.models import User
+from base.models import Product, ProductView
+from base.services.view_buffer_service import ProductViewBuffer
+import random
+import time
+
+class Command(BaseCommand):
+    help = 'Compare views/sec of the per-request ProductView write path against the buffered write-behind path'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--views', type=int, default=5000, help='Number of view events per path')
+        parser.add_argument('--users', type=int, default=20, help='Number of distinct users')
+        parser.add_argument('--products', type=int, default=50, help='Number of distinct products')
+        parser.add_argument('--flush-size', type=int, default=500, help='Buffer size threshold')
+
+    def handle(self, *args, **options):
+        users = [User.objects.get_or_create(username=f'bench_view_user_{i}')[0] for i in range(options['users'])]
+        products = [Product.objects.create(name=f'bench-view-{i}', price=1000, countInStock=1) for i in range(options['products'])]
+        events = [(random.choice(users), random.choice(products)) for _ in range(options['views'])]
+
+        try:
+            # 1. 기존 방식: 요청마다 get + get_or_create + save
+            started = time.perf_counter()
+            for user, product in events:
+                product = Product.objects.get(_id=product._id)
+                pv, created = ProductView.objects.get_or_create(user=user, product=product, defaults={'view_count': 1})
+                if not created:
+                    pv.view_count += 1
+                    pv.save(update_fields=['view_count'])
+            legacy = time.perf_counter() - started
+            legacy_total = sum(ProductView.objects.filter(product__in=products).values_list('view_count', flat=True))
+
+            ProductView.objects.filter(product__in=products).delete()
+
+            # 2. 버퍼 방식: 메모리 기록 + 배치 upsert (마지막 flush 시간 포함)
+            view_buffer = ProductViewBuffer(flush_interval=0, max_pending=options['flush_size'])
+            started = time.perf_counter()
+            for user, product in events:
+                if view_buffer.product_exists(product._id):
+                    view_buffer.record(user.id, product._id)
+            view_buffer.flush()
+            buffered = time.perf_counter() - started
+            buffered_total = sum(ProductView.objects.filter(product__in=products).values_list('view_count', flat=True))
+
+            n = len(events)
+            self.stdout.write(f'legacy:   {n / legacy:10.1f} views/sec ({legacy:.3f}s, stored={legacy_total})')
+            self.stdout.write(f'buffered: {n / buffered:10.1f} views/sec ({buffered:.3f}s, stored={buffered_total}, flushes={view_buffer.stats["flushes"]})')
+
+            if legacy_total == buffered_total == n:
+                self.stdout.write(self.style.SUCCESS(f'✅ 유실 없음 (speedup x{legacy / buffered:.1f})'))
+            else:
+                self.stdout.write(self.style.ERROR('❌ 저장된 조회수가 이벤트 수와 다릅니다'))
+        finally:
+            Product.objects.filter(_id__in=[p._id for p in products]).delete()
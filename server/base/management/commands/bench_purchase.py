@@ -0,0 +1,84 @@
+from django.core.management.base import BaseCommand
+from django.contrib.auth.models import User
+from django.db import connection, OperationalError
+from base.models import Product, Order, OrderItem
+from base.services.inventory_service import InventoryService
+from rest_framework.exceptions import ValidationError
+from concurrent.futures import ThreadPoolExecutor
+import random
+import threading
+import time
+
+class Command(BaseCommand):
+    help = 'Concurrent purchase benchmark on hot SKUs (checks for oversell and reports purchases/sec)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=3, help='Number of hot SKUs')
+        parser.add_argument('--stock', type=int, default=100, help='Initial stock per SKU')
+        parser.add_argument('--threads', type=int, default=16, help='Concurrent buyers')
+        parser.add_argument('--attempts', type=int, default=50, help='Purchase attempts per buyer')
+        parser.add_argument('--keep', action='store_true', help='Keep benchmark rows after the run')
+
+    def handle(self, *args, **options):
+        user, _ = User.objects.get_or_create(username='bench_purchase_user')
+        products = [
+            Product.objects.create(
+                user=user,
+                name=f'bench-hot-sku-{i}',
+                price=1000,
+                countInStock=options['stock'],
+            )
+            for i in range(options['products'])
+        ]
+
+        counters = {'ok': 0, 'sold_out': 0, 'db_error': 0}
+        lock = threading.Lock()
+
+        def buyer(_):
+            try:
+                for _ in range(options['attempts']):
+                    product = random.choice(products)
+                    try:
+                        InventoryService.purchase(user, product)
+                        key = 'ok'
+                    except ValidationError:
+                        key = 'sold_out'
+                    except OperationalError:
+                        key = 'db_error' # SQLite 잠금 등
+                    with lock:
+                        counters[key] += 1
+            finally:
+                connection.close() # 스레드별 DB 연결 정리
+
+        self.stdout.write(self.style.WARNING(
+            f"🚀 {options['threads']} buyers x {options['attempts']} attempts on {len(products)} SKUs "
+            f"(stock {options['stock']} each, DB: {connection.vendor})"
+        ))
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['threads']) as executor:
+            list(executor.map(buyer, range(options['threads'])))
+        elapsed = time.perf_counter() - started
+
+        # 초과 판매 검증: 판매 수량 + 남은 재고 == 초기 재고, 남은 재고 >= 0
+        oversold = 0
+        for product in products:
+            product.refresh_from_db()
+            sold = OrderItem.objects.filter(product=product).count()
+            if product.countInStock < 0 or sold + product.countInStock != options['stock']:
+                oversold += 1
+            self.stdout.write(f'  - {product.name}: sold={sold}, left={product.countInStock}')
+
+        total = sum(counters.values())
+        self.stdout.write(f"attempts={total} ok={counters['ok']} sold_out={counters['sold_out']} db_error={counters['db_error']}")
+        self.stdout.write(f"elapsed={elapsed:.3f}s purchases/sec={counters['ok'] / elapsed:.1f} attempts/sec={total / elapsed:.1f}")
+
+        if oversold:
+            self.stdout.write(self.style.ERROR(f'❌ 초과 판매 발생: {oversold}개 SKU'))
+        else:
+            self.stdout.write(self.style.SUCCESS('✅ 초과 판매 없음'))
+
+        if not options['keep']:
+            OrderItem.objects.filter(product__in=products).delete()
+            Order.objects.filter(user=user).delete()
+            Product.objects.filter(_id__in=[p._id for p in products]).delete()
@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from base.models import Product, ProductView, Order, OrderItem
+from base.services.user_profile_service import UserProfileService
+import random
+import time
+
+CATEGORIES = ["패션", "신발", "가방", "액세서리", "뷰티", "전자제품", "생활용품"]
+BRANDS = ["Nike", "Adidas", "Apple", "Samsung", "Crocs", "CASIO", "Sony"]
+
+class Command(BaseCommand):
+    help = 'Benchmark UserProfileService.generate_profile on a user with thousands of views'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--views', type=int, default=5000, help='Distinct products viewed by the user')
+        parser.add_argument('--orders', type=int, default=200, help='Orders placed by the user')
+        parser.add_argument('--repeat', type=int, default=5, help='Number of timed runs')
+
+    def handle(self, *args, **options):
+        user, _ = User.objects.get_or_create(username='bench_profile_user')
+        Product.objects.bulk_create([
+            Product(
+                name=f'bench-profile-{i}',
+                category=random.choice(CATEGORIES),
+                brand=random.choice(BRANDS),
+                price=random.randint(1, 500) * 1000,
+                countInStock=10,
+            )
+            for i in range(options['views'])
+        ])
+        products = list(Product.objects.filter(name__startswith='bench-profile-'))
+
+        try:
+            ProductView.objects.bulk_create([
+                ProductView(user=user, product=product, view_count=random.randint(1, 20))
+                for product in products
+            ])
+            Order.objects.bulk_create([Order(user=user, totalPrice=1000, isPaid=True) for _ in range(options['orders'])])
+            OrderItem.objects.bulk_create([
+                OrderItem(order=order, product=random.choice(products), name='bench', qty=1, price=random.randint(1, 500) * 1000)
+                for order in Order.objects.filter(user=user)
+            ])
+
+            service = UserProfileService(user)
+            timings = []
+            for _ in range(options['repeat']):
+                with CaptureQueriesContext(connection) as ctx:
+                    started = time.perf_counter()
+                    profile = service.generate_profile()
+                    timings.append((time.perf_counter() - started) * 1000)
+
+            timings.sort()
+            self.stdout.write(
+                f"views={profile['total_views']} orders={profile['total_purchases']} "
+                f"queries={len(ctx.captured_queries)} "
+                f"best={timings[0]:.1f}ms median={timings[len(timings) // 2]:.1f}ms"
+            )
+            self.stdout.write(f"price_range={profile['price_range']}")
+        finally:
+            OrderItem.objects.filter(order__user=user).delete()
+            Order.objects.filter(user=user).delete()
+            Product.objects.filter(name__startswith='bench-profile-').delete()
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from base.services.item_similarity_service import build_item_similarity, get_similarity_index, SIMILAR, SIMILARITY_DIR
+import time
+
+class Command(BaseCommand):
+    help = 'Build item-item co-occurrence (cosine) similarity matrices from ProductView and OrderItem history'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-n', type=int, default=50, help='Neighbors kept per product')
+        parser.add_argument('--max-items-per-user', type=int, default=200, help='Cap on items per user (bounds pair explosion)')
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.WARNING('🚀 상품 유사도 행렬 생성 시작...'))
+
+        started = time.perf_counter()
+        summary = build_item_similarity(
+            max_items_per_user=options['max_items_per_user'],
+            top_n=options['top_n'],
+        )
+        elapsed = time.perf_counter() - started
+
+        for kind, info in summary.items():
+            self.stdout.write(f"  - {kind}: 상품 {info['items']}개, 이웃 {info['edges']}개")
+        self.stdout.write(self.style.SUCCESS(f'✅ 생성 완료 ({elapsed:.2f}s, {SIMILARITY_DIR})'))
+
+        # 조회 속도 확인
+        index = get_similarity_index(SIMILAR)
+        if index.is_loaded():
+            matrix = index._ensure_loaded()
+            sample = matrix['item_ids'][:1000].tolist()
+            if sample:
+                started = time.perf_counter()
+                for product_id in sample:
+                    index.neighbors(product_id, k=10)
+                per_call = (time.perf_counter() - started) * 1_000_000 / len(sample)
+                self.stdout.write(f'top-10 조회 평균 {per_call:.1f}µs')
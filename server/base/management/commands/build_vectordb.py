@@ -1,5 +1,7 @@
 from django.core.management.base import BaseCommand
+from django.conf import settings
 from base.services.chatbot_service import build_vector_db, test_retrieval, check_docs_folder
+from base.services.embedding_cache_service import get_embedding_cache_stats
 import logging
 
 logger = logging.getLogger(__name__)
@@ -11,7 +13,7 @@ class Command(BaseCommand):
         parser.add_argument(
             '--force',
             action='store_true',
-            help='Force rebuild even if database exists',
+            help='Re-embed every chunk instead of only new or changed ones',
         )
         parser.add_argument(
             '--test',
@@ -32,12 +34,21 @@ class Command(BaseCommand):
         for f in md_files:
             self.stdout.write(f'  - {f.name}')
         
-        # 2. 벡터DB 빌드
+        # 2. 벡터DB 빌드 (바뀐 조각만 임베딩)
         try:
-            vectordb = build_vector_db(force_rebuild=options['force'])
+            vectordb, summary = build_vector_db(force_rebuild=options['force'])
             count = vectordb._collection.count()
             self.stdout.write(
-                self.style.SUCCESS(f'✅ 벡터DB 빌드 완료! (문서 수: {count})')
+                f"  - 추가 {summary['added']}개, 삭제 {summary['deleted']}개, 변경 없음 {summary['unchanged']}개 ({summary['seconds']}s)"
+            )
+            if summary['invalidated_answers']:
+                self.stdout.write(f"  - 바뀐 문서를 근거로 한 답변 캐시 {summary['invalidated_answers']}개 삭제")
+            cache = get_embedding_cache_stats()
+            self.stdout.write(
+                f"  - 임베딩 캐시: 적중 {cache['document_hits']}개, 새로 임베딩 {cache['document_misses']}개"
+            )
+            self.stdout.write(
+                self.style.SUCCESS(f'✅ 벡터DB 빌드 완료! (문서 수: {count}, {settings.CHROMA_PERSIST_DIR})')
             )
             
             # 3. 테스트 실행 (옵션)
@@ -0,0 +1,275 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth.models import User
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import OperationalError, connection, transaction
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+import csv
+import hashlib
+import json
+import time
+from base.models import Product
+from base.services.product_info_service import BASIC, PIPELINES, generate_cached_product_info
+from base.services.ai_job_service import RETRYABLE_ERRORS
+from base.services.product_feature_store import mark_products_changed
+
+CHECKPOINT_DIR = Path(settings.BASE_DIR) / "var" / "enrich_catalog"
+# SQLite 는 쓰기가 한 번에 하나뿐이라 동시 생성 수를 늘려도 DB 잠금 대기만 길어짐
+DEFAULT_CONCURRENCY = {'sqlite': 4}
+# DB 반영이 잠금 오류로 실패하면 이 횟수까지 다시 시도 (트랜잭션 단위라 중복 반영 없음)
+WRITE_ATTEMPTS = 5
+
+
+def _read_rows(path):
+    """CSV(헤더: name,image[,product_id]) 또는 JSONL 읽기"""
+    with open(path, encoding="utf-8-sig") as f:
+        if path.suffix.lower() == ".csv":
+            rows = list(csv.DictReader(f))
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+
+    for line_no, row in enumerate(rows, start=1):
+        if not (row.get("name") or "").strip() or not (row.get("image") or "").strip():
+            raise CommandError(f"{path}:{line_no} name, image 값이 필요합니다.")
+        row["name"] = row["name"].strip()
+        row["image"] = row["image"].strip()
+        row["product_id"] = int(row["product_id"]) if str(row.get("product_id") or "").strip() else None
+        row["key"] = hashlib.sha256(f"{row['product_id']}|{row['name']}|{row['image']}".encode("utf-8")).hexdigest()[:16]
+    return rows
+
+
+def _resolve_image(image, base_dir):
+    """/media/... → MEDIA_ROOT, 상대 경로 → MEDIA_ROOT 또는 입력 파일 폴더 기준"""
+    media_root = Path(settings.MEDIA_ROOT)
+    if image.startswith(settings.MEDIA_URL):
+        return media_root / image[len(settings.MEDIA_URL):]
+    path = Path(image)
+    if path.is_absolute():
+        return path
+    return media_root / path if (media_root / path).exists() else base_dir / path
+
+
+def _load_checkpoint(path):
+    """체크포인트 파일의 행별 마지막 상태 {key: 'done' | 'failed'}"""
+    states = {}
+    if path.exists():
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    states[entry["key"]] = entry["status"]
+    return states
+
+
+class Command(BaseCommand):
+    help = 'Generate brand/category/description for a supplier feed (CSV/JSONL of name, image) and write them into Product'
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help='CSV (name,image[,product_id]) or JSONL file')
+        parser.add_argument('--pipeline', choices=list(PIPELINES), default=BASIC)
+        parser.add_argument('--concurrency', type=int, help='Concurrent generation calls (default: 8, 4 on SQLite)')
+        parser.add_argument('--batch-size', type=int, default=50, help='Products written per bulk_create/bulk_update')
+        parser.add_argument('--retries', type=int, default=2, help='Extra attempts per product on transient errors')
+        parser.add_argument('--checkpoint', help=f'Progress file (default: {CHECKPOINT_DIR}/<input>.jsonl)')
+        parser.add_argument('--retry-failed', action='store_true', help='Retry rows that failed in a previous run')
+        parser.add_argument('--refresh', action='store_true', help='Ignore the product-info cache')
+        parser.add_argument('--user', help='Owner username for newly created products')
+
+    def handle(self, *args, **options):
+        input_path = Path(options['input']).resolve()
+        if not input_path.exists():
+            raise CommandError(f"입력 파일이 없습니다: {input_path}")
+        owner = User.objects.get(username=options['user']) if options['user'] else None
+        if options['concurrency'] is None:
+            options['concurrency'] = DEFAULT_CONCURRENCY.get(connection.vendor, 8)
+
+        # 1단계: 입력 + 체크포인트 (이미 끝난 행은 건너뜀, 같은 행이 여러 번 있으면 한 번만 처리)
+        rows = _read_rows(input_path)
+        unique_rows = list({row['key']: row for row in rows}.values())
+        if len(unique_rows) < len(rows):
+            self.stdout.write(self.style.WARNING(f"⚠️ 중복 행 {len(rows) - len(unique_rows)}개는 한 번만 처리합니다."))
+            rows = unique_rows
+        if options['checkpoint']:
+            checkpoint_path = Path(options['checkpoint'])
+        else:
+            CHECKPOINT_DIR.mkdir(parents=True, exist_ok=True)
+            checkpoint_path = CHECKPOINT_DIR / f"{input_path.stem}-{hashlib.sha256(str(input_path).encode()).hexdigest()[:8]}.jsonl"
+        states = _load_checkpoint(checkpoint_path)
+        skip = {'done'} | (set() if options['retry_failed'] else {'failed'})
+        todo = [row for row in rows if states.get(row['key']) not in skip]
+
+        self.stdout.write(self.style.WARNING(
+            f"🚀 상품 {len(rows)}개 중 {len(todo)}개 생성 "
+            f"({options['pipeline']}, 동시 {options['concurrency']}개, 체크포인트 {checkpoint_path})"
+        ))
+        if not todo:
+            self.stdout.write(self.style.SUCCESS('✅ 처리할 상품이 없습니다.'))
+            return
+
+        self.owner = owner
+        self.checkpoint = open(checkpoint_path, "a", encoding="utf-8")
+        self.totals = {'done': 0, 'failed': 0, 'created': 0, 'updated': 0, 'cached': 0}
+        pending = []
+        started = time.perf_counter()
+
+        # 2단계: 생성 (스레드 풀, 공용 OpenAI 연결 풀 사용) → batch-size 개씩 DB 반영
+        executor = ThreadPoolExecutor(max_workers=options['concurrency'], thread_name_prefix="enrich")
+        try:
+            futures = {
+                executor.submit(self._generate, row, input_path.parent, options): row
+                for row in todo
+            }
+            for future in as_completed(futures):
+                row = futures[future]
+                result, cached, error = future.result()
+                if error:
+                    self.totals['failed'] += 1
+                    self._record(row, 'failed', error=error)
+                    self.stdout.write(self.style.ERROR(f"❌ {row['name']}: {error}"))
+                    continue
+
+                self.totals['cached'] += cached
+                pending.append((row, result))
+                if len(pending) >= options['batch_size']:
+                    self._write_batch(pending)
+                    pending = []
+                    self._progress(started)
+
+        except KeyboardInterrupt:
+            executor.shutdown(wait=False, cancel_futures=True)
+            self.stdout.write(self.style.WARNING('⚠️ 중단됨 - 완료된 결과만 저장합니다. 같은 명령으로 이어서 실행할 수 있습니다.'))
+        finally:
+            if pending:
+                self._write_batch(pending)
+            executor.shutdown(wait=True)
+            self.checkpoint.close()
+
+        # 3단계: 결과
+        elapsed = time.perf_counter() - started
+        rate = self.totals['done'] / elapsed * 60 if elapsed else 0
+        self.stdout.write(
+            f"생성 {self.totals['created']}개, 수정 {self.totals['updated']}개, 캐시 사용 {self.totals['cached']}개, "
+            f"실패 {self.totals['failed']}개"
+        )
+        style = self.style.SUCCESS if not self.totals['failed'] else self.style.WARNING
+        self.stdout.write(style(f"✅ {self.totals['done']}개 완료 ({elapsed:.1f}s, {rate:.1f} products/min)"))
+        if self.totals['failed']:
+            self.stdout.write('실패한 상품은 --retry-failed 로 다시 시도할 수 있습니다.')
+
+    def _generate(self, row, base_dir, options):
+        """스레드 풀에서 상품 1개 생성 → (결과, 캐시 사용 여부, 에러 메시지)"""
+        try:
+            image_path = _resolve_image(row['image'], base_dir)
+            row['image_path'] = image_path
+            for attempt in range(options['retries'] + 1):
+                try:
+                    result, cached = generate_cached_product_info(
+                        options['pipeline'], row['name'], str(image_path), refresh=options['refresh']
+                    )
+                    return result, cached, None
+                except RETRYABLE_ERRORS:
+                    if attempt == options['retries']:
+                        raise
+                    time.sleep(2 ** attempt) # 1s, 2s, 4s ...
+        except Exception as e:
+            return None, False, f"{type(e).__name__}: {e}"
+        finally:
+            connection.close() # 풀 스레드의 DB 연결 정리
+
+    def _image_name(self, image_path):
+        """Product.image 값 (MEDIA_ROOT 밖의 이미지는 내용 해시를 붙인 이름으로 MEDIA_ROOT 에 한 번만 복사)"""
+        media_root = Path(settings.MEDIA_ROOT).resolve()
+        image_path = image_path.resolve()
+        if image_path.is_relative_to(media_root):
+            return str(image_path.relative_to(media_root))
+        with open(image_path, "rb") as f:
+            name = f"{hashlib.sha256(f.read()).hexdigest()[:12]}-{image_path.name}"
+            if default_storage.exists(name):
+                return name
+            f.seek(0)
+            return default_storage.save(name, File(f))
+
+    def _write_batch(self, batch):
+        """
+        생성 결과를 Product 에 일괄 반영 (SQLite 잠금 오류는 백오프 후 다시 시도) 후 체크포인트 기록
+        """
+        images = {row['key']: self._image_name(row['image_path']) for row, _ in batch}
+
+        for attempt in range(WRITE_ATTEMPTS):
+            try:
+                written, missing, created, updated = self._apply_batch(batch, images)
+                break
+            except OperationalError as e:
+                if attempt == WRITE_ATTEMPTS - 1:
+                    raise
+                self.stdout.write(self.style.WARNING(f"⚠️ DB 반영 실패, 다시 시도합니다: {e}"))
+                time.sleep(0.5 * 2 ** attempt)
+
+        # 커밋된 뒤에 체크포인트 기록
+        for row in missing:
+            self._record(row, 'failed', error=f"상품 {row['product_id']} 없음")
+        for row, product in written:
+            self._record(row, 'done', product_id=product._id)
+        self.checkpoint.flush()
+        self.totals['failed'] += len(missing)
+        self.totals['done'] += len(written)
+        self.totals['created'] += created
+        self.totals['updated'] += updated
+
+    def _apply_batch(self, batch, images):
+        """
+        한 트랜잭션으로 Product 반영 → (반영한 (행, 상품), 상품이 없는 행, 생성 수, 수정 수)
+        - product_id 가 있으면 그 상품, 없으면 같은 이름 + 이미지의 기존 상품을 수정 (재실행 시 중복 생성 방지)
+        - 나머지는 새 상품으로 생성
+        """
+        with transaction.atomic():
+            by_id = Product.objects.in_bulk([row['product_id'] for row, _ in batch if row['product_id']])
+            by_name_image = {
+                (p.name, p.image.name): p
+                for p in Product.objects.filter(
+                    name__in=[row['name'] for row, _ in batch if not row['product_id']],
+                    image__in=list(images.values()),
+                )
+            }
+
+            to_update, to_create, written, missing = {}, [], [], []
+            for row, result in batch:
+                if row['product_id']:
+                    product = by_id.get(row['product_id'])
+                    if product is None:
+                        missing.append(row)
+                        continue
+                else:
+                    product = by_name_image.get((row['name'], images[row['key']]))
+
+                if product is None:
+                    product = Product(user=self.owner, name=row['name'], image=images[row['key']])
+                    to_create.append(product)
+                else:
+                    to_update[product._id] = product
+
+                product.brand = result.get('brand')
+                product.category = result.get('category')
+                product.description = result.get('description')
+                written.append((row, product))
+
+            Product.objects.bulk_update(to_update.values(), ['brand', 'category', 'description'])
+            Product.objects.bulk_create(to_create)
+
+            # bulk 작업은 post_save 시그널이 없으므로 피처 스토어에 직접 알림
+            product_ids = [product._id for _, product in written if product._id is not None]
+            transaction.on_commit(lambda: mark_products_changed(product_ids))
+
+        return written, missing, len(to_create), len(to_update)
+
+    def _record(self, row, status, **extra):
+        self.checkpoint.write(json.dumps({'key': row['key'], 'status': status, **extra}, ensure_ascii=False) + "\n")
+
+    def _progress(self, started):
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"  {self.totals['done']}개 저장, 실패 {self.totals['failed']}개 "
+            f"({self.totals['done'] / elapsed * 60:.1f} products/min)"
+        )
@@ -0,0 +1,171 @@
+from django.core.management.base import BaseCommand, CommandError
+from pathlib import Path
+import json
+import re
+import time
+from base.services.chatbot_service import load_documents, get_vector_db, get_chunk_ids, document_chunk_id
+from base.services.retrieval_service import RETRIEVAL_MODES, BM25, search_documents, document_text
+
+BOLD_RE = re.compile(r"\*\*(.+?)\*\*")
+
+# 기본 평가 질문: 사용자가 쓸 법한 표현으로 바꿔 쓴 질문 + 정답 조각에 들어 있는 문구
+# - 헤더 문장이나 굵은 글씨를 그대로 쓰지 않음 (헤더는 BM25 만 색인하고 굵은 글씨는 정확한 부분 문자열이라 BM25 에 유리)
+PARAPHRASED_QUESTIONS = [
+    ("물건 받고 나서 며칠 안에 돈 돌려받을 수 있어요?", "상품 수령 후"),
+    ("마음이 바뀌어서 반품하면 택배비는 누가 내요?", "왕복 배송비는 고객 부담"),
+    ("다른 사이즈로 바꾸고 싶은데 가능한가요?", "사이즈 교환, 색상 교환"),
+    ("뜯어본 박스도 바꿔주나요?", "포장이 훼손되지 않은"),
+    ("한 번 써본 물건은 돈 못 돌려받나요?", "상품을 사용했거나 훼손된 경우"),
+    ("주문하면 언제쯤 도착해요?", "결제 완료 후 보통"),
+    ("제주도 사는데 더 오래 걸리나요?", "제주/도서산간"),
+    ("택배가 지금 어디쯤 왔는지 보고 싶어요", "실시간 추적이 가능합니다"),
+    ("얼마 이상 사면 택배비 안 내도 되나요?", "이상 구매 시 무료배송"),
+    ("카카오페이로 계산할 수 있어요?", "간편결제"),
+    ("어떤 방법으로 돈을 낼 수 있나요?", "신용/체크카드"),
+    ("방금 결제한 거 없던 일로 하고 싶어요", "결제 당일에는 바로 취소"),
+    ("계좌로 보냈는데 소득공제용 영수증 받을 수 있나요?", "무통장입금 결제 시"),
+    ("가입하려면 뭘 입력해야 하나요?", "이메일 주소와 비밀번호를 입력하면"),
+    ("카카오 계정으로 바로 가입돼요?", "SNS 계정(카카오, 네이버, 구글)"),
+    ("로그인 안 하고 그냥 주문해도 돼요?", "비회원 구매하기"),
+    ("내가 산 거 목록은 어디서 봐요?", "Profile > 주문 내역"),
+    ("모아둔 포인트 결제할 때 쓸 수 있나요?", "최소 1,000원부터"),
+    ("처음 가입하면 할인 혜택 주나요?", "웰컴 쿠폰팩"),
+    ("상담원이랑 통화하려면 몇 시에 전화해야 돼요?", "평일 오전 9시"),
+    ("주말에도 전화 상담 되나요?", "토요일/일요일/공휴일은 휴무"),
+]
+
+
+def _build_questions(docs):
+    """
+    docs/ 에서 정답이 있는 질문 만들기 → [{question, relevant(조각 해시 집합), kind}]
+    - heading: 조각의 마지막 헤더 (FAQ 는 헤더가 질문 그대로)
+    - term: 본문의 굵은 글씨(**7일 이내** 등) - 정확한 단어 검색, 그 단어가 들어간 조각은 모두 정답
+    - 둘 다 색인된 문구 그대로라 BM25 에 유리 → 검색 방식 비교는 paraphrased 기준으로 볼 것
+    """
+    texts = {doc_id: document_text(doc) for doc_id, doc in docs.items()}
+    questions = []
+    for doc_id, doc in docs.items():
+        headers = doc.metadata.get("headers", "")
+        if headers:
+            questions.append({
+                "question": headers.split(": ")[-1],
+                "relevant": {doc_id},
+                "kind": "heading",
+            })
+        for term in dict.fromkeys(BOLD_RE.findall(doc.page_content)):
+            questions.append({
+                "question": term,
+                "relevant": {other for other, text in texts.items() if term in text},
+                "kind": "term",
+            })
+    return questions
+
+
+def _label_questions(rows, docs, kind):
+    """[(위치, 질문, expected)] → expected 문구가 들어간 조각이 정답인 질문 목록"""
+    texts = {doc_id: document_text(doc) for doc_id, doc in docs.items()}
+    questions = []
+    for where, question, expected in rows:
+        relevant = {doc_id for doc_id, text in texts.items() if expected in text}
+        if not relevant:
+            raise CommandError(f"{where} '{expected}' 가 들어간 문서 조각이 없습니다.")
+        questions.append({"question": question, "relevant": relevant, "kind": kind})
+    return questions
+
+
+def _load_questions(path, docs):
+    """JSONL {question, expected} - expected 문구가 들어간 조각이 정답"""
+    rows = []
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            rows.append((f"{path}:{line_no}", row["question"], row["expected"]))
+    return _label_questions(rows, docs, "custom")
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0
+
+
+class Command(BaseCommand):
+    help = 'Measure chatbot retrieval recall@k, MRR and latency (bm25 / vector / hybrid) on paraphrased questions labelled against docs/'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--k', type=int, default=3, help='Documents retrieved per question')
+        parser.add_argument('--modes', default=','.join(RETRIEVAL_MODES), help='Comma separated retrieval modes')
+        parser.add_argument('--questions', help='Extra JSONL file of {"question", "expected"} (expected = text in the right chunk)')
+        parser.add_argument('--only-custom', action='store_true', help='Skip the built-in paraphrased questions')
+        parser.add_argument('--generated', action='store_true',
+                            help='Also use questions generated from docs/ headings and bold terms (verbatim text, favours BM25)')
+        parser.add_argument('--show-misses', action='store_true', help='Print questions whose answer chunk was not retrieved')
+
+    def handle(self, *args, **options):
+        modes = [mode.strip() for mode in options['modes'].split(',') if mode.strip()]
+        unknown = set(modes) - set(RETRIEVAL_MODES)
+        if unknown:
+            raise CommandError(f"지원하지 않는 검색 방식: {', '.join(sorted(unknown))}")
+        k = options['k']
+
+        # 1단계: 정답 질문 세트 (docs/ 조각 기준)
+        docs = load_documents()
+        questions = []
+        if not options['only_custom']:
+            rows = [(f"PARAPHRASED_QUESTIONS[{i}]", question, expected) for i, (question, expected) in enumerate(PARAPHRASED_QUESTIONS)]
+            questions += _label_questions(rows, docs, "paraphrased")
+        if options['generated']:
+            questions += _build_questions(docs)
+        if options['questions']:
+            questions += _load_questions(Path(options['questions']), docs)
+        if not questions:
+            raise CommandError("평가할 질문이 없습니다.")
+
+        vectordb = get_vector_db()
+        if set(docs) != set(get_chunk_ids()):
+            self.stdout.write(self.style.WARNING('⚠️ 벡터DB가 docs/ 와 다릅니다. build_vectordb 를 먼저 실행하세요.'))
+
+        kinds = {}
+        for question in questions:
+            kinds[question['kind']] = kinds.get(question['kind'], 0) + 1
+        self.stdout.write(self.style.WARNING(
+            f"🚀 질문 {len(questions)}개 ({', '.join(f'{kind} {n}' for kind, n in kinds.items())}), k={k}"
+        ))
+
+        # 2단계: 질문 임베딩을 한 번에 받아서 캐시 → 방식별 검색 시간은 임베딩 캐시 적중 상태로 비교
+        if set(modes) - {BM25}:
+            started = time.perf_counter()
+            vectordb.embeddings.embed_documents([question['question'] for question in questions])
+            self.stdout.write(f"  - 질문 임베딩 {len(questions)}개 ({time.perf_counter() - started:.2f}s, 임베딩 캐시에 저장)")
+
+        # 3단계: 방식별 recall@k / MRR / 검색 시간
+        for mode in modes:
+            hits, reciprocal_ranks, durations, fallbacks, misses = 0, 0.0, [], 0, []
+            kind_hits = dict.fromkeys(kinds, 0)
+            for question in questions:
+                started = time.perf_counter()
+                results, used = search_documents(question['question'], k=k, mode=mode)
+                durations.append(time.perf_counter() - started)
+                fallbacks += used != mode
+
+                ranks = [rank for rank, doc in enumerate(results, start=1) if document_chunk_id(doc) in question['relevant']]
+                if ranks:
+                    hits += 1
+                    kind_hits[question['kind']] += 1
+                    reciprocal_ranks += 1 / ranks[0]
+                else:
+                    misses.append(question['question'])
+
+            line = (
+                f"{mode:>6}: recall@{k} {hits / len(questions):.3f}, MRR {reciprocal_ranks / len(questions):.3f}, "
+                f"p50 {_percentile(durations, 0.5) * 1000:.1f}ms, p95 {_percentile(durations, 0.95) * 1000:.1f}ms"
+            )
+            if len(kinds) > 1:
+                line += " [" + ", ".join(f"{kind} {kind_hits[kind] / n:.3f}" for kind, n in kinds.items()) + "]"
+            if fallbacks:
+                line += f" (BM25 대체 {fallbacks}회)"
+            self.stdout.write(self.style.SUCCESS(f"✅ {line}"))
+            if options['show_misses']:
+                for question in misses:
+                    self.stdout.write(f"    ✗ {question}")
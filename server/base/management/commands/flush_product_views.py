@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from base.services.view_buffer_service import get_view_buffer, replay_spool, SPOOL_DIR
+
+class Command(BaseCommand):
+    help = 'Flush buffered product views and replay spooled view events left by stopped workers'
+
+    def handle(self, *args, **options):
+        # 1. 종료된 워커가 남긴 spool 파일 재처리
+        replayed = replay_spool()
+        self.stdout.write(self.style.SUCCESS(f'✅ spool 파일 {replayed}개 반영 ({SPOOL_DIR})'))
+
+        # 2. 현재 프로세스 버퍼 flush
+        flushed = get_view_buffer().flush()
+        self.stdout.write(self.style.SUCCESS(f'✅ 버퍼 flush 완료 ({flushed}건)'))
@@ -0,0 +1,78 @@
+from django.core.management.base import BaseCommand
+from django.contrib.auth.models import User
+from django.db import connections
+from django.utils import timezone
+from datetime import timedelta
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import multiprocessing
+import os
+import time
+import traceback
+from base.models import ProductView, Order
+from base.services.recommendation_service import build_recommendations, save_precomputed
+
+
+def _compute_for_user(user_id):
+    """자식 프로세스에서 사용자 1명의 추천 결과 계산 → (user_id, 응답 데이터 또는 None, 에러)"""
+    try:
+        user = User.objects.get(id=user_id)
+        return user_id, build_recommendations(user), None
+    except Exception:
+        return user_id, None, traceback.format_exc(limit=3)
+
+
+class Command(BaseCommand):
+    help = 'Precompute recommendations for recently active users (run nightly, e.g. from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=7, help='Users who viewed or ordered within this many days')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Worker processes')
+        parser.add_argument('--ttl', type=int, default=None, help='Result lifetime in seconds (default: RECOMMENDATION_PRECOMPUTE_TTL)')
+        parser.add_argument('--batch-size', type=int, default=200, help='Rows written per bulk insert')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+
+        # 1단계: 최근 활동(상품 조회 또는 주문)이 있는 사용자
+        user_ids = set(ProductView.objects.filter(last_viewed__gte=cutoff).values_list('user_id', flat=True))
+        user_ids |= set(Order.objects.filter(createdAt__gte=cutoff, user__isnull=False).values_list('user_id', flat=True))
+        user_ids = sorted(user_ids)
+
+        if not user_ids:
+            self.stdout.write(self.style.WARNING(f'⚠️ 최근 {options["days"]}일 동안 활동한 사용자가 없습니다.'))
+            return
+
+        workers = max(1, options['workers'])
+        self.stdout.write(self.style.WARNING(f'🚀 활성 사용자 {len(user_ids)}명 추천 사전 계산 시작 (프로세스 {workers}개)...'))
+
+        # 2단계: 사용자별 계산은 자식 프로세스에서, 저장은 부모에서 배치로
+        # - fork 전에 DB 연결을 닫아야 자식이 부모 연결을 공유하지 않음
+        connections.close_all()
+        started = time.perf_counter()
+        pending, saved, failed = {}, 0, 0
+
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork')) as executor:
+            futures = [executor.submit(_compute_for_user, user_id) for user_id in user_ids]
+            for future in as_completed(futures):
+                user_id, payload, error = future.result()
+                if error:
+                    failed += 1
+                    self.stdout.write(self.style.ERROR(f'❌ 사용자 {user_id} 계산 실패: {error.strip().splitlines()[-1]}'))
+                    continue
+
+                pending[user_id] = payload
+                if len(pending) >= options['batch_size']:
+                    save_precomputed(pending, options['ttl'])
+                    saved += len(pending)
+                    pending = {}
+
+        if pending:
+            save_precomputed(pending, options['ttl'])
+            saved += len(pending)
+
+        # 3단계: 처리량 보고
+        elapsed = time.perf_counter() - started
+        users_per_sec = len(user_ids) / elapsed if elapsed else 0.0
+        self.stdout.write(f'소요 시간: {elapsed:.2f}s')
+        self.stdout.write(f'처리량: {users_per_sec:.1f} users/s (프로세스당 {users_per_sec / workers:.1f} users/s)')
+        self.stdout.write(self.style.SUCCESS(f'✅ 저장 {saved}명, 실패 {failed}명'))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from base.models import AIGenerationJob
+from base.services.ai_job_service import recover_ai_jobs, wait_for_jobs
+
+
+class Command(BaseCommand):
+    help = 'Requeue AI generation jobs left queued or stuck running by stopped workers, and run them in this process'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stale-seconds', type=int, default=None,
+                            help='Running jobs older than this are treated as orphaned (default: AI_JOB_STALE_SECONDS)')
+
+    def handle(self, *args, **options):
+        # 1. 멈춘 작업 복구 후 대기 작업 등록
+        requeued, failed = recover_ai_jobs(options['stale_seconds'])
+        if failed:
+            self.stdout.write(self.style.WARNING(f'⚠️ 시도 횟수를 다 쓴 작업 {failed}개 실패 처리'))
+        self.stdout.write(self.style.SUCCESS(f'✅ 대기 작업 {requeued}개 등록'))
+
+        # 2. 모두 끝날 때까지 대기
+        wait_for_jobs()
+        counts = {
+            status: AIGenerationJob.objects.filter(status=status).count()
+            for status, _ in AIGenerationJob.STATUS_CHOICES
+        }
+        self.stdout.write(self.style.SUCCESS(f'✅ 처리 완료 {counts}'))
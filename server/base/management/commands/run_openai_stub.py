@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from base.services.openai_stub import OpenAIStubServer
+
+class Command(BaseCommand):
+    help = 'Run a local OpenAI-compatible stub server (chat completions incl. vision/stream, embeddings) for load testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8001)
+        parser.add_argument('--latency', type=float, default=0.3, help='Fixed response delay (seconds)')
+        parser.add_argument('--jitter', type=float, default=0.2, help='Extra random delay up to this many seconds')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 429/500')
+        parser.add_argument('--embedding-dim', type=int, default=1536)
+        parser.add_argument('--token-delay', type=float, default=0.02, help='Delay between streamed chunks (seconds)')
+
+    def handle(self, *args, **options):
+        stub = OpenAIStubServer(
+            host=options['host'],
+            port=options['port'],
+            latency=options['latency'],
+            jitter=options['jitter'],
+            error_rate=options['error_rate'],
+            embedding_dim=options['embedding_dim'],
+            token_delay=options['token_delay'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'✅ OpenAI 스텁 서버 실행 중: {stub.base_url}'))
+        self.stdout.write(f'   Django 서버를 OPENAI_BASE_URL={stub.base_url} OPENAI_API_KEY=stub 로 실행하세요.')
+        self.stdout.write(
+            f"   지연 {options['latency']}s (+최대 {options['jitter']}s), 에러 비율 {options['error_rate']:.0%}"
+        )
+
+        try:
+            stub.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            stub.stop()
+            self.stdout.write(f'요청 통계: {stub.stats}')
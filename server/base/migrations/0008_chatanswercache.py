@@ -0,0 +1,27 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0007_aigenerationjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChatAnswerCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('question', models.TextField()),
+                ('embedding', models.BinaryField()),
+                ('answer', models.TextField()),
+                ('sources', models.JSONField(default=list)),
+                ('chunk_ids', models.JSONField(default=list)),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('last_used_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
 
 class Product(models.Model):
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
@@ -83,4 +84,65 @@ class ProductView(models.Model):
 
     class Meta:
         unique_together = ('user', 'product')
-        ordering = ['-last_viewed']
\ No newline at end of file
+        ordering = ['-last_viewed']
+
+class PrecomputedRecommendation(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='precomputed_recommendation')
+    payload = models.JSONField(encoder=DjangoJSONEncoder) # 추천 API 응답 그대로 저장
+    created_at = models.DateTimeField(auto_now=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.user_id} ({self.created_at})"
+
+class ProductInfoCache(models.Model):
+    key = models.CharField(max_length=64, unique=True) # sha256(이미지 + 정규화된 상품명 + 모델/프롬프트 버전)
+    pipeline = models.CharField(max_length=20) # basic | langgraph
+    result = models.JSONField(encoder=DjangoJSONEncoder) # 생성 결과 (brand, category, description ...)
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(db_index=True) # LRU 정리 기준
+
+    def __str__(self):
+        return f"{self.pipeline}:{self.key[:12]}"
+
+class AIGenerationJob(models.Model):
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, '대기'),
+        (STATUS_RUNNING, '실행 중'),
+        (STATUS_SUCCEEDED, '완료'),
+        (STATUS_FAILED, '실패'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='ai_generation_jobs')
+    pipeline = models.CharField(max_length=20) # basic | langgraph
+    product_name = models.CharField(max_length=200)
+    image_path = models.CharField(max_length=500) # 작업 실행 시 읽을 이미지 파일 경로
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED, db_index=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    result = models.JSONField(encoder=DjangoJSONEncoder, null=True, blank=True)
+    error = models.TextField(blank=True, default='')
+    cached = models.BooleanField(default=False) # 상품 정보 캐시에서 바로 완료된 작업
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True) # 마지막 시도 시작 시각
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.id} {self.pipeline} ({self.status})"
+
+class ChatAnswerCache(models.Model):
+    question = models.TextField()
+    embedding = models.BinaryField() # 질문 임베딩 (float32)
+    answer = models.TextField()
+    sources = models.JSONField(default=list) # 챗봇 응답의 sources 그대로
+    chunk_ids = models.JSONField(default=list) # 답변 근거 문서 조각 해시 (조각이 바뀌거나 삭제되면 무효)
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    last_used_at = models.DateTimeField(db_index=True) # 최대 개수 초과 시 정리 기준
+
+    def __str__(self):
+        return self.question[:50]
@@ -1,6 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from .models import Product, Review, ProductView, Order, OrderItem
+from .models import Product, Review, ProductView, Order, OrderItem, AIGenerationJob
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.conf import settings
 
@@ -143,4 +143,19 @@ class OrderSerializer(serializers.ModelSerializer):
     def get_items(self, obj):
         items = obj.orderitem_set.all()
         serializer = OrderItemSerializer(items, many=True)
-        return serializer.data
\ No newline at end of file
+        return serializer.data
+
+# AI 상품 정보 생성 작업 직렬화
+class AIGenerationJobSerializer(serializers.ModelSerializer):
+    duration_seconds = serializers.SerializerMethodField(read_only=True)
+
+    class Meta:
+        model = AIGenerationJob
+        fields = ['id', 'pipeline', 'product_name', 'status', 'attempts', 'cached', 'error', 'result',
+                  'created_at', 'started_at', 'finished_at', 'duration_seconds'] # image_path 는 내부용
+
+    def get_duration_seconds(self, obj):
+        """요청 접수부터 완료까지 걸린 시간 (완료 전이면 None)"""
+        if obj.finished_at is None:
+            return None
+        return round((obj.finished_at - obj.created_at).total_seconds(), 3)
@@ -0,0 +1,194 @@
+# OpenAI 호출에 쓰는 클라이언트를 프로세스 단위로 공유하는 모듈
+# - 요청마다 httpx.Client / OpenAI / ChatOpenAI 를 새로 만들면 매번 TCP+TLS 연결과 객체 생성 비용이 든다.
+# - 하나의 httpx.Client(keep-alive 연결 풀)를 모든 AI 서비스가 함께 쓰고,
+#   모델 설정별 클라이언트 객체도 한 번만 만들어 재사용한다.
+# - 비동기 호출(ainvoke)은 백그라운드 스레드에서 계속 도는 이벤트 루프 하나에서 실행해서
+#   비동기 연결 풀(httpx.AsyncClient)도 요청 간에 재사용한다.
+# - 프로세스 종료 시(atexit) 연결 풀을 닫는다.
+
+import asyncio
+import atexit
+import logging
+import threading
+import httpx
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_http_client = None
+_async_http_client = None
+_openai_client = None
+_loop = None # AI 비동기 호출 전용 이벤트 루프
+_chat_models = {} # {(model, temperature, api_key): ChatOpenAI}
+_embeddings = {} # {(model, api_key): OpenAIEmbeddings}
+_stats = {'http_clients_created': 0, 'chat_models_created': 0, 'embeddings_created': 0}
+
+
+def _base_url():
+    return settings.OPENAI_BASE_URL or None # 비어 있으면 기본 OpenAI 주소
+
+
+def get_http_client() -> httpx.Client:
+    """keep-alive 연결 풀을 가진 공용 httpx.Client (워커당 최대 AI_HTTP_MAX_CONNECTIONS개 연결)"""
+    global _http_client
+
+    if _http_client is None:
+        with _lock:
+            if _http_client is None:
+                _http_client = httpx.Client(
+                    limits=_limits(),
+                    timeout=httpx.Timeout(settings.AI_HTTP_TIMEOUT, connect=5.0),
+                )
+                _stats['http_clients_created'] += 1
+                atexit.register(close_ai_clients)
+
+    return _http_client
+
+
+def _limits():
+    return httpx.Limits(
+        max_connections=settings.AI_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.AI_HTTP_MAX_CONNECTIONS,
+        keepalive_expiry=settings.AI_HTTP_KEEPALIVE_EXPIRY,
+    )
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """비동기 호출용 공용 httpx.AsyncClient (run_async() 의 이벤트 루프에서만 사용)"""
+    global _async_http_client
+
+    if _async_http_client is None:
+        with _lock:
+            if _async_http_client is None:
+                _async_http_client = httpx.AsyncClient(
+                    limits=_limits(),
+                    timeout=httpx.Timeout(settings.AI_HTTP_TIMEOUT, connect=5.0),
+                )
+
+    return _async_http_client
+
+
+def _get_event_loop():
+    """AI 비동기 호출 전용 이벤트 루프 (데몬 스레드에서 계속 실행)"""
+    global _loop
+
+    if _loop is None:
+        with _lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="ai-event-loop", daemon=True).start()
+                _loop = loop
+
+    return _loop
+
+
+def run_async(coro, timeout=None):
+    """
+    동기 코드(뷰)에서 코루틴 실행 후 결과 반환
+    - 요청마다 asyncio.run()으로 새 루프를 만들면 비동기 연결 풀을 재사용할 수 없으므로
+      항상 같은 루프에서 실행한다. 여러 요청 스레드가 동시에 호출해도 안전하다.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _get_event_loop()).result(timeout)
+
+
+def get_openai_client():
+    """공용 OpenAI SDK 클라이언트"""
+    global _openai_client
+
+    if _openai_client is None:
+        from openai import OpenAI
+
+        http_client = get_http_client()
+        with _lock:
+            if _openai_client is None:
+                _openai_client = OpenAI(
+                    api_key=settings.OPENAI_API_KEY,
+                    base_url=_base_url(),
+                    http_client=http_client,
+                )
+
+    return _openai_client
+
+
+def get_chat_model(model="gpt-4o-mini", temperature=0.3, api_key=None):
+    """LangChain ChatOpenAI (같은 설정이면 같은 인스턴스 재사용)"""
+    api_key = api_key or settings.OPENAI_API_KEY
+    key = (model, temperature, api_key)
+
+    if key not in _chat_models:
+        from langchain_openai import ChatOpenAI
+
+        http_client = get_http_client()
+        http_async_client = get_async_http_client()
+        with _lock:
+            if key not in _chat_models:
+                _chat_models[key] = ChatOpenAI(
+                    model=model,
+                    temperature=temperature,
+                    api_key=api_key,
+                    base_url=_base_url(),
+                    http_client=http_client,
+                    http_async_client=http_async_client,
+                )
+                _stats['chat_models_created'] += 1
+
+    return _chat_models[key]
+
+
+def get_embeddings(model="text-embedding-ada-002", api_key=None):
+    """LangChain OpenAIEmbeddings (같은 설정이면 같은 인스턴스 재사용)"""
+    api_key = api_key or settings.OPENAI_API_KEY
+    key = (model, api_key)
+
+    if key not in _embeddings:
+        from langchain_openai import OpenAIEmbeddings
+
+        http_client = get_http_client()
+        http_async_client = get_async_http_client()
+        with _lock:
+            if key not in _embeddings:
+                _embeddings[key] = OpenAIEmbeddings(
+                    model=model,
+                    api_key=api_key,
+                    base_url=_base_url(),
+                    http_client=http_client,
+                    http_async_client=http_async_client,
+                )
+                _stats['embeddings_created'] += 1
+
+    return _embeddings[key]
+
+
+def close_ai_clients():
+    """연결 풀과 이벤트 루프 닫기 (프로세스 종료 시 자동 호출)"""
+    global _http_client, _async_http_client, _openai_client, _loop
+
+    with _lock:
+        if _http_client is not None:
+            try:
+                _http_client.close()
+            except Exception as e:
+                logger.error(f"❌ AI HTTP 클라이언트 종료 실패: {e}")
+        if _loop is not None:
+            try:
+                if _async_http_client is not None:
+                    asyncio.run_coroutine_threadsafe(_async_http_client.aclose(), _loop).result(5)
+            except Exception as e:
+                logger.error(f"❌ AI 비동기 HTTP 클라이언트 종료 실패: {e}")
+            _loop.call_soon_threadsafe(_loop.stop)
+        _http_client = None
+        _async_http_client = None
+        _loop = None
+        _openai_client = None
+        _chat_models.clear()
+        _embeddings.clear()
+
+
+def get_ai_client_stats():
+    """클라이언트 생성 횟수와 연결 풀 설정 (현재 프로세스 기준)"""
+    return {
+        **_stats,
+        'max_connections': settings.AI_HTTP_MAX_CONNECTIONS,
+        'base_url': _base_url() or 'https://api.openai.com/v1',
+    }
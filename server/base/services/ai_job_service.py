@@ -0,0 +1,343 @@
+# AI 상품 정보 생성 작업 큐 모듈
+# - 생성 요청을 AIGenerationJob 행으로 저장하고 작업 ID를 바로 돌려준다 (요청 스레드는 GPT 응답을 기다리지 않음).
+# - 작업은 워커 프로세스마다 하나씩 있는 스레드 풀(AI_JOB_WORKERS)에서 실행된다.
+# - 동시 실행 제한: 사용자당 진행 중 작업 수(AI_JOB_MAX_ACTIVE_PER_USER), 전체 대기 작업 수(AI_JOB_MAX_QUEUED)
+# - 일시적 오류(연결/타임아웃/429/5xx/JSON 파싱 실패)는 지수 백오프로 AI_JOB_MAX_ATTEMPTS 번까지 재시도한다.
+# - 작업 상태는 DB에 있으므로 워커가 재시작되어도 recover_ai_jobs()로 남은 작업을 다시 실행할 수 있다.
+# - 죽은 워커의 스레드 풀/백오프 타이머에 있던 작업은 각 워커의 주기 점검(sweep_ai_jobs, AI_JOB_SWEEP_INTERVAL)이 다시 등록하고,
+#   AI_JOB_STALE_SECONDS 동안 진행이 없는 작업은 동시 실행 제한 계산에서 빠진다.
+
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from pathlib import Path
+import openai
+from django.conf import settings
+from django.db import OperationalError, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from base.models import AIGenerationJob
+from base.services.image_preprocess_service import check_image
+from base.services.product_info_service import (
+    PIPELINES, ProductInfoParseError, ProductInfoGenerationError,
+    generate_cached_product_info, product_info_cache_key, get_cached_product_info
+)
+
+logger = logging.getLogger(__name__)
+
+# 업로드된 이미지를 작업 실행 때까지 보관하는 폴더 (작업이 끝나면 삭제)
+JOB_IMAGE_DIR = Path(settings.BASE_DIR) / "var" / "ai_job_images"
+
+ACTIVE_STATUSES = (AIGenerationJob.STATUS_QUEUED, AIGenerationJob.STATUS_RUNNING)
+
+# 재시도할 오류 (그 외 오류는 바로 실패 처리)
+RETRYABLE_ERRORS = (
+    openai.APIConnectionError, # APITimeoutError 포함
+    openai.RateLimitError,
+    openai.InternalServerError,
+    ProductInfoParseError,
+    ProductInfoGenerationError,
+    OperationalError, # SQLite "database is locked" 등 일시적인 DB 오류
+)
+
+_executor = None
+_executor_lock = threading.Lock()
+_sweeper = None
+_sweeper_lock = threading.Lock()
+
+# 프로세스 단위 통계 + 최근 작업 소요 시간
+_stats = {'submitted': 0, 'cache_hits': 0, 'rejected': 0, 'started': 0, 'succeeded': 0, 'failed': 0, 'retries': 0, 'swept': 0}
+_durations = {'queue_wait': deque(maxlen=500), 'run': deque(maxlen=500), 'total': deque(maxlen=500)}
+_stats_lock = threading.Lock()
+
+
+class AIJobRejected(Exception):
+    """동시 실행 제한으로 작업을 받을 수 없는 경우 (status: 응답 코드, retry_after: 재시도 권장 시간(초))"""
+
+    def __init__(self, message, status, retry_after):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+def _count(name, n=1):
+    with _stats_lock:
+        _stats[name] += n
+
+
+def _observe(name, seconds):
+    with _stats_lock:
+        _durations[name].append(seconds)
+
+
+def _get_executor():
+    global _executor
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=settings.AI_JOB_WORKERS, thread_name_prefix="ai-job")
+    return _executor
+
+
+def _enqueue(job_id, delay=0.0):
+    """작업 실행 등록 (delay 초 뒤에 실행)"""
+    if delay <= 0:
+        _get_executor().submit(_run_job, job_id)
+        return
+    timer = threading.Timer(delay, _enqueue, args=(job_id,))
+    timer.daemon = True
+    timer.start()
+
+
+def _stale_cutoff(stale_seconds=None):
+    stale_seconds = settings.AI_JOB_STALE_SECONDS if stale_seconds is None else stale_seconds
+    return timezone.now() - timedelta(seconds=stale_seconds)
+
+
+def _stale_q(cutoff):
+    """cutoff 이후로 진행이 없는 작업 (마지막 시도 시작, 시도한 적이 없으면 등록 시각 기준)"""
+    return Q(started_at__lt=cutoff) | Q(started_at__isnull=True, created_at__lt=cutoff)
+
+
+def _save_job_image(image_bytes):
+    JOB_IMAGE_DIR.mkdir(parents=True, exist_ok=True)
+    path = JOB_IMAGE_DIR / uuid.uuid4().hex
+    path.write_bytes(image_bytes)
+    return str(path)
+
+
+def _remove_job_image(job):
+    """작업용으로 복사해둔 이미지 삭제 (MEDIA_ROOT 의 원본은 유지)"""
+    path = Path(job.image_path)
+    if path.parent == JOB_IMAGE_DIR:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def submit_job(user, pipeline, product_name, image_bytes=None, image_path=None, refresh=False):
+    """
+    생성 작업 등록 후 AIGenerationJob 반환
+    - image_bytes(업로드 파일) 또는 image_path(MEDIA_ROOT 의 기존 이미지) 중 하나가 필요
+    - 같은 이미지 + 상품명의 결과가 캐시에 있으면 바로 완료된 작업으로 반환 (refresh=True 이면 무시)
+    - 이미지가 아니면 InvalidImageError, 제한을 넘으면 AIJobRejected
+    """
+    if pipeline not in PIPELINES:
+        raise ValueError(f"지원하지 않는 파이프라인: {pipeline}")
+    if image_bytes is None:
+        with open(image_path, "rb") as f:
+            image_bytes = f.read()
+    check_image(image_bytes)
+
+    # 1단계: 캐시 확인
+    cache_key = product_info_cache_key(image_bytes, product_name, pipeline)
+    cached = None if refresh else get_cached_product_info(cache_key)
+    if cached is not None:
+        _count('cache_hits')
+        now = timezone.now()
+        return AIGenerationJob.objects.create(
+            user=user, pipeline=pipeline, product_name=product_name, image_path=image_path or '',
+            status=AIGenerationJob.STATUS_SUCCEEDED, result=cached, cached=True,
+            started_at=now, finished_at=now,
+        )
+
+    # 2단계: 동시 실행 제한 (오래 진행이 없는 작업은 죽은 워커에 남은 것으로 보고 세지 않음)
+    start_ai_job_sweeper()
+    active = AIGenerationJob.objects.filter(status__in=ACTIVE_STATUSES).exclude(_stale_q(_stale_cutoff()))
+    if active.filter(user=user).count() >= settings.AI_JOB_MAX_ACTIVE_PER_USER:
+        _count('rejected')
+        raise AIJobRejected("진행 중인 생성 작업이 너무 많습니다. 완료 후 다시 요청해주세요.", 429, 5)
+    if active.count() >= settings.AI_JOB_MAX_QUEUED:
+        _count('rejected')
+        raise AIJobRejected("생성 요청이 많아 잠시 후 다시 시도해주세요.", 503, 30)
+
+    # 3단계: 작업 저장 후 (커밋되면) 실행 등록
+    if image_path is None:
+        image_path = _save_job_image(image_bytes)
+    job = AIGenerationJob.objects.create(
+        user=user, pipeline=pipeline, product_name=product_name, image_path=image_path,
+    )
+    transaction.on_commit(lambda: _enqueue(job.id))
+    _count('submitted')
+    return job
+
+
+def _run_job(job_id):
+    """스레드 풀에서 작업 1건 실행"""
+    try:
+        # 1단계: 대기 중인 작업만 가져가기 (여러 워커가 같은 작업을 등록해도 한 번만 실행)
+        now = timezone.now()
+        claimed = AIGenerationJob.objects.filter(pk=job_id, status=AIGenerationJob.STATUS_QUEUED).update(
+            status=AIGenerationJob.STATUS_RUNNING, started_at=now, attempts=F('attempts') + 1,
+        )
+        if not claimed:
+            return
+        job = AIGenerationJob.objects.get(pk=job_id)
+        _count('started')
+        if job.attempts == 1:
+            _observe('queue_wait', (now - job.created_at).total_seconds())
+
+        # 2단계: 생성
+        started = time.perf_counter()
+        try:
+            # 캐시는 등록 시 확인했으므로 여기서는 항상 새로 생성
+            result, _ = generate_cached_product_info(job.pipeline, job.product_name, job.image_path, refresh=True)
+        except Exception as e:
+            _handle_failure(job, e)
+            return
+        _observe('run', time.perf_counter() - started)
+
+        # 3단계: 결과 저장
+        job.status = AIGenerationJob.STATUS_SUCCEEDED
+        job.result = result
+        job.error = ''
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'result', 'error', 'finished_at'])
+        _observe('total', (job.finished_at - job.created_at).total_seconds())
+        _count('succeeded')
+        _remove_job_image(job)
+
+    except Exception:
+        logger.exception(f"❌ AI 생성 작업 {job_id} 처리 중 오류")
+    finally:
+        connection.close() # 풀 스레드의 DB 연결 정리
+
+
+def _handle_failure(job, error):
+    """재시도 가능한 오류면 백오프 후 다시 등록, 아니면 실패 처리"""
+    message = f"{type(error).__name__}: {error}"
+
+    if isinstance(error, RETRYABLE_ERRORS) and job.attempts < settings.AI_JOB_MAX_ATTEMPTS:
+        # 지수 백오프 + 지터 (동시에 실패한 작업들이 한꺼번에 재시도하지 않도록)
+        base = settings.AI_JOB_RETRY_BACKOFF
+        delay = base * 2 ** (job.attempts - 1) + random.uniform(0, base)
+        AIGenerationJob.objects.filter(pk=job.pk).update(status=AIGenerationJob.STATUS_QUEUED, error=message)
+        _count('retries')
+        logger.warning(f"⚠️ AI 생성 작업 {job.pk} {job.attempts}차 시도 실패, {delay:.1f}초 후 재시도: {message}")
+        _enqueue(job.pk, delay)
+        return
+
+    AIGenerationJob.objects.filter(pk=job.pk).update(
+        status=AIGenerationJob.STATUS_FAILED, error=message, finished_at=timezone.now(),
+    )
+    _count('failed')
+    logger.error(f"❌ AI 생성 작업 {job.pk} 실패 ({job.attempts}회 시도): {message}")
+    _remove_job_image(job)
+
+
+def _reset_stale_running(cutoff):
+    """cutoff 전에 시작해서 아직 실행 중인 작업 → 대기 상태로 (시도 횟수를 다 쓴 작업은 실패 처리), 실패 처리 수 반환"""
+    stale = AIGenerationJob.objects.filter(status=AIGenerationJob.STATUS_RUNNING, started_at__lt=cutoff)
+
+    failed = stale.filter(attempts__gte=settings.AI_JOB_MAX_ATTEMPTS).update(
+        status=AIGenerationJob.STATUS_FAILED, error="작업 실행 중 워커가 종료되었습니다.", finished_at=timezone.now(),
+    )
+    stale.update(status=AIGenerationJob.STATUS_QUEUED)
+    return failed
+
+
+def recover_ai_jobs(stale_seconds=None):
+    """
+    워커 재시작 등으로 멈춘 작업 복구 → (다시 등록한 작업 수, 실패 처리한 작업 수)
+    - stale_seconds 보다 오래 실행 중인 작업은 대기 상태로 되돌림 (시도 횟수를 다 쓴 작업은 실패 처리)
+    - 대기 중인 작업을 모두 이 프로세스의 스레드 풀에 등록
+    """
+    failed = _reset_stale_running(_stale_cutoff(stale_seconds))
+
+    job_ids = list(
+        AIGenerationJob.objects.filter(status=AIGenerationJob.STATUS_QUEUED).order_by('created_at').values_list('pk', flat=True)
+    )
+    for job_id in job_ids:
+        _enqueue(job_id)
+    return len(job_ids), failed
+
+
+def sweep_ai_jobs(stale_seconds=None):
+    """
+    실행 중인 워커에서 주기적으로 호출 → (다시 등록한 작업 수, 실패 처리한 작업 수)
+    - recover_ai_jobs 와 같지만 stale_seconds 동안 진행이 없는 대기 작업만 등록
+      (다른 워커의 스레드 풀/백오프 타이머에서 기다리는 작업은 건드리지 않음 - 겹쳐도 한 워커만 실행)
+    """
+    cutoff = _stale_cutoff(stale_seconds)
+    failed = _reset_stale_running(cutoff)
+
+    job_ids = list(
+        AIGenerationJob.objects.filter(_stale_q(cutoff), status=AIGenerationJob.STATUS_QUEUED)
+        .order_by('created_at').values_list('pk', flat=True)
+    )
+    for job_id in job_ids:
+        _enqueue(job_id)
+    if job_ids or failed:
+        _count('swept', len(job_ids))
+        logger.warning(f"⚠️ 멈춘 AI 생성 작업 {len(job_ids)}개 재등록, {failed}개 실패 처리")
+    return len(job_ids), failed
+
+
+def start_ai_job_sweeper():
+    """주기 점검 스레드 시작 (워커 프로세스당 하나, AI_JOB_SWEEP_INTERVAL 이 0 이면 사용 안 함)"""
+    global _sweeper
+
+    if _sweeper is not None or settings.AI_JOB_SWEEP_INTERVAL <= 0:
+        return
+    with _sweeper_lock:
+        if _sweeper is None:
+            _sweeper = threading.Thread(target=_run_sweeper, name="ai-job-sweep", daemon=True)
+            _sweeper.start()
+
+
+def _run_sweeper():
+    while True:
+        time.sleep(settings.AI_JOB_SWEEP_INTERVAL)
+        try:
+            sweep_ai_jobs()
+        except Exception as e:
+            logger.error(f"❌ AI 생성 작업 주기 점검 실패: {e}")
+        finally:
+            connection.close() # 점검 스레드의 DB 연결 정리
+
+
+def wait_for_jobs():
+    """등록된 작업이 모두 끝날 때까지 대기 (명령어에서 사용 - 이후 이 프로세스에서는 새 작업을 받을 수 없음)"""
+    global _executor
+
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+def _percentiles(values):
+    values = sorted(values)
+    if not values:
+        return None
+    pick = lambda q: round(values[min(len(values) - 1, int(q * len(values)))], 3)
+    return {'count': len(values), 'p50': pick(0.5), 'p95': pick(0.95), 'max': round(values[-1], 3)}
+
+
+def get_ai_job_stats():
+    """작업 처리 통계 (카운터/소요 시간은 현재 프로세스 기준, 상태별 작업 수는 DB 기준)"""
+    with _stats_lock:
+        stats = dict(_stats)
+        durations = {name: list(values) for name, values in _durations.items()}
+
+    return {
+        **stats,
+        'durations_seconds': {name: _percentiles(values) for name, values in durations.items()},
+        'jobs_by_status': {
+            status: AIGenerationJob.objects.filter(status=status).count()
+            for status, _ in AIGenerationJob.STATUS_CHOICES
+        },
+        'workers': settings.AI_JOB_WORKERS,
+        'max_active_per_user': settings.AI_JOB_MAX_ACTIVE_PER_USER,
+        'max_queued': settings.AI_JOB_MAX_QUEUED,
+        'stale_seconds': settings.AI_JOB_STALE_SECONDS,
+        'sweep_interval': settings.AI_JOB_SWEEP_INTERVAL,
+    }
@@ -0,0 +1,182 @@
+# 상담 챗봇 답변 캐시 모듈 (의미 기반)
+# - 챗봇 질문은 환불/배송/결제 같은 몇 가지 질문이 표현만 조금 바뀌어 반복되는 경우가 대부분이다.
+# - 답변을 질문 임베딩과 함께 저장해두고, 새 질문의 임베딩과 코사인 유사도가
+#   CHATBOT_ANSWER_CACHE_THRESHOLD 이상인 답변이 있으면 검색 + GPT 호출 없이 바로 돌려준다.
+# - 답변마다 근거 문서 조각 해시(chunk_id)를 저장하고, 조각이 바뀌거나 삭제되면 그 답변은 무효가 된다.
+# - 저장소는 DB(ChatAnswerCache), 유사도 계산용 행렬은 워커마다 메모리에 올려두고 DB가 바뀌면 다시 읽는다.
+
+import threading
+from datetime import timedelta
+import numpy as np
+from django.conf import settings
+from django.db.models import Count, F, Max
+from django.utils import timezone
+from base.models import ChatAnswerCache
+
+# 프로세스 단위 통계
+_stats = {'hits': 0, 'misses': 0, 'stores': 0, 'invalidated': 0, 'evictions': 0}
+_stats_lock = threading.Lock()
+
+
+def _count(name, n=1):
+    with _stats_lock:
+        _stats[name] += n
+
+
+def _normalize(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class AnswerCache:
+    """질문 임베딩 유사도로 찾는 답변 캐시 (워커 단위 행렬 + DB 저장)"""
+
+    def __init__(self, threshold=0.95, ttl_seconds=7 * 24 * 3600, max_entries=2000):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._ids = np.empty(0, dtype=np.int64)
+        self._matrix = np.empty((0, 0), dtype=np.float32) # 정규화된 질문 임베딩 (행 = 답변)
+        self._marker = None # 마지막으로 읽은 DB 상태 (최대 ID, 항목 수)
+        self._expires_at = None # 행렬에 올린 답변 중 가장 먼저 만료되는 시각 (이때 다시 읽어서 만료된 답변을 뺌)
+        self._lock = threading.Lock()
+
+    def _valid_entries(self):
+        return ChatAnswerCache.objects.filter(
+            created_at__gte=timezone.now() - timedelta(seconds=self.ttl_seconds)
+        )
+
+    def _is_current(self, marker):
+        return marker == self._marker and (self._expires_at is None or timezone.now() < self._expires_at)
+
+    def _refresh(self):
+        """
+        다른 워커가 답변을 추가/삭제했거나 행렬의 답변이 만료되면 행렬 다시 만들기
+        - 만료는 DB 상태(최대 ID, 항목 수)를 바꾸지 않으므로 가장 먼저 만료되는 시각을 따로 확인
+          (만료된 답변이 행렬에 남아 있으면 유효한 비슷한 답변을 가림)
+        """
+        marker = tuple(ChatAnswerCache.objects.aggregate(last=Max('id'), total=Count('id')).values())
+        if self._is_current(marker):
+            return
+
+        with self._lock:
+            if self._is_current(marker):
+                return
+            rows = list(self._valid_entries().values_list('id', 'embedding', 'created_at'))
+            self._ids = np.array([row_id for row_id, _, _ in rows], dtype=np.int64)
+            self._matrix = (
+                np.stack([_normalize(np.frombuffer(bytes(blob), dtype=np.float32)) for _, blob, _ in rows])
+                if rows else np.empty((0, 0), dtype=np.float32)
+            )
+            self._expires_at = (
+                min(created_at for _, _, created_at in rows) + timedelta(seconds=self.ttl_seconds) if rows else None
+            )
+            self._marker = marker
+
+    def lookup(self, embedding, valid_chunk_ids):
+        """
+        가장 비슷한 질문의 답변 → (ChatAnswerCache, 유사도) 또는 None
+        - valid_chunk_ids: 현재 인덱스에 있는 문서 조각 해시 (근거 조각이 없어진 답변은 삭제)
+        """
+        self._refresh()
+        ids, matrix = self._ids, self._matrix
+        if not len(ids):
+            _count('misses')
+            return None
+
+        query = _normalize(embedding)
+        if matrix.shape[1] != query.shape[0]: # 임베딩 모델이 바뀐 경우
+            _count('misses')
+            return None
+
+        similarities = matrix @ query
+        best = int(np.argmax(similarities))
+        similarity = float(similarities[best])
+        if similarity < self.threshold:
+            _count('misses')
+            return None
+
+        entry = self._valid_entries().filter(pk=int(ids[best])).first()
+        if entry is None:
+            _count('misses')
+            return None
+        if not set(entry.chunk_ids) <= valid_chunk_ids:
+            entry.delete() # 근거 문서가 바뀜 → 다시 생성
+            _count('invalidated')
+            _count('misses')
+            return None
+
+        ChatAnswerCache.objects.filter(pk=entry.pk).update(hits=F('hits') + 1, last_used_at=timezone.now())
+        _count('hits')
+        return entry, similarity
+
+    def store(self, question, embedding, answer, sources, chunk_ids):
+        """답변 저장 후 최대 개수를 넘은 만큼 오래 사용하지 않은 답변 삭제"""
+        ChatAnswerCache.objects.create(
+            question=question,
+            embedding=np.asarray(embedding, dtype=np.float32).tobytes(),
+            answer=answer,
+            sources=sources,
+            chunk_ids=sorted(set(chunk_ids)),
+            last_used_at=timezone.now(),
+        )
+        _count('stores')
+
+        expired = ChatAnswerCache.objects.filter(
+            created_at__lt=timezone.now() - timedelta(seconds=self.ttl_seconds)
+        ).delete()[0]
+        _count('evictions', expired)
+
+        overflow = ChatAnswerCache.objects.count() - self.max_entries
+        if overflow > 0:
+            oldest = list(ChatAnswerCache.objects.order_by('last_used_at').values_list('pk', flat=True)[:overflow])
+            ChatAnswerCache.objects.filter(pk__in=oldest).delete()
+            _count('evictions', len(oldest))
+
+
+def invalidate_answers(removed_chunk_ids):
+    """없어진 문서 조각을 근거로 한 답변 삭제 (build_vectordb 에서 호출) → 삭제한 답변 수"""
+    removed = set(removed_chunk_ids)
+    if not removed:
+        return 0
+    stale = [
+        pk for pk, chunk_ids in ChatAnswerCache.objects.values_list('pk', 'chunk_ids')
+        if removed & set(chunk_ids)
+    ]
+    ChatAnswerCache.objects.filter(pk__in=stale).delete()
+    _count('invalidated', len(stale))
+    return len(stale)
+
+
+_answer_cache_instance = None
+_answer_cache_lock = threading.Lock()
+
+
+def get_answer_cache():
+    global _answer_cache_instance
+
+    if _answer_cache_instance is None:
+        with _answer_cache_lock:
+            if _answer_cache_instance is None:
+                _answer_cache_instance = AnswerCache(
+                    threshold=settings.CHATBOT_ANSWER_CACHE_THRESHOLD,
+                    ttl_seconds=settings.CHATBOT_ANSWER_CACHE_TTL,
+                    max_entries=settings.CHATBOT_ANSWER_CACHE_MAX_ENTRIES,
+                )
+    return _answer_cache_instance
+
+
+def get_answer_cache_stats():
+    """적중률 등 통계 (적중/미스는 현재 프로세스 기준, 항목 수는 DB 기준)"""
+    with _stats_lock:
+        stats = dict(_stats)
+
+    cache = get_answer_cache()
+    lookups = stats['hits'] + stats['misses']
+    return {
+        **stats,
+        'hit_ratio': round(stats['hits'] / lookups, 3) if lookups else 0,
+        'entries': ChatAnswerCache.objects.count(),
+        'threshold': cache.threshold,
+    }
@@ -1,6 +1,11 @@
 from django.db.models import Count, Sum
+from django.conf import settings
 from datetime import datetime, timedelta
 from base.models import Product, ProductView, OrderItem
+from base.services.product_scoring import encode_column, score_products, top_k_indices
+from base.services.product_feature_store import get_feature_store
+from base.services.item_similarity_service import get_similarity_index, SIMILAR
+import numpy as np
 
 class CandidateFilterService:
     def __init__(self, user, user_profile):
@@ -13,6 +18,16 @@ class CandidateFilterService:
         
         # 1. 기본 필터링: 재고 있고, 이미 구매하지 않은 상품
         excluded_products = self._get_excluded_products()
+
+        # 함께 본/구매한 상품(co-occurrence) 후보에 일부 자리를 배정 (취향 기반 후보와 겹치지 않게 제외 목록에 추가)
+        co_candidates = self._get_co_occurrence_candidates(excluded_products, limit)
+        limit -= len(co_candidates)
+        excluded_products = excluded_products + [product._id for product in co_candidates]
+
+        # 피처 스토어 사용 시: DB 조회 없이 메모리 스냅샷에서 필터링 + 점수 계산
+        if settings.PRODUCT_FEATURE_STORE_ENABLED:
+            final_candidates = self._select_from_feature_store(excluded_products, limit)
+            return self._remove_duplicates(self._interleave(final_candidates, co_candidates))
         
         base_candidates = (
             Product.objects
@@ -27,7 +42,7 @@ class CandidateFilterService:
         final_candidates = self._filter_by_brand_and_score(price_candidates, limit) # 브랜드 & 점수 계산
 
         # 3. 최종 중복 제거 (안전장치)
-        unique_candidates = self._remove_duplicates(final_candidates)
+        unique_candidates = self._remove_duplicates(self._interleave(final_candidates, co_candidates))
         
         return unique_candidates
 
@@ -138,44 +153,132 @@ class CandidateFilterService:
 
     # 각 상품에 종합 점수를 매겨서 순위를 정하고 상위 상품들만 선별 (개인화 점수 계산 + 최종 랭킹)
     def _filter_by_brand_and_score(self, queryset, limit):
-        """브랜드 선호도 반영하여 점수 계산 및 정렬"""
+        """브랜드 선호도 반영하여 점수 계산 및 정렬 (NumPy 벡터화)"""
         brand_prefs = self.profile.get('brand_preferences', {})
         category_prefs = self.profile.get('category_preferences', {})
-        
-        scored_products = []
-        
-        for product in queryset:
-            # 1단계: 기본 점수 (모든 상품) -> 모든 상품이 최소한의 점수를 갖도록
-            score = 0.0
-            score += 10.0
-            
-            # 2단계: 카테고리 점수 (개인화)
-            if product.category in category_prefs:
-                category_score = float(category_prefs[product.category]) * 0.5
-                score += category_score
-            
-            # 3단계: 브랜드 점수 (개인화 + 상한 제한)
-            if product.brand in brand_prefs:
-                brand_score = min(float(brand_prefs[product.brand]) * 3.0, 50.0)
-                score += brand_score
-            
-            # 4단계: 인기도 점수 (객관적 지표)
-            if product.numReviews > 0:
-                review_score = min(float(product.numReviews) * 0.5, 15.0) # 리뷰 수
-                rating_score = float(product.rating) * 3.0  # 평점
-                popularity_score = review_score + rating_score
-                score += popularity_score
-            
-            scored_products.append({
-                'product': product,
-                'score': score
-            })
-        
-        # 점수 높은 순으로 정렬
-        scored_products.sort(key=lambda x: x['score'], reverse=True)
-        
-        # 상위 결과 출력
-        for i, item in enumerate(scored_products[:5]):
-            product = item['product']
-        
-        return [item['product'] for item in scored_products[:limit]]
\ No newline at end of file
+
+        # 1단계: 점수 계산에 필요한 컬럼만 조회 (ORM 객체 생성 없음)
+        rows = list(queryset.values_list('_id', 'category', 'brand', 'numReviews', 'rating'))
+        if not rows:
+            return []
+
+        ids, categories, brands, num_reviews, ratings = zip(*rows)
+
+        # 2단계: 컬럼 배열로 변환 후 한 번에 점수 계산
+        category_codes, category_vocab = encode_column(categories)
+        brand_codes, brand_vocab = encode_column(brands)
+        scores = score_products(
+            category_codes, category_vocab,
+            brand_codes, brand_vocab,
+            np.fromiter((n or 0 for n in num_reviews), dtype=np.float64, count=len(rows)),
+            np.fromiter((r or 0 for r in ratings), dtype=np.float64, count=len(rows)),
+            category_prefs, brand_prefs,
+        )
+
+        # 3단계: 상위 limit개만 선택 (전체 정렬 없음)
+        winner_ids = [ids[i] for i in top_k_indices(scores, limit)]
+
+        # 4단계: 선택된 상품만 Product 객체로 조회 (점수 순서 유지)
+        products = Product.objects.in_bulk(winner_ids)
+        return [products[product_id] for product_id in winner_ids if product_id in products]
+
+
+
+    # 피처 스토어(컬럼 배열)에서 카테고리 → 가격 → 점수 순으로 후보 선별 (위 DB 기반 단계와 같은 규칙)
+    def _select_from_feature_store(self, excluded_products, limit):
+        """메모리 스냅샷 기반 후보 선별"""
+        snapshot = get_feature_store().snapshot()
+        category_prefs = self.profile.get('category_preferences', {})
+        price_prefs = self.profile.get('price_range', {})
+
+        # 기본 배열 + delta 보조 테이블을 같은 규칙으로 필터링 (개수 기준은 두 조각 합계)
+        parts = snapshot.parts()
+        total = lambda masks: sum(int(mask.sum()) for mask in masks)
+
+        # 1단계: 재고 있는 상품 중 구매하지 않은 상품
+        excluded_ids = np.array([pid for pid in excluded_products if pid is not None], dtype=np.int64)
+        masks = [live & ~np.isin(part.ids, excluded_ids) for part, live in parts]
+
+        # 2단계: 카테고리 필터 (선호 카테고리 10개 미만이면 다른 카테고리 10개 추가)
+        if category_prefs:
+            preferred_codes = snapshot.codes_for(snapshot.categories, category_prefs.keys())
+            preferred = [mask & np.isin(part.category_codes, preferred_codes) for (part, _), mask in zip(parts, masks)]
+            if total(preferred) < 10:
+                remaining = 10
+                for mask, chosen in zip(masks, preferred):
+                    others = np.flatnonzero(mask & ~chosen)[:remaining]
+                    chosen[others] = True
+                    remaining -= len(others)
+            masks = preferred
+
+        # 3단계: 가격 필터 (±50% → 20%~300% → 제한 없음)
+        if price_prefs and price_prefs.get('avg', 0) != 0:
+            avg_price = float(price_prefs['avg'])
+            for low, high, minimum in ((0.5, 1.5, 5), (0.2, 3.0, 3)):
+                in_range = [
+                    mask & (part.price >= avg_price * low) & (part.price <= avg_price * high)
+                    for (part, _), mask in zip(parts, masks)
+                ]
+                if total(in_range) >= minimum:
+                    masks = in_range
+                    break
+
+        # 4단계: 남은 상품 점수 계산 후 상위 limit개
+        candidate_ids, scores = [], []
+        for (part, _), mask in zip(parts, masks):
+            indices = np.flatnonzero(mask)
+            candidate_ids.append(part.ids[indices])
+            scores.append(score_products(
+                part.category_codes[indices], snapshot.categories,
+                part.brand_codes[indices], snapshot.brands,
+                part.num_reviews[indices], part.rating[indices],
+                category_prefs, self.profile.get('brand_preferences', {}),
+            ))
+        candidate_ids, scores = np.concatenate(candidate_ids), np.concatenate(scores)
+        winner_ids = [int(candidate_ids[i]) for i in top_k_indices(scores, limit)]
+
+        # 5단계: 선택된 상품만 Product 객체로 조회
+        products = Product.objects.in_bulk(winner_ids)
+        return [products[product_id] for product_id in winner_ids if product_id in products]
+
+
+
+    # 상위 후보(LLM에 전달되는 앞쪽 후보)에도 co-occurrence 후보가 포함되도록 섞기
+    def _interleave(self, primary, secondary, every=3):
+        """primary 3개마다 secondary 1개씩 끼워넣기"""
+        result = []
+        secondary = list(secondary)
+        for i, product in enumerate(primary, 1):
+            result.append(product)
+            if i % every == 0 and secondary:
+                result.append(secondary.pop(0))
+        return result + secondary
+
+
+
+    # 사용자가 최근 본 상품/구매한 상품과 함께 자주 조회·구매된 상품을 추가 후보로 선별
+    def _get_co_occurrence_candidates(self, excluded_products, limit):
+        """상품-상품 유사도 행렬 기반 후보 (행렬이 없으면 빈 리스트)"""
+        slots = min(settings.CO_OCCURRENCE_CANDIDATES, limit // 2)
+        index = get_similarity_index(SIMILAR)
+        if slots <= 0 or not index.is_loaded():
+            return []
+
+        # 1단계: 기준 상품 = 최근 본 상품 20개 + 구매한 상품
+        recent_viewed = list(
+            ProductView.objects
+            .filter(user=self.user)
+            .order_by('-last_viewed')
+            .values_list('product_id', flat=True)[:20]
+        )
+        seeds = recent_viewed + [pid for pid in excluded_products if pid is not None]
+
+        # 2단계: 유사 상품 점수 합산 (구매한 상품 제외)
+        neighbors = index.neighbors_for_many(seeds, k=slots * 3, exclude=excluded_products)
+        if not neighbors:
+            return []
+
+        # 3단계: 재고 있는 상품만 유사도 순으로 slots개
+        neighbor_ids = [product_id for product_id, _ in neighbors]
+        products = Product.objects.filter(_id__in=neighbor_ids, countInStock__gt=0).in_bulk()
+        return [products[product_id] for product_id in neighbor_ids if product_id in products][:slots]
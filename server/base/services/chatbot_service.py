@@ -1,15 +1,25 @@
 # 챗봇이 참고할 문서 데이터베이스(Vector DB)를 만들고 관리하는 서비스 모듈
 # - Markdown 문서를 읽어서 벡터화(임베딩)하고
-# - 메모리 기반 Chroma DB에 저장하여
+# - 디스크 기반 Chroma DB(CHROMA_PERSIST_DIR)에 저장하여
 # - 챗봇 질의 시 유사 문서 검색에 활용한다.
+# - 조각(청크) ID는 내용 해시이므로 build_vectordb 명령은 바뀐 조각만 새로 임베딩하고 사라진 조각은 삭제한다.
+# - 워커는 저장된 인덱스를 읽기 전용으로 열고, 다시 빌드되면(VERSION 파일 변경) 새로 연다.
+# - 문서 조각과 질문 임베딩은 모두 임베딩 캐시(embedding_cache_service)를 거친다.
+# - 조각이 바뀌거나 삭제되면 그 조각을 근거로 한 챗봇 답변 캐시(answer_cache_service)도 삭제한다.
 
+import hashlib
+import json
 import os
+import threading
+import time
+from collections import deque
 from pathlib import Path
 from langchain.text_splitter import MarkdownHeaderTextSplitter
 from langchain_chroma import Chroma
-from langchain_openai import OpenAIEmbeddings
 from langchain.schema import Document
 from django.conf import settings
+from base.services.embedding_cache_service import get_cached_embeddings
+from base.services.answer_cache_service import invalidate_answers
 import logging
 
 # 로깅 설정
@@ -19,9 +29,22 @@ logger = logging.getLogger(__name__)
 BASE_DIR = Path(settings.BASE_DIR)
 DOCS_PATH = BASE_DIR / "docs"
 
-# 전역 벡터DB 인스턴스 (메모리에만 저장)
+COLLECTION_NAME = "support_docs"
+EMBEDDING_MODEL = "text-embedding-ada-002"
+VERSION_FILE = "VERSION" # 마지막 빌드 정보 (워커가 변경 여부를 확인하는 파일)
+
+# 전역 벡터DB 인스턴스 (워커 단위, 디스크 인덱스를 읽기 전용으로 사용)
 _vectordb_instance = None
 _is_initialized = False
+_opened_version = None # 현재 열려있는 인덱스의 VERSION 내용
+_chunk_ids = (None, frozenset()) # (VERSION, 인덱스에 있는 조각 해시)
+_vectordb_lock = threading.Lock()
+
+# 답변 경로별(faq / answer_cache / llm) 응답 수와 최근 응답 시간 (프로세스 단위)
+SERVED_PATHS = ("faq", "answer_cache", "llm")
+_served = {path: deque(maxlen=500) for path in SERVED_PATHS}
+_served_counts = {path: 0 for path in SERVED_PATHS}
+_served_lock = threading.Lock()
 
 def check_docs_folder():
     """
@@ -32,35 +55,30 @@ def check_docs_folder():
     if not DOCS_PATH.exists():
         logger.error(f"❌ Docs 폴더가 없습니다: {DOCS_PATH}")
         return False, []
-    
+
     md_files = list(DOCS_PATH.glob("*.md"))
     if not md_files:
         logger.error(f"❌ {DOCS_PATH}에 .md 파일이 없습니다")
         return False, []
-    
+
     logger.info(f"✅ 발견된 MD 파일들: {[f.name for f in md_files]}")
     return True, md_files
 
-def build_vector_db(force_rebuild=False):
+def chunk_id(source, content, headers=""):
+    """조각 ID = sha256(파일명 + 헤더 + 내용) - 내용이 같으면 다시 임베딩하지 않음"""
+    return hashlib.sha256(f"{source}\n{headers}\n{content}".encode("utf-8")).hexdigest()
+
+def load_documents():
     """
-    📌 .md 파일들을 읽어서 메모리 기반 벡터DB를 생성하는 함수
-    - Markdown 문서를 헤더 단위(#, ##, ###)로 쪼갬
+    📌 .md 파일들을 헤더 단위(#, ##, ###)로 쪼개서 {조각 ID: Document} 반환
     - 조각을 Document 객체로 변환하고 메타데이터(source, chunk_id, headers) 부여
-    - OpenAI Embeddings으로 벡터화하여 메모리 기반 Chroma DB 생성
     """
-    global _vectordb_instance, _is_initialized
-    
-    # 이미 초기화되었고 강제 재빌드가 아니면 기존 인스턴스 반환
-    if _is_initialized and not force_rebuild:
-        logger.info("✅ 기존 메모리 벡터DB 사용")
-        return _vectordb_instance
-    
     # docs 폴더와 md 파일 존재 여부 확인
     folder_exists, md_files = check_docs_folder()
     if not folder_exists:
         raise FileNotFoundError(f"Docs 폴더를 찾을 수 없습니다: {DOCS_PATH}")
-    
-    docs = []
+
+    docs = {}
     splitter = MarkdownHeaderTextSplitter(
         headers_to_split_on=[
             ("#", "header1"),
@@ -68,17 +86,17 @@ def build_vector_db(force_rebuild=False):
             ("###", "header3"),
         ]
     )
-    
+
     # 각 md 파일을 읽어서 분할 → Document 객체로 변환
     for file_path in md_files:
         try:
             with open(file_path, "r", encoding="utf-8") as f:
                 text = f.read()
-            
+
             if not text.strip():
                 logger.warning(f"⚠️ 빈 파일: {file_path.name}")
                 continue
-            
+
             split_docs = splitter.split_text(text) # 헤더 단위로 텍스트 분리
             for i, doc in enumerate(split_docs):
                 if isinstance(doc, str): # 문자열인 경우와 Document 객체인 경우 모두 처리
@@ -93,68 +111,215 @@ def build_vector_db(force_rebuild=False):
                         "source": file_path.name,
                         "chunk_id": i
                     }
-                    if hasattr(doc, 'metadata') and 'headers' in doc.metadata: # Document.metadata에 headers가 있으면 문자열로 변환
-                        headers = doc.metadata.get('headers', {})
+                    if hasattr(doc, 'metadata') and doc.metadata: # Document.metadata의 헤더(header1~3)를 문자열로 변환
+                        headers = {k: v for k, v in doc.metadata.items() if k.startswith('header')}
                         if headers:
                             header_str = ", ".join([f"{k}: {v}" for k, v in headers.items() if v]) # 딕셔너리를 문자열로 변환
                             if header_str:
                                 metadata["headers"] = header_str
-                
-                docs.append(Document( # LangChain Document 객체 생성
+
+                doc_id = chunk_id(file_path.name, content, metadata.get("headers", ""))
+                docs[doc_id] = Document( # LangChain Document 객체 생성 (같은 내용의 조각은 하나만)
                     page_content=content,
                     metadata=metadata
-                ))
-            
+                )
+
             logger.info(f"✅ {file_path.name} 처리 완료 ({len(split_docs)}개 청크)")
-            
+
         except Exception as e:
             logger.error(f"❌ {file_path.name} 처리 실패: {e}")
-    
+
     if not docs:
         raise ValueError("처리된 문서가 없습니다. MD 파일 내용을 확인하세요.")
-    
+
     logger.info(f"📊 총 {len(docs)}개의 문서 청크 생성")
-    
-    # OpenAI 임베딩을 이용해 메모리 기반 Chroma DB 생성
+    return docs
+
+def _persist_dir():
+    return Path(settings.CHROMA_PERSIST_DIR)
+
+def _read_version():
+    """VERSION 파일 내용 (아직 빌드된 적 없으면 None)"""
     try:
-        api_key = os.environ.get("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError("❌ OPENAI_API_KEY가 환경변수에 설정되지 않았습니다.")
+        return (_persist_dir() / VERSION_FILE).read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return None
 
-        embeddings = OpenAIEmbeddings(api_key=api_key)
+def _open_chroma():
+    """디스크 인덱스 열기 (이전에 연 클라이언트 캐시를 비워서 다른 프로세스가 빌드한 내용을 다시 읽음)"""
+    import chromadb
+    from chromadb.api.client import SharedSystemClient
+    from chromadb.config import Settings
 
-        _vectordb_instance = Chroma.from_documents(
-            documents=docs,
-            embedding=embeddings
-        )
+    api_key = os.environ.get("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("❌ OPENAI_API_KEY가 환경변수에 설정되지 않았습니다.")
+
+    SharedSystemClient.clear_system_cache()
+    client = chromadb.PersistentClient(
+        path=str(_persist_dir()),
+        settings=Settings(anonymized_telemetry=False),
+    )
+    return Chroma(
+        client=client,
+        collection_name=COLLECTION_NAME,
+        embedding_function=get_cached_embeddings(model=EMBEDDING_MODEL, api_key=api_key), # 임베딩 캐시 + 공용 연결 풀
+    )
+
+def build_vector_db(force_rebuild=False):
+    """
+    📌 docs 조각을 디스크 벡터DB에 반영 (build_vectordb 명령에서 실행) → (벡터DB, 요약)
+    - 새로 생기거나 바뀐 조각만 OpenAI Embeddings으로 벡터화해서 추가
+    - docs에서 사라진 조각은 삭제
+    - force_rebuild=True 이면 전부 지우고 다시 임베딩
+    """
+    global _vectordb_instance, _is_initialized, _opened_version
+
+    docs = load_documents()
+    _persist_dir().mkdir(parents=True, exist_ok=True)
+
+    started = time.perf_counter()
+    try:
+        vectordb = _open_chroma()
+
+        # 임베딩 모델이 바뀌었으면 기존 벡터와 섞을 수 없으므로 전부 다시 임베딩
+        version = _read_version()
+        if version and json.loads(version).get("embedding_model") != EMBEDDING_MODEL:
+            force_rebuild = True
+
+        existing = set(vectordb.get(include=[])["ids"])
+        removed = existing - set(docs) # docs에서 사라지거나 내용이 바뀐 조각
+        if force_rebuild and existing:
+            vectordb.delete(ids=list(existing))
+            existing = set()
+
+        to_add = [doc_id for doc_id in docs if doc_id not in existing]
+        to_delete = [doc_id for doc_id in existing if doc_id not in docs]
+
+        if to_add:
+            vectordb.add_documents([docs[doc_id] for doc_id in to_add], ids=to_add)
+        if to_delete:
+            vectordb.delete(ids=to_delete)
 
-        _is_initialized = True
-        logger.info("✅ 메모리 기반 벡터DB 생성 완료")
-        return _vectordb_instance
-        
     except Exception as e:
         logger.error(f"❌ 벡터DB 생성 실패: {e}")
-        _vectordb_instance = None
-        _is_initialized = False
         raise
 
+    # 바뀐 조각을 근거로 한 답변 캐시 삭제
+    invalidated = invalidate_answers(removed)
+
+    summary = {
+        "chunks": len(docs),
+        "added": len(to_add),
+        "deleted": len(to_delete),
+        "unchanged": len(docs) - len(to_add),
+        "invalidated_answers": invalidated,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+    # 바뀐 내용이 있으면 VERSION 갱신 → 워커가 다음 요청에서 인덱스를 다시 엶
+    if to_add or to_delete or _read_version() is None:
+        version = json.dumps({"built_at": time.time(), "embedding_model": EMBEDDING_MODEL, **summary})
+        tmp = _persist_dir() / f"{VERSION_FILE}.tmp"
+        tmp.write_text(version, encoding="utf-8")
+        os.replace(tmp, _persist_dir() / VERSION_FILE)
+
+    with _vectordb_lock:
+        _vectordb_instance, _is_initialized, _opened_version = vectordb, True, _read_version()
+
+    logger.info(f"✅ 벡터DB 반영 완료 {summary}")
+    return vectordb, summary
+
 def get_vector_db():
     """
     📌 벡터DB 인스턴스를 반환하는 함수
-    - 이미 초기화된 DB가 있으면 그대로 반환
-    - 초기화되지 않았거나 무효화되면 build_vector_db()로 새로 생성
+    - 저장된 인덱스를 열어서 재사용 (임베딩 호출 없음)
+    - build_vectordb 로 다시 빌드되었으면(VERSION 변경) 새로 열기
+    - 아직 빌드된 적이 없으면 이 워커에서 한 번 빌드
     """
-    global _vectordb_instance, _is_initialized
-    
-    # 이미 초기화되어 있으면 기존 인스턴스 반환
-    if _is_initialized and _vectordb_instance:
-        try:
-            _vectordb_instance._collection.count() # 간단한 검증 (DB 접근 가능 여부)
+    global _vectordb_instance, _is_initialized, _opened_version
+
+    version = _read_version()
+    if _is_initialized and _vectordb_instance is not None and version == _opened_version:
+        return _vectordb_instance
+
+    with _vectordb_lock:
+        version = _read_version()
+        if _is_initialized and _vectordb_instance is not None and version == _opened_version:
             return _vectordb_instance
-        except:
-            logger.warning("⚠️ 기존 인스턴스 무효, 재생성")
-            _is_initialized = False
-    
+
+        if version is not None:
+            logger.info(f"📂 저장된 벡터DB 열기: {_persist_dir()}")
+            _vectordb_instance, _is_initialized, _opened_version = _open_chroma(), True, version
+            return _vectordb_instance
+
     # 초기화되지 않았으면 새로 생성
-    logger.info("📂 메모리 기반 벡터DB 초기화 중...")
-    return build_vector_db()
\ No newline at end of file
+    logger.warning("⚠️ 저장된 벡터DB가 없어서 새로 생성합니다. (배포 시 build_vectordb 명령을 먼저 실행하세요)")
+    vectordb, _ = build_vector_db()
+    return vectordb
+
+def document_chunk_id(doc):
+    """검색된 Document의 조각 해시 (load_documents 와 같은 규칙)"""
+    return chunk_id(doc.metadata.get("source", ""), doc.page_content, doc.metadata.get("headers", ""))
+
+def get_chunk_ids():
+    """현재 열려있는 인덱스의 조각 해시 집합 (인덱스가 다시 빌드될 때만 새로 읽음)"""
+    global _chunk_ids
+
+    vectordb = get_vector_db()
+    version, ids = _chunk_ids
+    if version != _opened_version:
+        ids = frozenset(vectordb.get(include=[])["ids"])
+        _chunk_ids = (_opened_version, ids)
+    return ids
+
+def warm_up_vector_db():
+    """워커 시작 시 저장된 인덱스 열기 (gunicorn post_worker_init) - 빌드된 적 없으면 아무것도 하지 않음"""
+    if _read_version() is None:
+        return False
+    get_vector_db()
+    return True
+
+def get_vector_db_status():
+    """벡터DB 상태 (챗봇 상태 API용)"""
+    version = _read_version()
+    return {
+        "persist_dir": str(_persist_dir()),
+        "built": json.loads(version) if version else None,
+        "opened": _is_initialized and _opened_version == version,
+        "document_count": _vectordb_instance._collection.count() if _is_initialized and _vectordb_instance else 0,
+    }
+
+def test_retrieval(query, k=3):
+    """
+    📌 검색 확인용 함수 (build_vectordb --test)
+    - 질문과 유사한 문서 조각 k개 반환
+    """
+    vectordb = get_vector_db()
+    results = vectordb.similarity_search(query, k=k)
+    for doc in results:
+        logger.info(f"🔎 {doc.metadata.get('source')} #{doc.metadata.get('chunk_id')}: {doc.page_content[:50]}")
+    return results
+
+def record_served(path, seconds):
+    """챗봇 응답 1건 기록 (path: faq | answer_cache | llm)"""
+    with _served_lock:
+        _served_counts[path] += 1
+        _served[path].append(seconds)
+
+def get_served_stats():
+    """답변 경로별 응답 수 + 응답 시간 p50/p95 (챗봇 상태 API용)"""
+    with _served_lock:
+        counts = dict(_served_counts)
+        durations = {path: sorted(values) for path, values in _served.items()}
+
+    stats = {}
+    for path in SERVED_PATHS:
+        values = durations[path]
+        pick = lambda q: round(values[min(len(values) - 1, int(q * len(values)))], 4)
+        stats[path] = {
+            "count": counts[path],
+            "p50": pick(0.5) if values else None,
+            "p95": pick(0.95) if values else None,
+        }
+    return stats
@@ -0,0 +1,203 @@
+# 임베딩 캐시 모듈
+# - 같은 텍스트를 다시 임베딩하지 않도록 (모델, sha256(텍스트)) → float32 벡터를 SQLite 파일에 저장한다.
+# - 벡터DB 빌드(문서 조각)와 챗봇 질문(검색어) 모두 CachedEmbeddings 를 거치므로
+#   --force 재빌드나 자주 들어오는 같은 질문은 OpenAI 호출 없이 처리된다.
+# - 파일은 워커 프로세스들이 공유한다 (WAL 모드, 스레드마다 별도 연결).
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+import numpy as np
+from django.conf import settings
+from langchain_core.embeddings import Embeddings
+from base.services.ai_clients import get_embeddings
+
+# 한 번에 조회하는 최대 키 수 (SQLite 변수 개수 제한)
+LOOKUP_BATCH = 500
+# 이 횟수만큼 저장할 때마다 최대 항목 수 초과분 정리
+PRUNE_EVERY = 1000
+
+# 프로세스 단위 통계
+_stats = {'query_hits': 0, 'query_misses': 0, 'document_hits': 0, 'document_misses': 0, 'stored': 0, 'pruned': 0}
+_stats_lock = threading.Lock()
+
+
+def _count(**values):
+    with _stats_lock:
+        for name, n in values.items():
+            _stats[name] += n
+
+
+def text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """(모델, 텍스트 해시) → float32 벡터 저장소"""
+
+    def __init__(self, path, max_entries=100000):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self._local = threading.local() # 스레드별 SQLite 연결
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL") # 읽기와 쓰기가 서로 막지 않도록
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " model TEXT NOT NULL, text_hash TEXT NOT NULL, vector BLOB NOT NULL, created_at REAL NOT NULL,"
+                " PRIMARY KEY (model, text_hash))"
+            )
+            self._local.conn = conn
+        return conn
+
+    def get_many(self, model, hashes):
+        """{텍스트 해시: 벡터(list)} - 없는 항목은 빠짐"""
+        found = {}
+        conn = self._connection()
+        unique = list(dict.fromkeys(hashes))
+        for i in range(0, len(unique), LOOKUP_BATCH):
+            batch = unique[i:i + LOOKUP_BATCH]
+            rows = conn.execute(
+                f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({','.join('?' * len(batch))})",
+                [model, *batch],
+            )
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+        return found
+
+    def put_many(self, model, items):
+        """[(텍스트 해시, 벡터)] 저장"""
+        if not items:
+            return
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, created_at) VALUES (?, ?, ?, ?)",
+                [(model, key, np.asarray(vector, dtype=np.float32).tobytes(), now) for key, vector in items],
+            )
+        _count(stored=len(items))
+
+        with self._writes_lock:
+            self._writes += len(items)
+            prune = self._writes >= PRUNE_EVERY
+            if prune:
+                self._writes = 0
+        if prune:
+            self.prune()
+
+    def prune(self):
+        """최대 항목 수를 넘으면 오래된 항목부터 삭제"""
+        conn = self._connection()
+        total = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        overflow = total - self.max_entries
+        if overflow > 0:
+            with conn:
+                conn.execute(
+                    "DELETE FROM embeddings WHERE rowid IN (SELECT rowid FROM embeddings ORDER BY created_at LIMIT ?)",
+                    (overflow,),
+                )
+            _count(pruned=overflow)
+
+    def entry_count(self):
+        return self._connection().execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    LangChain Embeddings 래퍼
+    - 캐시에 있는 텍스트는 저장된 벡터 사용, 없는 텍스트만 원래 임베딩 객체로 한 번에 요청
+    """
+
+    def __init__(self, embeddings, model, cache):
+        self.embeddings = embeddings
+        self.model = model
+        self.cache = cache
+
+    def embed_documents(self, texts):
+        hashes = [text_hash(text) for text in texts]
+        found = self.cache.get_many(self.model, hashes)
+
+        # 캐시에 없는 텍스트만 임베딩 (같은 텍스트는 한 번만)
+        missing = {}
+        for text, key in zip(texts, hashes):
+            if key not in found:
+                missing.setdefault(key, text)
+        if missing:
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            new = list(zip(missing.keys(), vectors))
+            self.cache.put_many(self.model, new)
+            found.update(new)
+
+        _count(document_hits=len(texts) - len(missing), document_misses=len(missing))
+        return [found[key] for key in hashes]
+
+    def embed_query(self, text):
+        key = text_hash(text)
+        found = self.cache.get_many(self.model, [key])
+        if key in found:
+            _count(query_hits=1)
+            return found[key]
+
+        vector = self.embeddings.embed_query(text)
+        self.cache.put_many(self.model, [(key, vector)])
+        _count(query_misses=1)
+        return vector
+
+
+_cache_instance = None
+_cached_embeddings = {} # {(모델, api_key): CachedEmbeddings}
+_lock = threading.Lock()
+
+
+def get_embedding_cache():
+    global _cache_instance
+
+    if _cache_instance is None:
+        with _lock:
+            if _cache_instance is None:
+                _cache_instance = EmbeddingCache(
+                    settings.EMBEDDING_CACHE_PATH,
+                    max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES,
+                )
+    return _cache_instance
+
+
+def get_cached_embeddings(model="text-embedding-ada-002", api_key=None):
+    """공용 OpenAIEmbeddings(get_embeddings)를 감싼 캐시 임베딩 (같은 설정이면 같은 인스턴스)"""
+    key = (model, api_key)
+    if key not in _cached_embeddings:
+        embeddings = get_embeddings(model=model, api_key=api_key)
+        cache = get_embedding_cache()
+        with _lock:
+            if key not in _cached_embeddings:
+                _cached_embeddings[key] = CachedEmbeddings(embeddings, model, cache)
+    return _cached_embeddings[key]
+
+
+def get_embedding_cache_stats():
+    """적중률 등 통계 (적중/미스는 현재 프로세스 기준, 항목 수는 파일 기준)"""
+    with _stats_lock:
+        stats = dict(_stats)
+
+    hits = stats['query_hits'] + stats['document_hits']
+    lookups = hits + stats['query_misses'] + stats['document_misses']
+    queries = stats['query_hits'] + stats['query_misses']
+    cache = get_embedding_cache()
+    return {
+        **stats,
+        'hit_ratio': round(hits / lookups, 3) if lookups else 0,
+        'query_hit_ratio': round(stats['query_hits'] / queries, 3) if queries else 0,
+        'entries': cache.entry_count(),
+        'max_entries': cache.max_entries,
+        'path': str(cache.path),
+    }
@@ -0,0 +1,171 @@
+# 상담 챗봇 FAQ 바로 답변 모듈
+# - docs/faq.md 의 "## 질문" + 본문 쌍을 워커마다 한 번 읽어서 정규화한 질문 키 색인으로 만든다.
+#   (faq.md 가 바뀌면(수정 시각 변경) 다음 질문에서 다시 만듦)
+# - 질문 키가 같거나, 유사도가 CHATBOT_FAQ_MATCH_THRESHOLD 이상이고 두 번째 후보보다 충분히 높으면
+#   임베딩/검색/GPT 호출 없이 FAQ 본문을 그대로 답변한다.
+# - 키는 "어떻게", "~하나요" 같은 질문 틀을 뺀 내용 부분만 비교한다.
+#   ("쿠폰은 어떻게 받나요?" 와 "쿠폰은 어떻게 사용하나요?" 가 틀 때문에 비슷해 보이지 않도록)
+# - 글자 유사도만으로는 "비회원으로도 환불할 수 있나요?" 가 "비회원으로도 구매할 수 있나요?" 와 비슷하게 나오므로
+#   양쪽의 내용 단어(조사/어미를 뗀 2글자 이상 단어)가 모두 상대 키에 들어 있어야 FAQ로 답한다.
+
+import logging
+import re
+import threading
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from django.conf import settings
+from base.services.chatbot_service import DOCS_PATH
+
+logger = logging.getLogger(__name__)
+
+FAQ_PATH = DOCS_PATH / "faq.md"
+
+# 1등과 2등 후보의 유사도 차이가 이보다 작으면 애매한 질문으로 보고 LLM 으로 답변
+MIN_MARGIN = 0.1
+
+_QUESTION_WORDS = {"어떻게", "어디서", "어디에서", "어디", "언제", "얼마나", "무엇", "뭐", "혹시", "좀"}
+_QUESTION_ENDING_RE = re.compile(r"(하나요|되나요|있나요|인가요|습니까|니까|나요|까요|해요|가요|요)$")
+_PUNCT_RE = re.compile(r"[^0-9a-z가-힣\s]")
+_JOSA_RE = re.compile(r"(으로도|으로|에서|에게|까지|부터|은|는|이|가|을|를|로|도|에|의|와|과|만)$")
+_VERB_ENDING_RE = re.compile(r"(하는|할|한|해|하|되는|될|된)$")
+
+_index = None
+_index_mtime = None
+_index_lock = threading.Lock()
+
+# 프로세스 단위 통계
+_stats = {'lookups': 0, 'hits': 0, 'exact_hits': 0, 'ambiguous': 0, 'word_mismatch': 0}
+_stats_lock = threading.Lock()
+
+
+def _count(name, n=1):
+    with _stats_lock:
+        _stats[name] += n
+
+
+def _question_words(text):
+    words = [word for word in _PUNCT_RE.sub(" ", text.lower()).split() if word not in _QUESTION_WORDS]
+    if words:
+        words[-1] = _QUESTION_ENDING_RE.sub("", words[-1])
+    return [word for word in words if word]
+
+
+def question_key(text):
+    """비교용 질문 키: 소문자, 문장부호/공백/질문 틀 제거 ("회원가입은 어떻게 하나요?" → "회원가입은")"""
+    return "".join(_question_words(text))
+
+
+def content_words(text):
+    """내용 단어: 질문 틀을 뺀 단어에서 조사/어미를 떼고 2글자 이상만 ("비회원으로도 구매할 수 있나요?" → 비회원, 구매)"""
+    stems = []
+    for word in _question_words(text):
+        word = _VERB_ENDING_RE.sub("", _JOSA_RE.sub("", word))
+        if len(word) >= 2:
+            stems.append(word)
+    return frozenset(stems)
+
+
+@dataclass(frozen=True)
+class FAQEntry:
+    question: str
+    answer: str
+    key: str
+    words: frozenset
+
+
+@dataclass(frozen=True)
+class FAQMatch:
+    entry: FAQEntry
+    score: float
+
+
+def parse_faq(text):
+    """faq.md → [FAQEntry] ("## " 헤더가 질문, 다음 헤더나 "---" 전까지가 답변)"""
+    entries = []
+    for section in re.split(r"^## ", text, flags=re.MULTILINE)[1:]:
+        question, _, body = section.partition("\n")
+        body = re.split(r"^(?:---+|# )", body, flags=re.MULTILINE)[0]
+        answer = "\n".join(line.rstrip() for line in body.strip().splitlines())
+        if question.strip() and answer:
+            entries.append(FAQEntry(
+                question=question.strip(), answer=answer, key=question_key(question), words=content_words(question),
+            ))
+    return entries
+
+
+class FAQIndex:
+    """정규화한 질문 키 → FAQ (같은 키는 바로 찾고, 나머지는 키 유사도로 비교)"""
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.by_key = {entry.key: entry for entry in entries if entry.key}
+
+    def match(self, question, threshold):
+        """
+        가장 비슷한 FAQ → FAQMatch 또는 None
+        - 유사도가 기준 미만이거나, 2등과 차이가 작거나, 내용 단어가 서로 맞지 않으면 None
+        """
+        key = question_key(question)
+        if not key:
+            return None
+        if key in self.by_key:
+            _count('exact_hits')
+            return FAQMatch(self.by_key[key], 1.0)
+
+        scores = sorted(
+            ((SequenceMatcher(None, key, entry.key).ratio(), entry) for entry in self.entries),
+            key=lambda item: item[0], reverse=True,
+        )
+        if not scores or scores[0][0] < threshold:
+            return None
+        if len(scores) > 1 and scores[0][0] - scores[1][0] < MIN_MARGIN:
+            _count('ambiguous')
+            return None
+
+        score, entry = scores[0]
+        words = content_words(question)
+        if not all(word in entry.key for word in words) or not all(word in key for word in entry.words):
+            _count('word_mismatch')
+            return None
+        return FAQMatch(entry, score)
+
+
+def get_faq_index():
+    """faq.md 색인 (워커 단위, 파일이 바뀌면 다시 만듦 - faq.md 가 없으면 빈 색인)"""
+    global _index, _index_mtime
+
+    try:
+        mtime = FAQ_PATH.stat().st_mtime
+    except FileNotFoundError:
+        mtime = None
+    if _index is not None and mtime == _index_mtime:
+        return _index
+
+    with _index_lock:
+        if _index is None or mtime != _index_mtime:
+            entries = parse_faq(FAQ_PATH.read_text(encoding="utf-8")) if mtime is not None else []
+            _index, _index_mtime = FAQIndex(entries), mtime
+            logger.info(f"✅ FAQ 색인 생성 ({len(entries)}개 질문)")
+    return _index
+
+
+def match_faq(question):
+    """📌 FAQ로 바로 답할 수 있는 질문이면 FAQMatch, 아니면 None"""
+    _count('lookups')
+    matched = get_faq_index().match(question, settings.CHATBOT_FAQ_MATCH_THRESHOLD)
+    if matched is not None:
+        _count('hits')
+    return matched
+
+
+def get_faq_stats():
+    """FAQ 적중 통계 (현재 프로세스 기준)"""
+    with _stats_lock:
+        stats = dict(_stats)
+
+    return {
+        **stats,
+        'hit_ratio': round(stats['hits'] / stats['lookups'], 3) if stats['lookups'] else 0,
+        'entries': len(get_faq_index().entries),
+        'threshold': settings.CHATBOT_FAQ_MATCH_THRESHOLD,
+    }
@@ -0,0 +1,204 @@
+# 비전 모델 호출 전 이미지 전처리 모듈
+# - 휴대폰 사진(수 MB, 4000px 이상)을 그대로 보내면 요청 크기, 업로드 시간, 비전 토큰이 모두 커진다.
+# - Pillow로 회전 정보 반영(exif_transpose) → 긴 변 VISION_IMAGE_MAX_SIDE 로 축소 → EXIF 제거 → WebP/JPEG 재인코딩
+# - 결과는 원본 내용 해시 + 설정값을 키로 var/vision_images 에 저장해두고 재사용한다.
+#   (사용할 때마다 수정 시각을 갱신하고, 전체 크기/보관 기간을 넘으면 오래 사용하지 않은 파일부터 삭제)
+
+import base64
+import hashlib
+import io
+import logging
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from django.conf import settings
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = Path(settings.BASE_DIR) / "var" / "vision_images"
+MIME_TYPES = {"webp": "image/webp", "jpeg": "image/jpeg"}
+# 이 개수만큼 새로 저장할 때마다 캐시 폴더 정리
+PRUNE_EVERY = 100
+# 이보다 오래된 임시 파일은 중단된 쓰기로 보고 삭제 (초)
+TMP_FILE_MAX_AGE = 3600
+
+# 프로세스 단위 통계
+_stats = {'processed': 0, 'cache_hits': 0, 'failures': 0, 'bytes_in': 0, 'bytes_out': 0, 'pruned': 0}
+_stats_lock = threading.Lock()
+_writes = 0
+
+
+class InvalidImageError(ValueError):
+    """Pillow가 열 수 없는 파일 (이미지가 아님) - 모델에 보내지 않고 400 으로 응답"""
+
+def _count(**values):
+    with _stats_lock:
+        for name, n in values.items():
+            _stats[name] += n
+
+
+def _options():
+    image_format = settings.VISION_IMAGE_FORMAT.lower()
+    if image_format not in MIME_TYPES:
+        image_format = "webp"
+    return image_format, settings.VISION_IMAGE_MAX_SIDE, settings.VISION_IMAGE_QUALITY
+
+
+def _encode(image_bytes, image_format, max_side, quality):
+    """축소 + EXIF 제거 + 재인코딩"""
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        image = ImageOps.exif_transpose(image) # 회전 정보를 픽셀에 반영 (EXIF는 저장하지 않음)
+        image.thumbnail((max_side, max_side), Image.LANCZOS) # 비율 유지, 긴 변 max_side 이하
+
+        has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+        if image_format == "jpeg" and has_alpha:
+            # JPEG는 투명도가 없으므로 흰 배경에 합성
+            rgba = image.convert("RGBA")
+            image = Image.new("RGB", rgba.size, (255, 255, 255))
+            image.paste(rgba, mask=rgba.split()[-1])
+        else:
+            image = image.convert("RGBA" if has_alpha else "RGB")
+
+        output = io.BytesIO()
+        if image_format == "webp":
+            image.save(output, format="WEBP", quality=quality, method=4)
+        else:
+            image.save(output, format="JPEG", quality=quality, optimize=True, progressive=True)
+        return output.getvalue()
+
+
+def preprocess_image(image_bytes):
+    """
+    비전 모델용 이미지 (바이트, MIME 타입) 반환
+    - 같은 원본 + 같은 설정이면 저장된 결과 재사용
+    - Pillow가 열 수 없는 파일이면 InvalidImageError
+    """
+    image_format, max_side, quality = _options()
+    digest = hashlib.sha256(image_bytes).hexdigest()
+    cache_path = CACHE_DIR / f"{digest}-{max_side}-q{quality}.{image_format}"
+
+    try:
+        processed = cache_path.read_bytes()
+        os.utime(cache_path) # 마지막 사용 시각 (정리할 때 오래 사용하지 않은 것부터 삭제)
+        _count(cache_hits=1, bytes_in=len(image_bytes), bytes_out=len(processed))
+        return processed, MIME_TYPES[image_format]
+    except FileNotFoundError:
+        pass
+
+    try:
+        processed = _encode(image_bytes, image_format, max_side, quality)
+    except Exception as e:
+        logger.warning(f"⚠️ 이미지 전처리 실패: {e}")
+        _count(failures=1)
+        raise InvalidImageError(f"이미지 파일이 아닙니다: {e}") from e
+
+    # 임시 파일에 쓴 뒤 원자적으로 교체 (동시에 같은 이미지를 처리해도 안전)
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = CACHE_DIR / f".{uuid.uuid4().hex}"
+    tmp.write_bytes(processed)
+    os.replace(tmp, cache_path)
+
+    _count(processed=1, bytes_in=len(image_bytes), bytes_out=len(processed))
+    _maybe_prune()
+    return processed, MIME_TYPES[image_format]
+
+
+def _maybe_prune():
+    global _writes
+
+    with _stats_lock:
+        _writes += 1
+        prune = _writes >= PRUNE_EVERY
+        if prune:
+            _writes = 0
+    if prune:
+        prune_image_cache()
+
+
+def prune_image_cache(max_bytes=None, max_age=None):
+    """
+    캐시 폴더 정리 → 삭제한 파일 수
+    - max_age(초) 동안 사용하지 않은 파일 삭제
+    - 남은 파일 크기 합이 max_bytes 를 넘으면 오래 사용하지 않은 파일부터 삭제 (LRU)
+    """
+    max_bytes = settings.VISION_IMAGE_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    max_age = settings.VISION_IMAGE_CACHE_MAX_AGE if max_age is None else max_age
+    now = time.time()
+
+    files = []
+    for entry in os.scandir(CACHE_DIR) if CACHE_DIR.exists() else []:
+        try:
+            stat = entry.stat()
+        except FileNotFoundError: # 다른 워커가 먼저 삭제
+            continue
+        if entry.name.startswith("."):
+            if now - stat.st_mtime > TMP_FILE_MAX_AGE:
+                files.append((0, stat.st_size, entry.path))
+            continue
+        files.append((stat.st_mtime, stat.st_size, entry.path))
+    files.sort() # 오래 사용하지 않은 순
+
+    total = sum(size for _, size, _ in files)
+    removed = 0
+    for mtime, size, path in files:
+        if now - mtime <= max_age and total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            removed += 1
+        except FileNotFoundError:
+            pass
+        total -= size
+
+    if removed:
+        _count(pruned=removed)
+        logger.info(f"🧹 전처리 이미지 캐시 {removed}개 삭제 (남은 크기 {total / 1024 / 1024:.1f}MB)")
+    return removed
+
+
+def check_image(image_bytes):
+    """Pillow로 열 수 있는 이미지인지 확인 (아니면 InvalidImageError) - 생성 요청을 받을 때 바로 거부하기 위함"""
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as image:
+            image.verify()
+    except Exception as e:
+        raise InvalidImageError(f"이미지 파일이 아닙니다: {e}") from e
+
+
+def media_image_path(image_url):
+    """
+    업로드 이미지 URL(/media/...) → MEDIA_ROOT 안의 실제 경로
+    - ../ 나 절대 경로로 MEDIA_ROOT 밖을 가리키면 None (임의 파일을 읽어서 모델에 보내지 않도록)
+    """
+    media_root = Path(settings.MEDIA_ROOT).resolve()
+    relative = image_url[len(settings.MEDIA_URL):] if image_url.startswith(settings.MEDIA_URL) else image_url
+    path = (media_root / relative).resolve()
+    if path == media_root or not path.is_relative_to(media_root):
+        return None
+    return path
+
+
+def to_vision_data_url(image_bytes):
+    """전처리된 이미지를 data URL(data:image/webp;base64,...)로 변환"""
+    processed, mime = preprocess_image(image_bytes)
+    return f"data:{mime};base64,{base64.b64encode(processed).decode('utf-8')}"
+
+
+def get_image_preprocess_stats():
+    """처리/재사용 횟수와 절약한 바이트 (현재 프로세스 기준)"""
+    with _stats_lock:
+        stats = dict(_stats)
+
+    image_format, max_side, quality = _options()
+    return {
+        **stats,
+        'bytes_saved': stats['bytes_in'] - stats['bytes_out'],
+        'format': image_format,
+        'max_side': max_side,
+        'quality': quality,
+        'cache_max_bytes': settings.VISION_IMAGE_CACHE_MAX_BYTES,
+        'cache_max_age': settings.VISION_IMAGE_CACHE_MAX_AGE,
+    }
@@ -0,0 +1,84 @@
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from base.models import Product, Order, OrderItem
+from rest_framework.exceptions import ValidationError
+from base.services.profile_cache_service import invalidate_user_profile
+from base.services.product_feature_store import mark_products_changed
+from base.services.recommendation_service import invalidate_precomputed
+
+class InventoryService:
+    """
+    재고 차감/복구 및 주문 생성을 담당하는 클래스
+    - 재고 확인과 차감을 조건부 UPDATE 한 번으로 처리해서 동시 구매 시 초과 판매를 막음
+    - 행을 먼저 읽고 save() 하지 않으므로 전체 행 저장으로 인한 직렬화도 없음
+    """
+
+    @staticmethod
+    def reserve(product_id, qty=1):
+        """
+        재고 예약 (countInStock >= qty 인 경우에만 원자적으로 차감)
+        - 성공하면 True, 재고가 부족하면 False
+        """
+        updated = (
+            Product.objects
+            .filter(_id=product_id, countInStock__gte=qty) # 재고가 충분한 경우에만
+            .update(countInStock=F('countInStock') - qty) # DB에서 직접 차감 (UPDATE ... SET countInStock = countInStock - qty)
+        )
+        return updated == 1
+
+
+    @staticmethod
+    def release(product_id, qty=1):
+        """
+        예약한 재고 복구 (주문 생성 실패, 결제 취소 등)
+        """
+        Product.objects.filter(_id=product_id).update(countInStock=F('countInStock') + qty)
+        transaction.on_commit(lambda: mark_products_changed([product_id])) # 재고가 다시 생겼을 수 있음
+
+
+    @staticmethod
+    def commit(user, product, qty=1, image_url=''):
+        """
+        예약된 재고에 대해 주문(Order)과 주문 항목(OrderItem) 생성
+        """
+        order = Order.objects.create(
+            user=user,
+            paymentMethod='Card', # 하드코딩된 결제 수단
+            taxPrice=0.0, # 세금 없음
+            shippingPrice=0.0, # 배송비 없음
+            totalPrice=product.price * qty, # 총액은 상품 가격
+            isPaid=True,
+            paidAt=timezone.now()
+        )
+
+        OrderItem.objects.create(
+            product=product,
+            order=order,
+            name=product.name,
+            qty=qty,
+            price=product.price,
+            image=image_url # 상대 경로 대신 전체 URL 저장
+        )
+
+        return order
+
+
+    @staticmethod
+    def purchase(user, product, qty=1, image_url=''):
+        """
+        상품 구매 (재고 예약 + 주문 생성을 하나의 트랜잭션으로 묶음)
+        - 주문 생성 중 에러가 나면 트랜잭션 롤백으로 재고 차감도 함께 취소됨
+        """
+        with transaction.atomic():
+            if not InventoryService.reserve(product._id, qty):
+                raise ValidationError("재고가 없습니다.")
+
+            order = InventoryService.commit(user, product, qty, image_url)
+
+            # 구매 이력이 바뀌므로 커밋 후 프로필 캐시/사전 계산 추천 삭제, 재고 변경은 피처 스토어에 알림
+            transaction.on_commit(lambda: invalidate_user_profile(user.id))
+            transaction.on_commit(lambda: invalidate_precomputed(user.id))
+            transaction.on_commit(lambda: mark_products_changed([product._id]))
+
+            return order
@@ -0,0 +1,199 @@
+# 상품-상품 동시 발생(co-occurrence) 기반 추천 모듈
+# - 오프라인(build_item_similarity 명령): ProductView / OrderItem 이력으로 상품 간 코사인 유사도를 계산해서
+#   상품별 상위 N개 이웃만 CSR 형식(item_ids, indptr, neighbors, scores)으로 .npz 파일에 저장
+# - 온라인: 파일을 한 번 읽어두고 이진 탐색 + 슬라이스로 "비슷한 상품" / "함께 구매한 상품" 조회
+
+import logging
+import math
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+import numpy as np
+from django.conf import settings
+from base.models import ProductView, OrderItem
+
+logger = logging.getLogger(__name__)
+
+SIMILARITY_DIR = Path(settings.BASE_DIR) / "var" / "item_similarity"
+
+# 행렬 종류
+SIMILAR = "similar" # 조회 + 구매 (구매 가중치 3)
+ALSO_BOUGHT = "also_bought" # 구매만
+
+PURCHASE_WEIGHT = 3.0
+VIEW_WEIGHT = 1.0
+
+
+# ---------- 오프라인 생성 ----------
+
+def _collect_interactions(max_items_per_user):
+    """사용자별 {상품 ID: 가중치} 수집 (조회/구매 각각)"""
+    viewed = defaultdict(dict)
+    purchased = defaultdict(dict)
+
+    views = (
+        ProductView.objects
+        .order_by('user_id', '-last_viewed') # 사용자별 최신 조회 우선
+        .values_list('user_id', 'product_id')
+    )
+    for user_id, product_id in views.iterator():
+        items = viewed[user_id]
+        if len(items) < max_items_per_user:
+            items[product_id] = VIEW_WEIGHT
+
+    purchases = (
+        OrderItem.objects
+        .filter(order__user__isnull=False, product__isnull=False)
+        .values_list('order__user_id', 'product_id')
+    )
+    for user_id, product_id in purchases.iterator():
+        items = purchased[user_id]
+        if len(items) < max_items_per_user:
+            items[product_id] = 1.0
+
+    # 조회 + 구매 합치기 (구매한 상품은 가중치 3)
+    combined = defaultdict(dict)
+    for user_id, items in viewed.items():
+        combined[user_id].update(items)
+    for user_id, items in purchased.items():
+        for product_id in items:
+            combined[user_id][product_id] = PURCHASE_WEIGHT
+
+    return combined, purchased
+
+
+def _cosine_top_n(user_items, top_n):
+    """
+    사용자-상품 가중치로 상품 간 코사인 유사도 계산 후 상품별 상위 top_n개 이웃만 남김
+    - sim(i, j) = Σ_u w_ui·w_uj / (‖i‖·‖j‖)
+    """
+    norms = defaultdict(float)
+    co = defaultdict(float)
+
+    for items in user_items.values():
+        pairs = sorted(items.items())
+        for a, (i, wi) in enumerate(pairs):
+            norms[i] += wi * wi
+            for j, wj in pairs[a + 1:]:
+                co[(i, j)] += wi * wj
+
+    neighbors = defaultdict(list)
+    for (i, j), dot in co.items():
+        score = dot / math.sqrt(norms[i] * norms[j])
+        neighbors[i].append((score, j))
+        neighbors[j].append((score, i))
+
+    # CSR 배열 구성 (상품 ID 오름차순)
+    item_ids = sorted(neighbors)
+    indptr = [0]
+    neighbor_ids = []
+    scores = []
+    for item_id in item_ids:
+        top = sorted(neighbors[item_id], key=lambda x: (-x[0], x[1]))[:top_n]
+        neighbor_ids.extend(j for _, j in top)
+        scores.extend(score for score, _ in top)
+        indptr.append(len(neighbor_ids))
+
+    return {
+        'item_ids': np.array(item_ids, dtype=np.int64),
+        'indptr': np.array(indptr, dtype=np.int64),
+        'neighbors': np.array(neighbor_ids, dtype=np.int64),
+        'scores': np.array(scores, dtype=np.float32),
+    }
+
+
+def build_item_similarity(max_items_per_user=200, top_n=50):
+    """두 종류의 유사도 행렬을 만들어 파일로 저장하고 {종류: 상품 수} 반환"""
+    combined, purchased = _collect_interactions(max_items_per_user)
+    SIMILARITY_DIR.mkdir(parents=True, exist_ok=True)
+
+    summary = {}
+    for kind, user_items in ((SIMILAR, combined), (ALSO_BOUGHT, purchased)):
+        matrix = _cosine_top_n(user_items, top_n)
+
+        # 임시 파일에 쓴 뒤 원자적으로 교체 (읽는 워커는 항상 완성된 파일만 봄)
+        tmp = SIMILARITY_DIR / f".{kind}.{uuid.uuid4().hex}.npz"
+        with open(tmp, "wb") as f:
+            np.savez(f, **matrix)
+        os.replace(tmp, SIMILARITY_DIR / f"{kind}.npz")
+
+        summary[kind] = {'items': len(matrix['item_ids']), 'edges': len(matrix['neighbors'])}
+        logger.info(f"✅ {kind} 유사도 행렬 저장 ({summary[kind]})")
+
+    return summary
+
+
+# ---------- 온라인 조회 ----------
+
+class ItemSimilarityIndex:
+    """CSR 유사도 행렬 조회 (파일이 바뀌면 자동으로 다시 읽음)"""
+
+    RELOAD_CHECK_INTERVAL = 30 # 파일 변경 확인 간격 (초)
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.path = SIMILARITY_DIR / f"{kind}.npz"
+        self._lock = threading.Lock()
+        self._matrix = None
+        self._mtime = None
+        self._checked_at = 0.0
+
+    def _ensure_loaded(self):
+        now = time.monotonic()
+        if self._matrix is not None and now - self._checked_at < self.RELOAD_CHECK_INTERVAL:
+            return self._matrix
+
+        with self._lock:
+            self._checked_at = now
+            try:
+                mtime = self.path.stat().st_mtime
+            except FileNotFoundError:
+                return self._matrix # 아직 생성 전
+
+            if mtime != self._mtime:
+                with np.load(self.path) as data:
+                    self._matrix = {name: data[name] for name in data.files}
+                self._mtime = mtime
+        return self._matrix
+
+    def neighbors(self, product_id, k=10):
+        """상품 1개의 상위 k개 이웃 [(상품 ID, 점수), ...]"""
+        matrix = self._ensure_loaded()
+        if matrix is None:
+            return []
+
+        item_ids = matrix['item_ids']
+        pos = np.searchsorted(item_ids, product_id)
+        if pos >= len(item_ids) or item_ids[pos] != product_id:
+            return []
+
+        start, end = matrix['indptr'][pos], matrix['indptr'][pos + 1]
+        end = min(end, start + k)
+        return list(zip(matrix['neighbors'][start:end].tolist(), matrix['scores'][start:end].tolist()))
+
+    def neighbors_for_many(self, product_ids, k=10, exclude=()):
+        """여러 상품의 이웃 점수를 합산해서 상위 k개 [(상품 ID, 점수), ...]"""
+        seeds = set(product_ids)
+        excluded = seeds | set(exclude)
+        totals = defaultdict(float)
+        for product_id in seeds:
+            for neighbor_id, score in self.neighbors(product_id, k=k * 2):
+                if neighbor_id not in excluded:
+                    totals[neighbor_id] += score
+        return sorted(totals.items(), key=lambda x: (-x[1], x[0]))[:k]
+
+    def is_loaded(self):
+        return self._ensure_loaded() is not None
+
+
+# 싱글톤 인스턴스
+_similarity_indexes = {}
+
+def get_similarity_index(kind=SIMILAR) -> ItemSimilarityIndex:
+    """유사도 인덱스 인스턴스 반환"""
+    if kind not in _similarity_indexes:
+        _similarity_indexes[kind] = ItemSimilarityIndex(kind)
+    return _similarity_indexes[kind]
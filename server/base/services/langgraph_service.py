@@ -1,28 +1,22 @@
 import os
 import json
-import base64
-from typing import Dict, Any, List, Optional
+import asyncio
+import operator
+import threading
+import time
+from typing import Dict, Any, List, Optional, TypedDict, Annotated
+from base.services.ai_clients import get_chat_model, run_async
+from base.services.image_preprocess_service import to_vision_data_url
 
 # LangGraph 관련 import를 try-except로 감싸서 안전하게 처리
 try:
     from langgraph.graph import StateGraph, END
-    from langchain_openai import ChatOpenAI
     from langchain_core.messages import SystemMessage, HumanMessage
-    from pydantic import BaseModel, Field
     LANGGRAPH_AVAILABLE = True
     print("✅ LangGraph 모듈 로드 성공")
 except ImportError as e:
     print(f"❌ LangGraph 모듈 로드 실패: {e}")
     LANGGRAPH_AVAILABLE = False
-    
-    # Fallback 클래스들
-    class BaseModel:
-        def __init__(self, **kwargs):
-            for key, value in kwargs.items():
-                setattr(self, key, value)
-    
-    def Field(**kwargs):
-        return None
 
 # 허용 카테고리
 ALLOWED_CATEGORIES = [
@@ -30,56 +24,54 @@ ALLOWED_CATEGORIES = [
     "식품", "가구", "키즈", "스포츠용품", "취미 컬렉션", "자동차용품", "반려동물용품"
 ]
 
-# 상태 모델 정의
-class ProductState(BaseModel):
+def _merge_dicts(left: Dict[str, float], right: Dict[str, float]) -> Dict[str, float]:
+    """병렬 노드가 각각 기록한 신뢰도 점수 합치기"""
+    return {**(left or {}), **(right or {})}
+
+# 상태 정의
+# - 노드는 바뀐 키만 담은 dict를 반환하고 LangGraph가 상태에 합친다.
+# - 브랜드/카테고리 노드가 동시에 실행되므로 여러 노드가 함께 쓰는 키는 reducer로 합친다.
+class ProductState(TypedDict, total=False):
     # 입력 데이터
-    product_name: str = ""
-    image_path: str = ""
-    image_base64: Optional[str] = None
+    product_name: str
+    image_path: str
+    image_data_url: Optional[str] # 축소/재인코딩된 이미지 (data:image/webp;base64,...)
     
     # 분석 결과
-    image_analysis: Optional[Dict[str, Any]] = None
-    brand_info: Optional[Dict[str, Any]] = None  # str -> Any로 변경
-    category_info: Optional[Dict[str, Any]] = None  # str -> Any로 변경
-    description: Optional[str] = None
+    image_analysis: Optional[Dict[str, Any]]
+    brand_info: Optional[Dict[str, Any]]
+    category_info: Optional[Dict[str, Any]]
+    description: Optional[str]
     
     # 최종 결과
-    final_result: Optional[Dict[str, Any]] = None
+    final_result: Optional[Dict[str, Any]]
     
-    # 메타데이터
-    confidence_scores: Dict[str, float] = None
-    processing_steps: List[str] = None
-    errors: List[str] = None
-    
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        if self.confidence_scores is None:
-            self.confidence_scores = {}
-        if self.processing_steps is None:
-            self.processing_steps = []
-        if self.errors is None:
-            self.errors = []
-    
-    class Config:
-        # Pydantic 설정: 추가 필드 허용
-        extra = "allow"
-        # 타입 강제 변환 허용
-        arbitrary_types_allowed = True
+    # 메타데이터 (병렬 노드 결과 누적)
+    confidence_scores: Annotated[Dict[str, float], _merge_dicts]
+    processing_steps: Annotated[List[str], operator.add]
+    errors: Annotated[List[str], operator.add]
+
+
+def _elapsed(started: float) -> str:
+    return f"{time.perf_counter() - started:.2f}s"
 
 class LangGraphProductGenerator:
     def __init__(self, openai_api_key: str):
         if not LANGGRAPH_AVAILABLE:
             raise ImportError("LangGraph가 설치되지 않았습니다.")
         
-        self.llm = ChatOpenAI(
-            api_key=openai_api_key,
-            model="gpt-4o",
-            temperature=0.3
-        )
+        self.llm = get_chat_model(model="gpt-4o", temperature=0.3, api_key=openai_api_key) # 공용 연결 풀 사용
         self.workflow = self._build_workflow()
     
     def _build_workflow(self):
-        """LangGraph 워크플로우 구성"""
+        """
+        LangGraph 워크플로우 구성
+        - 브랜드 추출과 카테고리 분류는 상품명 + 이미지 분석만 필요하므로 동시에 실행 (fan-out)
+        - join 노드에서 두 결과를 모은 뒤 상품 설명 생성
+        
+        preprocess → analyze_image ─┬→ extract_brand ─────┬→ join → generate_description → validate_and_finalize
+                                    └→ classify_category ─┘
+        """
         try:
             workflow = StateGraph(ProductState)
             
@@ -88,15 +80,17 @@ class LangGraphProductGenerator:
             workflow.add_node("analyze_image", self._analyze_image_node)
             workflow.add_node("extract_brand", self._extract_brand_node)
             workflow.add_node("classify_category", self._classify_category_node)
+            workflow.add_node("join", self._join_node)
             workflow.add_node("generate_description", self._generate_description_node)
             workflow.add_node("validate_and_finalize", self._validate_and_finalize_node)
             
             # 엣지 연결
             workflow.set_entry_point("preprocess")
             workflow.add_edge("preprocess", "analyze_image")
-            workflow.add_edge("analyze_image", "extract_brand")
-            workflow.add_edge("extract_brand", "classify_category")
-            workflow.add_edge("classify_category", "generate_description")
+            workflow.add_edge("analyze_image", "extract_brand") # 병렬 분기 1
+            workflow.add_edge("analyze_image", "classify_category") # 병렬 분기 2
+            workflow.add_edge(["extract_brand", "classify_category"], "join") # 둘 다 끝나면 합류
+            workflow.add_edge("join", "generate_description")
             workflow.add_edge("generate_description", "validate_and_finalize")
             workflow.add_edge("validate_and_finalize", END)
             
@@ -105,33 +99,33 @@ class LangGraphProductGenerator:
             print(f"워크플로우 구성 실패: {e}")
             raise e
     
-    def _preprocess_node(self, state: ProductState) -> ProductState:
-        """전처리: 이미지 로드 및 Base64 인코딩"""
+    async def _preprocess_node(self, state: ProductState) -> Dict[str, Any]:
+        """전처리: 이미지 로드 → 축소/EXIF 제거/재인코딩 → data URL"""
+        started = time.perf_counter()
         try:
-            state.processing_steps.append("전처리 시작")
-            
-            if not os.path.exists(state.image_path):
-                state.errors.append("이미지 파일을 찾을 수 없습니다")
-                return state
+            if not os.path.exists(state["image_path"]):
+                return {"processing_steps": ["전처리 시작"], "errors": ["이미지 파일을 찾을 수 없습니다"]}
             
-            with open(state.image_path, "rb") as img_file:
-                state.image_base64 = base64.b64encode(img_file.read()).decode("utf-8")
-            
-            state.processing_steps.append("이미지 인코딩 완료")
+            # 파일 읽기/이미지 처리는 이벤트 루프를 막지 않도록 스레드에서 실행
+            image_data_url = await asyncio.to_thread(self._load_image_data_url, state["image_path"])
+            return {
+                "image_data_url": image_data_url,
+                "processing_steps": [f"이미지 인코딩 완료 ({_elapsed(started)})"],
+            }
             
         except Exception as e:
-            state.errors.append(f"전처리 오류: {str(e)}")
-        
-        return state
+            return {"errors": [f"전처리 오류: {str(e)}"]}
+    
+    def _load_image_data_url(self, image_path: str) -> str:
+        with open(image_path, "rb") as img_file:
+            return to_vision_data_url(img_file.read())
     
-    def _analyze_image_node(self, state: ProductState) -> ProductState:
+    async def _analyze_image_node(self, state: ProductState) -> Dict[str, Any]:
         """이미지 분석"""
+        started = time.perf_counter()
         try:
-            state.processing_steps.append("이미지 분석 시작")
-            
-            if not state.image_base64:
-                state.errors.append("이미지 데이터가 없습니다")
-                return state
+            if not state.get("image_data_url"):
+                return {"errors": ["이미지 데이터가 없습니다"]}
             
             prompt = """
                 이미지를 자세히 분석하여 다음 정보를 추출해주세요:
@@ -155,30 +149,29 @@ class LangGraphProductGenerator:
                 SystemMessage(content="당신은 상품 이미지 분석 전문가입니다."),
                 HumanMessage(content=[
                     {"type": "text", "text": prompt},
-                    {"type": "image_url", "image_url": {"url": f"data:image/webp;base64,{state.image_base64}"}}
+                    {"type": "image_url", "image_url": {"url": state["image_data_url"]}}
                 ])
             ]
             
-            response = self.llm.invoke(messages)
+            response = await self.llm.ainvoke(messages)
             analysis_result = self._parse_json_response(response.content)
             
-            state.image_analysis = analysis_result
-            state.confidence_scores["image_analysis"] = analysis_result.get("confidence", 0.5)
-            state.processing_steps.append("이미지 분석 완료")
+            return {
+                "image_analysis": analysis_result,
+                "confidence_scores": {"image_analysis": analysis_result.get("confidence", 0.5)},
+                "processing_steps": [f"이미지 분석 완료 ({_elapsed(started)})"],
+            }
             
         except Exception as e:
-            state.errors.append(f"이미지 분석 오류: {str(e)}")
-        
-        return state
+            return {"errors": [f"이미지 분석 오류: {str(e)}"]}
     
-    def _extract_brand_node(self, state: ProductState) -> ProductState:
-        """브랜드 추출"""
+    async def _extract_brand_node(self, state: ProductState) -> Dict[str, Any]:
+        """브랜드 추출 (카테고리 분류와 동시에 실행)"""
+        started = time.perf_counter()
         try:
-            state.processing_steps.append("브랜드 추출 시작")
-            
             context = {
-                "product_name": state.product_name,
-                "image_analysis": state.image_analysis or {}
+                "product_name": state["product_name"],
+                "image_analysis": state.get("image_analysis") or {}
             }
             
             prompt = f"""
@@ -197,30 +190,28 @@ class LangGraphProductGenerator:
                 }}
             """
             
-            response = self.llm.invoke([
+            response = await self.llm.ainvoke([
                 SystemMessage(content="당신은 브랜드 식별 전문가입니다."),
                 HumanMessage(content=prompt)
             ])
             
             brand_result = self._parse_json_response(response.content)
-            state.brand_info = brand_result
-            state.confidence_scores["brand"] = brand_result.get("confidence", 0.5)
-            state.processing_steps.append("브랜드 추출 완료")
+            return {
+                "brand_info": brand_result,
+                "confidence_scores": {"brand": brand_result.get("confidence", 0.5)},
+                "processing_steps": [f"브랜드 추출 완료 ({_elapsed(started)})"],
+            }
             
         except Exception as e:
-            state.errors.append(f"브랜드 추출 오류: {str(e)}")
-        
-        return state
+            return {"errors": [f"브랜드 추출 오류: {str(e)}"]}
     
-    def _classify_category_node(self, state: ProductState) -> ProductState:
-        """카테고리 분류"""
+    async def _classify_category_node(self, state: ProductState) -> Dict[str, Any]:
+        """카테고리 분류 (브랜드 추출과 동시에 실행 - 브랜드 결과는 사용하지 않음)"""
+        started = time.perf_counter()
         try:
-            state.processing_steps.append("카테고리 분류 시작")
-            
             context = {
-                "product_name": state.product_name,
-                "image_analysis": state.image_analysis or {},
-                "brand_info": state.brand_info or {}
+                "product_name": state["product_name"],
+                "image_analysis": state.get("image_analysis") or {}
             }
             
             prompt = f"""
@@ -228,7 +219,6 @@ class LangGraphProductGenerator:
                 
                 상품명: {context['product_name']}
                 이미지 분석: {json.dumps(context['image_analysis'], ensure_ascii=False)}
-                브랜드 정보: {json.dumps(context['brand_info'], ensure_ascii=False)}
                 
                 허용된 카테고리: {', '.join(ALLOWED_CATEGORIES)}
                 
@@ -242,7 +232,7 @@ class LangGraphProductGenerator:
                 }}
             """
             
-            response = self.llm.invoke([
+            response = await self.llm.ainvoke([
                 SystemMessage(content="당신은 상품 카테고리 분류 전문가입니다."),
                 HumanMessage(content=prompt)
             ])
@@ -256,25 +246,28 @@ class LangGraphProductGenerator:
                 category_result["category"] = selected_category
                 category_result["confidence"] = 0.3
             
-            state.category_info = category_result
-            state.confidence_scores["category"] = category_result.get("confidence", 0.5)
-            state.processing_steps.append("카테고리 분류 완료")
+            return {
+                "category_info": category_result,
+                "confidence_scores": {"category": category_result.get("confidence", 0.5)},
+                "processing_steps": [f"카테고리 분류 완료 ({_elapsed(started)})"],
+            }
             
         except Exception as e:
-            state.errors.append(f"카테고리 분류 오류: {str(e)}")
-        
-        return state
+            return {"errors": [f"카테고리 분류 오류: {str(e)}"]}
+    
+    async def _join_node(self, state: ProductState) -> Dict[str, Any]:
+        """브랜드/카테고리 병렬 결과 합류 지점"""
+        return {"processing_steps": ["브랜드/카테고리 병렬 처리 합류"]}
     
-    def _generate_description_node(self, state: ProductState) -> ProductState:
+    async def _generate_description_node(self, state: ProductState) -> Dict[str, Any]:
         """상품 설명 생성"""
+        started = time.perf_counter()
         try:
-            state.processing_steps.append("상품 설명 생성 시작")
-            
             context = {
-                "product_name": state.product_name,
-                "image_analysis": state.image_analysis or {},
-                "brand_info": state.brand_info or {},
-                "category_info": state.category_info or {}
+                "product_name": state["product_name"],
+                "image_analysis": state.get("image_analysis") or {},
+                "brand_info": state.get("brand_info") or {},
+                "category_info": state.get("category_info") or {}
             }
             
             prompt = f"""
@@ -299,50 +292,44 @@ class LangGraphProductGenerator:
                 }}
             """
             
-            response = self.llm.invoke([
+            response = await self.llm.ainvoke([
                 SystemMessage(content="당신은 상품 마케팅 카피라이터입니다."),
                 HumanMessage(content=prompt)
             ])
             
             description_result = self._parse_json_response(response.content)
-            state.description = description_result.get("description", "")
-            state.confidence_scores["description"] = description_result.get("confidence", 0.5)
-            state.processing_steps.append("상품 설명 생성 완료")
+            return {
+                "description": description_result.get("description", ""),
+                "confidence_scores": {"description": description_result.get("confidence", 0.5)},
+                "processing_steps": [f"상품 설명 생성 완료 ({_elapsed(started)})"],
+            }
             
         except Exception as e:
-            state.errors.append(f"상품 설명 생성 오류: {str(e)}")
-        
-        return state
+            return {"errors": [f"상품 설명 생성 오류: {str(e)}"]}
     
-    def _validate_and_finalize_node(self, state: ProductState) -> ProductState:
+    async def _validate_and_finalize_node(self, state: ProductState) -> Dict[str, Any]:
         """검증 및 최종 결과 생성"""
         try:
-            state.processing_steps.append("결과 검증 및 최종화")
-            
             # 필수 필드 검증
-            brand_info = state.brand_info or {}
-            category_info = state.category_info or {}
+            brand_info = state.get("brand_info") or {}
+            category_info = state.get("category_info") or {}
             
             brand = brand_info.get("brand", "Unknown") if isinstance(brand_info, dict) else "Unknown"
             category = category_info.get("category", "생활용품") if isinstance(category_info, dict) else "생활용품"
-            description = state.description or "상품 설명을 생성할 수 없습니다."
+            description = state.get("description") or "상품 설명을 생성할 수 없습니다."
             
             # 최종 결과 구성
-            state.final_result = {
-                "brand": brand,
-                "category": category,
-                "description": description,
-                "confidence_scores": state.confidence_scores,
-                "processing_steps": state.processing_steps,
-                "errors": state.errors if state.errors else None
+            return {
+                "final_result": {
+                    "brand": brand,
+                    "category": category,
+                    "description": description,
+                },
+                "processing_steps": ["처리 완료"],
             }
             
-            state.processing_steps.append("처리 완료")
-            
         except Exception as e:
-            state.errors.append(f"최종화 오류: {str(e)}")
-        
-        return state
+            return {"errors": [f"최종화 오류: {str(e)}"]}
     
     def _parse_json_response(self, response: str) -> Dict[str, Any]:
         """JSON 응답 파싱"""
@@ -357,60 +344,31 @@ class LangGraphProductGenerator:
             return {"error": "JSON 파싱 실패", "raw_response": response}
     
     def generate_product_info(self, product_name: str, image_path: str) -> Dict[str, Any]:
-        """상품 정보 생성 실행"""
+        """상품 정보 생성 실행 (비동기 워크플로우를 공용 이벤트 루프에서 실행하고 결과를 기다림)"""
         try:
-            initial_state = ProductState(
-                product_name=product_name,
-                image_path=image_path
-            )
-            
-            print(f"초기 상태: {initial_state.product_name}, {initial_state.image_path}")
+            initial_state: ProductState = {
+                "product_name": product_name,
+                "image_path": image_path,
+                "confidence_scores": {},
+                "processing_steps": [],
+                "errors": [],
+            }
             
             # 워크플로우 실행
-            final_state = self.workflow.invoke(initial_state)
-            
-            print(f"final_state 타입: {type(final_state)}")
-            print(f"final_state 내용: {final_state}")
+            started = time.perf_counter()
+            final_state = run_async(self.workflow.ainvoke(initial_state))
+            total = _elapsed(started)
             
-            # final_state가 딕셔너리인 경우 처리
-            if isinstance(final_state, dict):
-                brand_info = final_state.get('brand_info', {})
-                category_info = final_state.get('category_info', {})
-                
-                brand = brand_info.get('brand', 'Unknown') if isinstance(brand_info, dict) else 'Unknown'
-                category = category_info.get('category', '생활용품') if isinstance(category_info, dict) else '생활용품'
-                description = final_state.get('description', '상품 설명을 생성할 수 없습니다.')
-                
-                return {
-                    "brand": brand,
-                    "category": category,
-                    "description": description,
-                    "confidence_scores": final_state.get('confidence_scores', {}),
-                    "processing_steps": final_state.get('processing_steps', []),
-                    "errors": final_state.get('errors', None)
-                }
+            final_result = final_state.get("final_result") or {}
             
-            # final_state가 객체인 경우 처리
-            else:
-                if hasattr(final_state, 'final_result') and final_state.final_result:
-                    return final_state.final_result
-                else:
-                    # 수동으로 결과 구성
-                    brand_info = getattr(final_state, 'brand_info', {})
-                    category_info = getattr(final_state, 'category_info', {})
-                    
-                    brand = brand_info.get('brand', 'Unknown') if isinstance(brand_info, dict) else 'Unknown'
-                    category = category_info.get('category', '생활용품') if isinstance(category_info, dict) else '생활용품'
-                    description = getattr(final_state, 'description', '상품 설명을 생성할 수 없습니다.')
-                    
-                    return {
-                        "brand": brand,
-                        "category": category,
-                        "description": description,
-                        "confidence_scores": getattr(final_state, 'confidence_scores', {}),
-                        "processing_steps": getattr(final_state, 'processing_steps', []),
-                        "errors": getattr(final_state, 'errors', None)
-                    }
+            return {
+                "brand": final_result.get("brand", "Unknown"),
+                "category": final_result.get("category", "생활용품"),
+                "description": final_result.get("description", "상품 설명을 생성할 수 없습니다."),
+                "confidence_scores": final_state.get("confidence_scores", {}),
+                "processing_steps": final_state.get("processing_steps", []) + [f"전체 소요 시간 ({total})"],
+                "errors": final_state.get("errors") or None
+            }
                     
         except Exception as e:
             print(f"워크플로우 실행 실패: {e}")
@@ -427,8 +385,52 @@ def is_langgraph_available() -> bool:
     """LangGraph 사용 가능 여부 확인"""
     return LANGGRAPH_AVAILABLE
 
+# 컴파일된 워크플로우 캐시 (API 키별 1개)
+# - 생성기(ChatOpenAI + 컴파일된 StateGraph)는 상태를 갖지 않으므로 여러 요청이 동시에 같은 인스턴스를 써도 안전
+_generator_pool: Dict[str, "LangGraphProductGenerator"] = {}
+_generator_pool_lock = threading.Lock()
+_setup_stats = {'builds': 0, 'reuses': 0, 'build_seconds': 0.0, 'last_build_seconds': None, 'warmed_up': False}
+
 def get_langgraph_generator(openai_api_key: str):
-    """LangGraph 생성기 인스턴스 반환"""
+    """LangGraph 생성기 인스턴스 반환 (처음 한 번만 생성/컴파일하고 이후 재사용)"""
     if not LANGGRAPH_AVAILABLE:
         return None
-    return LangGraphProductGenerator(openai_api_key)
\ No newline at end of file
+
+    generator = _generator_pool.get(openai_api_key)
+    if generator is not None:
+        _setup_stats['reuses'] += 1
+        return generator
+
+    with _generator_pool_lock:
+        generator = _generator_pool.get(openai_api_key)
+        if generator is None:
+            started = time.perf_counter()
+            generator = LangGraphProductGenerator(openai_api_key)
+            elapsed = time.perf_counter() - started
+            _generator_pool[openai_api_key] = generator
+            _setup_stats['builds'] += 1
+            _setup_stats['build_seconds'] += elapsed
+            _setup_stats['last_build_seconds'] = round(elapsed, 4)
+            print(f"✅ LangGraph 워크플로우 컴파일 완료 ({elapsed:.3f}s)")
+        else:
+            _setup_stats['reuses'] += 1
+    return generator
+
+def warm_up_langgraph(openai_api_key: str) -> bool:
+    """워커 시작 시 미리 생성 (gunicorn post_worker_init 에서 호출) - 첫 요청이 생성 비용을 내지 않도록"""
+    if get_langgraph_generator(openai_api_key) is None:
+        return False
+    _setup_stats['warmed_up'] = True
+    return True
+
+def get_langgraph_setup_stats() -> Dict[str, Any]:
+    """생성기 생성/재사용 횟수와 재사용으로 절약한 준비 시간 (현재 프로세스 기준)"""
+    stats = dict(_setup_stats)
+    avg_build = stats['build_seconds'] / stats['builds'] if stats['builds'] else 0.0
+    return {
+        'builds': stats['builds'],
+        'reuses': stats['reuses'],
+        'warmed_up': stats['warmed_up'],
+        'last_build_seconds': stats['last_build_seconds'],
+        'setup_seconds_saved': round(avg_build * stats['reuses'], 3), # 요청마다 생성했다면 들었을 시간
+    }
@@ -1,17 +1,65 @@
-from openai import OpenAI
 from django.conf import settings
-import os
-import httpx
+from django.core.cache import caches
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import threading
+import time
+from base.services.reason_cache_service import get_reason_cache, recommendation_fingerprint, prompt_profile, price_band_range
+from base.services.ai_clients import get_openai_client
+
+# 마감 시간을 넘긴 GPT 응답을 나중에 조회할 수 있도록 저장하는 캐시
+# - 여러 워커가 공유해야 하므로 프로필 캐시와 같은 백엔드(PROFILE_CACHE_BACKEND)를 사용
+LATE_REASONS_CACHE_ALIAS = "profiles"
+LATE_REASONS_KEY_PREFIX = "llm_reasons"
+
+# GPT 호출 전용 스레드 풀 (요청 스레드는 마감 시간까지만 기다림)
+_llm_executor = None
+_llm_executor_lock = threading.Lock()
+_inflight = {} # {캐시 키: Future} 같은 프롬프트 중복 호출 방지
+_inflight_lock = threading.Lock()
+_llm_stats = {'calls': 0, 'timeouts': 0, 'errors': 0, 'late_completions': 0, 'late_failures': 0}
+_llm_stats_lock = threading.Lock()
+
+
+def _count(name):
+    with _llm_stats_lock:
+        _llm_stats[name] += 1
+
+
+def _get_llm_executor():
+    global _llm_executor
+
+    if _llm_executor is None:
+        with _llm_executor_lock:
+            if _llm_executor is None:
+                _llm_executor = ThreadPoolExecutor(
+                    max_workers=settings.RECOMMENDATION_LLM_WORKERS,
+                    thread_name_prefix="llm-recommendation",
+                )
+    return _llm_executor
+
+
+def get_late_reasons(token):
+    """
+    마감 후 도착한 추천 결과 조회
+    - {'status': 'ready', 'recommendations': [...]} 또는 {'status': 'failed'} (GPT 호출/파싱 실패)
+    - 아직 결과가 없으면 None
+    """
+    return caches[LATE_REASONS_CACHE_ALIAS].get(f"{LATE_REASONS_KEY_PREFIX}:{token}")
+
+
+def get_llm_stats():
+    """GPT 호출/마감 초과 횟수 (현재 프로세스 기준)"""
+    with _llm_stats_lock:
+        stats = dict(_llm_stats)
+    return {**stats, 'timeout_seconds': settings.RECOMMENDATION_LLM_TIMEOUT}
+
 
 class LLMRecommendationService:
-    def __init__(self, request=None):
-        http_client = httpx.Client(proxy=None)
-        # 생성한 클라이언트를 OpenAI 클라이언트를 만들 때 주입합니다.
-        self.client = OpenAI(
-            api_key=os.environ.get("OPENAI_API_KEY"),
-            http_client=http_client
-        )
+    def __init__(self, request=None, timeout=None):
+        self.client = get_openai_client() # 프로세스 공용 클라이언트 (연결 재사용)
         self.request = request
+        self.timeout = timeout # GPT 응답 대기 한도(초), None이면 끝까지 기다림 (배치용)
+        self.pending_token = None # 마감 초과 시 나중에 결과를 조회할 토큰
 
     # OpenAI GPT를 활용해서 개인화된 추천 이유를 생성
     def generate_recommendations_with_reasons(self, user_profile, candidate_products, num_recommendations=5):
@@ -20,11 +68,61 @@ class LLMRecommendationService:
         # 1단계: 여유분 확보
         top_candidates = candidate_products[:num_recommendations * 2] # 5개 추천 → 10개 후보
         
-        # 2단계: 프롬프트 생성 (사용자 데이터와 상품 정보를 GPT가 이해할 수 있는 형태로 변환)
+        # 2단계: 같은 취향 + 같은 후보로 이미 받은 GPT 응답이 있으면 재사용
+        reason_cache = get_reason_cache()
+        cache_key = recommendation_fingerprint(user_profile, top_candidates)
+        cached = reason_cache.get(cache_key)
+        if cached is not None:
+            return self._match_recommendations_with_products(cached, top_candidates)[:num_recommendations]
+
+        # 3단계: 프롬프트 생성 (사용자 데이터와 상품 정보를 GPT가 이해할 수 있는 형태로 변환)
         prompt = self._create_recommendation_prompt(user_profile, top_candidates)
         
         try:
-            # 3단계: OpenAI API 호출
+            # 4단계: 스레드 풀에서 GPT 호출 후 마감 시간까지만 대기
+            future = self._submit(cache_key, prompt, top_candidates, num_recommendations)
+            recommendations = future.result(timeout=self.timeout)
+            
+            # 추천 결과와 상품 정보 매칭
+            final_recommendations = self._match_recommendations_with_products(
+                recommendations, top_candidates
+            )
+            
+            return final_recommendations[:num_recommendations] # 최종 5개 선별
+
+        except FutureTimeoutError:
+            # 마감 초과 → 휴리스틱 순위로 즉시 응답, GPT 결과(또는 실패)는 끝나는 대로 조회용 캐시에 저장
+            _count('timeouts')
+            self.pending_token = cache_key
+            future.add_done_callback(
+                lambda done: self._store_late(cache_key, done, top_candidates, num_recommendations)
+            )
+            return self._create_fallback_recommendations(candidate_products[:num_recommendations])
+            
+        except Exception as e:
+            print(f"LLM 추천 생성 실패: {e}")
+            # LLM 실패 시 기본 추천 반환
+            return self._create_fallback_recommendations(candidate_products[:num_recommendations])
+
+
+    def _submit(self, cache_key, prompt, top_candidates, num_recommendations):
+        """GPT 호출 작업 등록 (같은 프롬프트가 이미 진행 중이면 그 작업을 공유)"""
+        with _inflight_lock:
+            future = _inflight.get(cache_key)
+            if future is None:
+                future = _get_llm_executor().submit(
+                    self._call_llm, cache_key, prompt, top_candidates, num_recommendations
+                )
+                _inflight[cache_key] = future
+                future.add_done_callback(lambda _: _inflight.pop(cache_key, None))
+        return future
+
+
+    def _call_llm(self, cache_key, prompt, top_candidates, num_recommendations):
+        """GPT 호출 → 파싱 → 캐시 저장 (스레드 풀에서 실행)"""
+        _count('calls')
+        started = time.perf_counter()
+        try:
             response = self.client.chat.completions.create(
                 model="gpt-4o-mini",
                 messages=[
@@ -40,22 +138,47 @@ class LLMRecommendationService:
                 max_tokens=1000,
                 temperature=0.7
             )
-            content = response.choices[0].message.content
+        except Exception:
+            _count('errors')
+            raise
+        content = response.choices[0].message.content
+        latency = time.perf_counter() - started
 
-            # 4단계: 응답 처리
-            recommendations = self._parse_llm_response(content) # GPT 응답 파싱
-            
-            # 추천 결과와 상품 정보 매칭
-            final_recommendations = self._match_recommendations_with_products(
-                recommendations, top_candidates
-            )
-            
-            return final_recommendations[:num_recommendations] # 최종 5개 선별
-            
+        # 5단계: 응답 처리
+        recommendations = self._parse_llm_response(content) # GPT 응답 파싱
+        if recommendations:
+            get_reason_cache().set(cache_key, recommendations, latency=latency)
+
+        return recommendations
+
+
+    def _store_late(self, cache_key, future, top_candidates, num_recommendations):
+        """
+        마감 시간을 넘긴 GPT 작업이 끝나면 조회용 결과 저장 (future 완료 콜백)
+        - 큐에서 기다리다 늦어진 경우도 포함, 실패/빈 응답이면 'failed' 를 저장해서 폴링이 끝나도록 함
+        """
+        try:
+            recommendations = future.result()
         except Exception as e:
-            print(f"LLM 추천 생성 실패: {e}")
-            # LLM 실패 시 기본 추천 반환
-            return self._create_fallback_recommendations(candidate_products[:num_recommendations])
+            print(f"LLM 추천 생성 실패 (마감 이후): {e}")
+            recommendations = None
+
+        if recommendations:
+            _count('late_completions')
+            late = self._match_recommendations_with_products(recommendations, top_candidates)[:num_recommendations]
+            result = {
+                'status': 'ready',
+                'recommendations': [
+                    {'product': rec['product_data'], 'reason': rec['reason'], 'score': rec['score']} for rec in late
+                ],
+            }
+        else:
+            _count('late_failures')
+            result = {'status': 'failed'}
+
+        caches[LATE_REASONS_CACHE_ALIAS].set(
+            f"{LATE_REASONS_KEY_PREFIX}:{cache_key}", result, timeout=settings.RECOMMENDATION_REASON_CACHE_TTL,
+        )
     
 
 
@@ -63,28 +186,22 @@ class LLMRecommendationService:
     def _create_recommendation_prompt(self, user_profile, candidate_products):
         """LLM용 프롬프트 생성"""
         
-        # 1단계: 사용자 프로필 요약
+        # 1단계: 사용자 프로필 요약 (캐시 키와 같은 정보만 사용 - 결과를 비슷한 취향의 다른 사용자와 공유하므로)
+        profile = prompt_profile(user_profile)
+        price_low, price_high = price_band_range(profile['price_band'])
         profile_summary = f"""
             사용자 프로필:
-            - 이름: {user_profile.get('username', 'Unknown')}
-            - 선호 카테고리: {', '.join([f"{cat}({pct}%)" for cat, pct in list(user_profile.get('category_preferences', {}).items())[:3]])}
-            - 선호 브랜드: {', '.join(list(user_profile.get('brand_preferences', {}).keys())[:3])}
-            - 평균 구매 가격대: {user_profile.get('price_range', {}).get('avg', 0):,.0f}원
-            - 구매 주기: {user_profile.get('purchase_frequency', {}).get('frequency', 'unknown')}
-            - 총 구매 횟수: {user_profile.get('total_purchases', 0)}회
-            - 최근 관심 상품: {', '.join([item['product_name'] for item in user_profile.get('recent_interests', [])[:3]])}
+            - 선호 카테고리: {', '.join(profile['categories'])}
+            - 선호 브랜드: {', '.join(profile['brands'])}
+            - 평균 구매 가격대: {price_low:,}~{price_high:,}원
         """
 
         """
         실제 결과 예시:
             사용자 프로필:
-            - 이름: sim@example.com
-            - 선호 카테고리: 신발(88.3%), 액세서리(11.7%), 의류(5.2%)
-            - 선호 브랜드: Crocs, Nike, CASIO  
-            - 평균 구매 가격대: 1,745원
-            - 구매 주기: quarterly
-            - 총 구매 횟수: 15회
-            - 최근 관심 상품: 크록스 오프로드 클로그, 나이키 에어포스, 애플워치 밴드
+            - 선호 카테고리: 신발, 액세서리, 의류
+            - 선호 브랜드: Crocs, Nike, CASIO
+            - 평균 구매 가격대: 1,024~2,048원
         """
         
         # 2단계: 후보 상품 목록 생성
@@ -96,7 +213,7 @@ class LLMRecommendationService:
                 - 브랜드: {product.brand}
                 - 가격: {product.price:,.0f}원
                 - 평점: {product.rating}/5.0 ({product.numReviews}개 리뷰)
-                - 설명: {product.description[:100]}...
+                - 설명: {(product.description or "")[:100]}...
             """
 
         """
@@ -127,12 +244,12 @@ class LLMRecommendationService:
             각 추천에 대해 다음 형식으로 응답해주세요:
 
             [상품번호: 상품명]
-            추천이유: (사용자의 구매 패턴, 관심사, 선호도를 근거로 한 구체적인 추천 이유를 2-3문장으로 작성)
+            추천이유: (선호 카테고리, 선호 브랜드, 가격대를 근거로 한 구체적인 추천 이유를 2-3문장으로 작성)
             추천점수: (1-10점)
 
             예시:
             [3: 아이폰 15 Pro]
-            추천이유: 전자제품을 60% 선호하시고 애플 브랜드를 자주 구매하시는 패턴을 보면, 최신 아이폰이 적합합니다. 평균 구매가격대인 50만원대에 맞고, 최근 스마트워치에 관심을 보이신 것으로 보아 애플 생태계 확장에 관심이 있으실 것 같습니다.
+            추천이유: 전자제품을 가장 선호하시고 애플 브랜드를 자주 구매하시는 패턴을 보면, 최신 아이폰이 적합합니다. 평균 구매 가격대에도 잘 맞는 상품입니다.
             추천점수: 9
 
             5개 추천 상품을 위 형식으로 작성해주세요.
@@ -196,6 +313,15 @@ class LLMRecommendationService:
     
 
 
+    def _image_url(self, product):
+        """상품 이미지 URL (request가 있으면 전체 URL, 없으면 상대 경로 - 배치 사전 계산용)"""
+        if not (product.image and hasattr(product.image, 'url')):
+            return ''
+        if self.request:
+            return self.request.build_absolute_uri(product.image.url)
+        return product.image.url
+
+
     # GPT가 선택한 상품 번호를 실제 상품 객체와 연결해서 완전한 추천 데이터 만들기
     def _match_recommendations_with_products(self, recommendations, candidate_products):
         """추천 결과와 실제 상품 매칭"""
@@ -219,9 +345,7 @@ class LLMRecommendationService:
 
                 used_product_ids.add(product._id)
 
-                image_url = ''
-                if self.request and product.image and hasattr(product.image, 'url'):
-                    image_url = self.request.build_absolute_uri(product.image.url)
+                image_url = self._image_url(product)
                 
                 # 4단계: 완전한 추천 객체 생성
                 final_recommendations.append({
@@ -258,9 +382,7 @@ class LLMRecommendationService:
         recommendations = []
         for i, product in enumerate(products):
 
-            image_url = ''
-            if self.request and product.image and hasattr(product.image, 'url'):
-                image_url = self.request.build_absolute_uri(product.image.url)
+            image_url = self._image_url(product)
 
             recommendations.append({
                 'product': product,
@@ -0,0 +1,238 @@
+# 로컬 OpenAI 호환 스텁 서버 (벤치마크/부하 테스트용)
+# - 실제 API 대신 고정된 응답을 돌려줘서 네트워크/과금 없이 서버 쪽 비용만 측정한다.
+# - chat completions(텍스트/이미지 입력, stream 포함)와 embeddings를 흉내 낸다.
+# - 응답 지연(latency + jitter)과 에러(error_rate 비율로 429/500)를 주입할 수 있다.
+# - OPENAI_BASE_URL=http://127.0.0.1:<port>/v1 로 설정하면 서버 전체가 스텁을 사용한다 (run_openai_stub 명령).
+
+import base64
+import hashlib
+import json
+import random
+import struct
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 추천 API 프롬프트(추천점수 형식)에 대한 응답
+RECOMMENDATION_REPLY = "\n".join(
+    f"[{i}: 추천 상품 {i}]\n추천이유: 스텁 서버 응답입니다.\n추천점수: {10 - i}" for i in range(1, 6)
+)
+
+# JSON 형식을 요구하는 프롬프트(상품 정보 생성, LangGraph 노드)에 대한 응답 - 모든 노드가 쓰는 키를 포함
+JSON_REPLY = json.dumps({
+    "brand": "Unknown",
+    "category": "생활용품",
+    "description": "스텁 서버가 생성한 상품 설명입니다. " * 5,
+    "visual_features": "스텁 이미지 분석",
+    "colors": ["white"],
+    "materials": ["plastic"],
+    "brand_hints": "",
+    "category_hints": "생활용품",
+    "key_features": ["특징1", "특징2", "특징3"],
+    "reasoning": "stub",
+    "confidence": 0.8,
+}, ensure_ascii=False)
+
+# 그 외(챗봇 답변 등)
+TEXT_REPLY = "스텁 서버 답변입니다. 문서 내용을 바탕으로 안내드립니다."
+
+
+def _prompt_text(messages):
+    """메시지 목록에서 텍스트만 이어붙이기 (이미지 블록은 건너뜀)"""
+    parts = []
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            parts.append(content)
+        elif isinstance(content, list):
+            parts.extend(block.get("text", "") for block in content if block.get("type") == "text")
+    return "\n".join(parts)
+
+
+def _has_image(messages):
+    return any(
+        isinstance(message.get("content"), list)
+        and any(block.get("type") == "image_url" for block in message["content"])
+        for message in messages
+    )
+
+
+def choose_reply(messages):
+    """프롬프트 종류에 맞는 고정 응답 선택"""
+    prompt = _prompt_text(messages)
+    if "추천점수" in prompt:
+        return RECOMMENDATION_REPLY
+    if "JSON" in prompt or _has_image(messages):
+        return JSON_REPLY
+    return TEXT_REPLY
+
+
+def fake_embedding(text, dim):
+    """텍스트 해시로 만든 결정적(같은 입력 → 같은 벡터) 단위 벡터"""
+    rng = random.Random(hashlib.sha256(text.encode("utf-8")).digest())
+    vector = [rng.gauss(0.0, 1.0) for _ in range(dim)]
+    norm = sum(v * v for v in vector) ** 0.5 or 1.0
+    return [v / norm for v in vector]
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # keep-alive 지원
+    disable_nagle_algorithm = True # 헤더/본문 분할 전송 시 지연(ACK 대기) 방지
+
+    def setup(self):
+        super().setup()
+        self.server.count('connections') # 새 TCP 연결 수
+
+    def log_message(self, format, *args):
+        pass # 요청 로그 출력 안 함
+
+    def _send_json(self, status, body):
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_stream(self, model, reply):
+        """stream=true 요청: SSE 형식으로 몇 글자씩 나눠서 전송"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        step = max(1, len(reply) // 10)
+        pieces = [{"content": reply[i:i + step]} for i in range(0, len(reply), step)]
+        for i, delta in enumerate(pieces + [{}]):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": None if delta else "stop"}],
+            }
+            self._write_chunk(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+            if self.server.token_delay and delta:
+                time.sleep(self.server.token_delay)
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._write_chunk(b"")
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        self.server.count('requests')
+
+        # 1단계: 지연 주입
+        delay = self.server.latency + random.uniform(0, self.server.jitter)
+        if delay:
+            time.sleep(delay)
+
+        # 2단계: 에러 주입 (절반은 429 rate limit, 절반은 500)
+        if self.server.error_rate and random.random() < self.server.error_rate:
+            self.server.count('errors')
+            status = random.choice((429, 500))
+            self._send_json(status, {"error": {"message": "stub: injected error", "type": "stub_error", "code": status}})
+            return
+
+        # 3단계: 경로별 응답
+        if self.path.endswith("/chat/completions"):
+            messages = body.get("messages", [])
+            model = body.get("model", "gpt-4o-mini")
+            reply = choose_reply(messages)
+            if _has_image(messages):
+                self.server.count('vision')
+
+            if body.get("stream"):
+                self._send_stream(model, reply)
+                return
+
+            self._send_json(200, {
+                "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": reply},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            })
+
+        elif self.path.endswith("/embeddings"):
+            inputs = body.get("input", [])
+            if not isinstance(inputs, list):
+                inputs = [inputs]
+            self.server.count('embedded_texts', len(inputs))
+
+            data = []
+            for i, text in enumerate(inputs):
+                if not isinstance(text, str): # 토큰 배열로 온 경우
+                    text = json.dumps(text)
+                vector = fake_embedding(text, self.server.embedding_dim)
+                if body.get("encoding_format") == "base64": # openai SDK 기본값 (numpy 설치 시)
+                    vector = base64.b64encode(struct.pack(f"<{len(vector)}f", *vector)).decode("ascii")
+                data.append({"object": "embedding", "index": i, "embedding": vector})
+
+            self._send_json(200, {
+                "object": "list",
+                "data": data,
+                "model": body.get("model", "text-embedding-ada-002"),
+                "usage": {"prompt_tokens": 0, "total_tokens": 0},
+            })
+
+        else:
+            self._send_json(404, {"error": {"message": f"stub: unknown path {self.path}"}})
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency, jitter, error_rate, embedding_dim, token_delay):
+        super().__init__(address, _StubHandler)
+        self.latency = latency # 고정 응답 지연(초)
+        self.jitter = jitter # 추가 무작위 지연 최대값(초)
+        self.error_rate = error_rate # 에러 응답 비율 (0~1)
+        self.embedding_dim = embedding_dim
+        self.token_delay = token_delay # stream 응답 조각 사이 지연(초)
+        self.stats = {'connections': 0, 'requests': 0, 'errors': 0, 'vision': 0, 'embedded_texts': 0}
+        self._stats_lock = threading.Lock()
+
+    def count(self, name, n=1):
+        with self._stats_lock:
+            self.stats[name] += n
+
+
+class OpenAIStubServer:
+    """백그라운드 스레드에서 도는 스텁 서버"""
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, error_rate=0.0,
+                 embedding_dim=1536, token_delay=0.0):
+        self.httpd = _StubHTTPServer((host, port), latency, jitter, error_rate, embedding_dim, token_delay)
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    @property
+    def stats(self):
+        return self.httpd.stats
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="openai-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
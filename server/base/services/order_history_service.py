@@ -0,0 +1,89 @@
+import base64
+from datetime import datetime
+from django.db.models import Prefetch, Q
+from base.models import Order, OrderItem
+
+class OrderHistoryService:
+    """
+    사용자 구매 내역 조회 클래스
+    - 주문 목록 1번 + 주문 항목(상품 JOIN) 1번, 총 2번의 쿼리로 조회 (주문 수와 무관)
+    - (createdAt, _id) 기준 keyset 페이지네이션 지원
+    """
+
+    def __init__(self, user):
+        self.user = user
+
+    def get_orders(self, limit=None, cursor=None):
+        """
+        주문 내역 조회
+        - limit이 없으면 전체 주문 반환
+        - 반환값: (주문 리스트, 다음 페이지 커서 또는 None)
+        """
+
+        # 1단계: 주문 항목은 상품 카테고리와 함께 한 번에 가져오기
+        items = (
+            OrderItem.objects
+            .select_related('product')
+            .only('name', 'qty', 'price', 'image', 'order', 'product__category')
+        )
+
+        orders = (
+            Order.objects
+            .filter(user=self.user)
+            .order_by('-createdAt', '-_id') # 최신순 (같은 시각이면 ID 역순)
+            .prefetch_related(Prefetch('orderitem_set', queryset=items))
+        )
+
+        # 2단계: 커서 이후의 주문만 (이전 페이지 마지막 주문보다 오래된 주문)
+        if cursor:
+            created_at, order_id = self.decode_cursor(cursor)
+            orders = orders.filter(
+                Q(createdAt__lt=created_at) | Q(createdAt=created_at, _id__lt=order_id)
+            )
+
+        # 3단계: 다음 페이지 존재 여부 확인을 위해 1개 더 조회
+        if limit:
+            orders = list(orders[:limit + 1])
+            has_next = len(orders) > limit
+            orders = orders[:limit]
+        else:
+            orders = list(orders)
+            has_next = False
+
+        data = [
+            {
+                'orderId': order._id,
+                'createdAt': order.createdAt,
+                'totalPrice': order.totalPrice,
+                'isPaid': order.isPaid,
+                'paidAt': order.paidAt,
+                'items': [
+                    {
+                        'name': item.name,
+                        'qty': item.qty,
+                        'price': item.price,
+                        'image': item.image,
+                        'category': item.product.category if item.product else None,
+                    } for item in order.orderitem_set.all()
+                ],
+            } for order in orders
+        ]
+
+        next_cursor = self.encode_cursor(orders[-1]) if has_next else None
+        return data, next_cursor
+
+    @staticmethod
+    def encode_cursor(order):
+        """마지막 주문의 (createdAt, _id)를 URL에 넣을 수 있는 문자열로 변환"""
+        raw = f"{order.createdAt.isoformat()}|{order._id}"
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """커서 문자열을 (createdAt, _id)로 복원 (형식이 잘못되면 ValueError)"""
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+            created_at, order_id = raw.rsplit("|", 1)
+            return datetime.fromisoformat(created_at), int(order_id)
+        except Exception:
+            raise ValueError("잘못된 커서입니다.")
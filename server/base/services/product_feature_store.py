@@ -0,0 +1,430 @@
+# 추천 후보 생성을 위한 상품 피처 스토어 모듈
+# - 재고가 있는 상품의 (ID, 카테고리 코드, 브랜드 코드, 가격, 평점, 리뷰 수)를 컬럼별 .npy 파일로 저장하고
+# - 각 워커는 이를 memory-map으로 열어서 DB 조회 없이 메모리에서 후보를 필터링한다.
+# - 상품/재고가 바뀌면 변경된 상품 ID를 deltas.log에 기록하고, 각 워커는 새로 기록된 상품만 다시 읽는다(delta).
+#   기본 배열은 그대로 두고 변경 상품의 행만 가린 뒤(live 마스크), 최신 값은 작은 보조 테이블(extra)에 둔다.
+#   → 변경 반영 비용은 변경 상품 수에만 비례 (전체 배열을 다시 만드는 일은 백그라운드 재생성에서만)
+# - 스냅샷이 PRODUCT_FEATURE_STORE_TTL(초)보다 오래되면 백그라운드 스레드에서 전체를 다시 만들고,
+#   새 버전이 준비될 때까지는 기존 스냅샷으로 응답한다 (요청 스레드는 재생성을 기다리지 않음).
+# - 재생성은 파일 잠금(build.lock)으로 워커 간에 한 번에 하나만 실행하고,
+#   잠금을 기다리는 동안 다른 워커가 새 버전을 만들었으면 건너뛴다.
+
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+import numpy as np
+from django.conf import settings
+from django.db import connection
+from base.models import Product
+from base.services.product_scoring import encode_column
+
+try:
+    import fcntl
+except ImportError: # Windows 개발 환경 → 워커 간 잠금 없이 동작
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+STORE_DIR = Path(settings.BASE_DIR) / "var" / "feature_store"
+CURRENT_FILE = "CURRENT" # 현재 버전 디렉토리 이름을 담은 파일
+DELTA_FILE = "deltas.log" # 변경된 상품 ID 로그 (한 줄에 ID 하나)
+LOCK_FILE = "build.lock" # 워커 간 재생성 잠금
+VERSION_RE = re.compile(r"^v(\d+)-")
+_UNSET = object()
+MAX_DELTA_PRODUCTS = 5000 # 이보다 많은 상품이 바뀌면 전체 재생성
+FIELDS = ('_id', 'category', 'brand', 'price', 'rating', 'numReviews')
+
+
+class FeatureSnapshot:
+    """
+    재고 있는 상품의 컬럼 배열 묶음
+    - ids, category_codes, brand_codes, price, rating, num_reviews 는 같은 길이의 배열
+    - categories / brands 는 코드 → 값 리스트 (extra 와 공유)
+    - live: 유효한 행 마스크 (None 이면 전부 유효) - delta 로 바뀐 상품의 기본 행은 False
+    - extra: delta 로 다시 읽은 상품들의 FeatureSnapshot (없으면 None)
+    """
+
+    def __init__(self, ids, category_codes, brand_codes, price, rating, num_reviews, categories, brands, built_at,
+                 live=None, extra=None):
+        self.ids = ids
+        self.category_codes = category_codes
+        self.brand_codes = brand_codes
+        self.price = price
+        self.rating = rating
+        self.num_reviews = num_reviews
+        self.categories = categories
+        self.brands = brands
+        self.built_at = built_at
+        self.live = live
+        self.extra = extra
+
+    def __len__(self):
+        base = len(self.ids) if self.live is None else int(self.live.sum())
+        return base + (len(self.extra) if self.extra is not None else 0)
+
+    def parts(self):
+        """필터링할 조각 → [(컬럼 묶음, 초기 마스크)] (기본 배열 + delta 보조 테이블)"""
+        parts = [(self, self.live if self.live is not None else np.ones(len(self.ids), dtype=bool))]
+        if self.extra is not None and len(self.extra.ids):
+            parts.append((self.extra, np.ones(len(self.extra.ids), dtype=bool)))
+        return parts
+
+    def codes_for(self, vocab, values):
+        """값 리스트 → 존재하는 코드 배열"""
+        index = {value: code for code, value in enumerate(vocab)}
+        return np.array([index[value] for value in values if value in index], dtype=np.int32)
+
+
+class ProductFeatureStore:
+    """컬럼형 상품 스냅샷 (버전 디렉토리 + memory-map + delta 로그)"""
+
+    def __init__(self, directory=STORE_DIR, ttl=300):
+        self.directory = Path(directory)
+        self.ttl = ttl # 전체 재생성 주기 (초)
+        self._lock = threading.Lock()
+        self._version = None # 현재 열려있는 버전 디렉토리 이름
+        self._base = None # memory-map 된 기본 스냅샷
+        self._snapshot = None # delta 적용된 스냅샷
+        self._delta_offset = 0 # deltas.log 에서 이미 읽은 위치
+        self._changed_ids = set() # 지금까지 반영한 변경 상품 ID
+        self._live = None # 기본 배열의 유효 행 마스크 (첫 delta 때 생성)
+        self._extra_rows = {} # delta 보조 테이블 {상품 ID: (카테고리, 브랜드, 가격, 평점, 리뷰 수)} (재고 있는 상품만)
+        self._categories = [] # 카테고리 코드 → 값 (delta 로 새 값이 생기면 뒤에 추가)
+        self._brands = []
+        self._rebuilding = False # 백그라운드 재생성 진행 중 여부
+        self.stats = {'full_builds': 0, 'background_builds': 0, 'delta_refreshes': 0, 'loads': 0}
+
+    # ---------- 생성 ----------
+
+    @contextmanager
+    def _build_lock(self):
+        """워커 간 재생성 잠금 (다른 워커가 생성 중이면 끝날 때까지 대기)"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / LOCK_FILE, "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def build(self, stale_version=_UNSET):
+        """
+        전체 재생성 후 새 버전 이름 반환 (워커 간 잠금 안에서 실행)
+        - stale_version: 이 버전을 교체하려는 경우 - 잠금을 기다리는 동안 CURRENT 가 바뀌었으면 생성하지 않고 현재 버전 반환
+        """
+        with self._build_lock():
+            current = self._current_version()
+            if stale_version is not _UNSET and current != stale_version:
+                return current
+            return self._build(current)
+
+    def _build(self, previous):
+        """
+        DB에서 재고 있는 상품 전체를 읽어 새 버전 디렉토리에 저장하고 CURRENT 교체
+        - 생성하는 동안 이전 버전(previous) deltas.log 에 기록된 변경은 새 버전 deltas.log 로 옮김
+        """
+        previous_offset = self._delta_size(previous)
+
+        rows = list(
+            Product.objects
+            .filter(countInStock__gt=0)
+            .order_by('_id')
+            .values_list(*FIELDS)
+        )
+        ids, categories, brands, prices, ratings, num_reviews = zip(*rows) if rows else ([], [], [], [], [], [])
+        category_codes, category_vocab = encode_column(categories)
+        brand_codes, brand_vocab = encode_column(brands)
+
+        version = f"v{int(time.time() * 1000)}-{uuid.uuid4().hex[:6]}"
+        version_dir = self.directory / version
+        version_dir.mkdir(parents=True, exist_ok=True)
+
+        columns = {
+            'ids': np.array(ids, dtype=np.int64),
+            'category_codes': category_codes,
+            'brand_codes': brand_codes,
+            'price': np.array([float(p or 0) for p in prices], dtype=np.float64),
+            'rating': np.array([float(r or 0) for r in ratings], dtype=np.float64),
+            'num_reviews': np.array([n or 0 for n in num_reviews], dtype=np.float64),
+        }
+        for name, array in columns.items():
+            np.save(version_dir / f"{name}.npy", array)
+
+        with open(version_dir / "meta.json", "w", encoding="utf-8") as f:
+            json.dump({'categories': category_vocab, 'brands': brand_vocab, 'built_at': time.time()}, f, ensure_ascii=False)
+        (version_dir / DELTA_FILE).touch()
+
+        # CURRENT 파일을 원자적으로 교체 (다른 워커는 다음 조회 시 새 버전을 연다)
+        tmp = self.directory / f"{CURRENT_FILE}.{uuid.uuid4().hex}"
+        tmp.write_text(version)
+        os.replace(tmp, self.directory / CURRENT_FILE)
+
+        # DB를 읽은 뒤 이전 버전에 기록된 변경 옮기기 (교체 직후에 쓰는 워커는 mark_changed 가 새 버전에도 기록)
+        if previous is not None:
+            missed = self._read_deltas(previous, previous_offset)
+            if missed:
+                self._append_delta(version, missed)
+
+        self._cleanup(version, previous)
+        self.stats['full_builds'] += 1
+        logger.info(f"✅ 상품 피처 스토어 생성 완료 ({len(rows)}개 상품, {version})")
+        return version
+
+    def _rebuild_in_background(self):
+        """백그라운드 스레드에서 현재 버전 재생성 시작 (이미 진행 중이면 무시, self._lock 안에서 호출)"""
+        if self._rebuilding:
+            return
+        self._rebuilding = True
+        threading.Thread(
+            target=self._run_rebuild, args=(self._version,), name="feature-store-rebuild", daemon=True,
+        ).start()
+
+    def _run_rebuild(self, stale_version):
+        try:
+            builds = self.stats['full_builds']
+            self.build(stale_version=stale_version)
+            if self.stats['full_builds'] > builds: # 다른 워커가 먼저 만들었으면 건너뜀
+                self.stats['background_builds'] += 1
+        except Exception as e:
+            logger.error(f"❌ 상품 피처 스토어 백그라운드 재생성 실패: {e}")
+        finally:
+            self._rebuilding = False
+            connection.close() # 재생성 스레드의 DB 연결 정리
+
+    def _cleanup(self, current, previous):
+        """
+        current 보다 오래된 버전 디렉토리 삭제 (열려있는 memory-map은 OS가 유지)
+        - 바로 이전 버전(previous)은 남김: 교체 직전에 CURRENT 를 읽은 워커가 아직 열지 않았을 수 있음
+        - current 보다 새 버전은 삭제하지 않음
+        """
+        current_time = self._version_time(current)
+        for path in self.directory.glob("v*"):
+            if not path.is_dir() or path.name in (current, previous, self._version):
+                continue
+            version_time = self._version_time(path.name)
+            if version_time is not None and version_time < current_time:
+                shutil.rmtree(path, ignore_errors=True)
+
+    @staticmethod
+    def _version_time(version):
+        """버전 이름의 생성 시각 (밀리초)"""
+        match = VERSION_RE.match(version or "")
+        return int(match.group(1)) if match else None
+
+    # ---------- 조회 ----------
+
+    def _current_version(self):
+        try:
+            return (self.directory / CURRENT_FILE).read_text().strip()
+        except FileNotFoundError:
+            return None
+
+    def _load(self, version):
+        """버전 디렉토리를 memory-map으로 열기"""
+        version_dir = self.directory / version
+        with open(version_dir / "meta.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+
+        columns = {
+            name: np.load(version_dir / f"{name}.npy", mmap_mode='r')
+            for name in ('ids', 'category_codes', 'brand_codes', 'price', 'rating', 'num_reviews')
+        }
+        self._categories = list(meta['categories'])
+        self._brands = list(meta['brands'])
+        self._base = FeatureSnapshot(**columns, categories=self._categories, brands=self._brands, built_at=meta['built_at'])
+        self._snapshot = self._base
+        self._version = version
+        self._delta_offset = 0
+        self._changed_ids = set()
+        self._live = None
+        self._extra_rows = {}
+        self.stats['loads'] += 1
+
+    def snapshot(self):
+        """delta까지 반영된 최신 스냅샷 반환 (필요하면 재생성/재로드)"""
+        with self._lock:
+            version = self._current_version()
+
+            # 1단계: 스냅샷이 없으면 바로 생성, TTL이 지났으면 백그라운드에서 재생성 (끝날 때까지 기존 스냅샷 사용)
+            if version is None:
+                version = self.build(stale_version=None)
+            elif self._version == version and time.time() - self._base.built_at > self.ttl:
+                self._rebuild_in_background()
+
+            # 2단계: 다른 워커가 새 버전을 만들었으면 다시 열기
+            if version != self._version:
+                try:
+                    self._load(version)
+                except FileNotFoundError:
+                    # 읽는 사이 정리된 버전 → 열린 스냅샷이 있으면 그대로 쓰고 다음 조회에서 CURRENT 다시 확인
+                    if self._base is None:
+                        self._load(self.build(stale_version=version))
+                        self._apply_deltas()
+                    return self._snapshot
+
+            # 3단계: 새로 기록된 변경 상품 반영
+            self._apply_deltas()
+            return self._snapshot
+
+    def mark_changed(self, product_ids):
+        """상품 변경 기록 (모든 워커가 다음 조회 시 해당 상품을 다시 읽음)"""
+        lines = "".join(f"{int(product_id)}\n" for product_id in product_ids)
+        if not lines:
+            return
+
+        # 기록하는 사이에 CURRENT 가 바뀌었으면(재생성 완료) 새 버전에도 기록 - 중복 ID는 무시되므로 여러 번 써도 됨
+        written = set()
+        version = self._current_version()
+        while version is not None and version not in written:
+            try:
+                self._append_delta(version, lines.encode("ascii"))
+            except FileNotFoundError:
+                pass # 재생성 후 정리된 이전 버전 → 다음 반복에서 새 버전에 기록
+            written.add(version)
+            version = self._current_version()
+
+    def _append_delta(self, version, data):
+        # O_APPEND 쓰기는 짧은 줄 단위로 원자적 → 여러 워커가 동시에 써도 줄이 섞이지 않음
+        fd = os.open(self.directory / version / DELTA_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+
+    def _delta_size(self, version):
+        if version is None:
+            return 0
+        try:
+            return (self.directory / version / DELTA_FILE).stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def _read_deltas(self, version, offset):
+        """deltas.log 의 offset 이후 완성된 줄 (쓰는 중인 마지막 줄은 제외)"""
+        try:
+            with open(self.directory / version / DELTA_FILE, "rb") as f:
+                f.seek(offset)
+                chunk = f.read()
+        except FileNotFoundError:
+            return b""
+        return chunk[:chunk.rfind(b"\n") + 1]
+
+    def _apply_deltas(self):
+        """deltas.log 의 새 ID만 DB에서 다시 읽어서 기본 스냅샷 위에 덮어쓰기"""
+        if self._delta_size(self._version) <= self._delta_offset:
+            return
+
+        complete = self._read_deltas(self._version, self._delta_offset) # 쓰는 중인 마지막 줄은 다음에 읽기
+        self._delta_offset += len(complete)
+        new_ids = {int(line) for line in complete.split() if line}
+        if not new_ids:
+            return
+
+        self._changed_ids |= new_ids
+
+        # 변경이 너무 많이 쌓이면 백그라운드에서 전체 재생성 (끝날 때까지는 delta 로 응답)
+        if len(self._changed_ids) > MAX_DELTA_PRODUCTS:
+            self._rebuild_in_background()
+
+        self._snapshot = self._overlay(new_ids)
+        self.stats['delta_refreshes'] += 1
+
+    def _overlay(self, new_ids):
+        """
+        새로 바뀐 상품만 DB에서 읽어서 반영한 스냅샷
+        - 기본 배열(ID 정렬)에 있는 상품은 live 마스크에서 빼고, 최신 값(재고 있는 경우만)은 보조 테이블에 저장
+        - live 마스크는 제자리에서 바꿈 (이미 스냅샷을 받은 요청은 바뀐 상품이 잠깐 빠져 보일 수 있음)
+        """
+        rows = list(
+            Product.objects
+            .filter(_id__in=new_ids, countInStock__gt=0)
+            .values_list(*FIELDS)
+        )
+
+        base = self._base
+        changed = np.fromiter(new_ids, dtype=np.int64)
+        positions = np.searchsorted(base.ids, changed)
+        found = positions < len(base.ids)
+        found[found] = base.ids[positions[found]] == changed[found]
+        if found.any():
+            if self._live is None:
+                self._live = np.ones(len(base.ids), dtype=bool)
+            self._live[positions[found]] = False
+
+        for product_id in new_ids:
+            self._extra_rows.pop(product_id, None)
+        for row in rows:
+            self._extra_rows[row[0]] = row[1:]
+
+        return FeatureSnapshot(
+            base.ids, base.category_codes, base.brand_codes, base.price, base.rating, base.num_reviews,
+            categories=self._categories, brands=self._brands, built_at=base.built_at,
+            live=self._live, extra=self._extra_snapshot(),
+        )
+
+    def _extra_snapshot(self):
+        """보조 테이블 → FeatureSnapshot (새 카테고리/브랜드는 코드 리스트 뒤에 추가)"""
+        category_index = {value: code for code, value in enumerate(self._categories)}
+        brand_index = {value: code for code, value in enumerate(self._brands)}
+
+        def code(index, vocab, value):
+            if value not in index:
+                index[value] = len(vocab)
+                vocab.append(value)
+            return index[value]
+
+        items = list(self._extra_rows.items())
+        return FeatureSnapshot(
+            ids=np.array([product_id for product_id, _ in items], dtype=np.int64),
+            category_codes=np.array([code(category_index, self._categories, row[0]) for _, row in items], dtype=np.int32),
+            brand_codes=np.array([code(brand_index, self._brands, row[1]) for _, row in items], dtype=np.int32),
+            price=np.array([float(row[2] or 0) for _, row in items], dtype=np.float64),
+            rating=np.array([float(row[3] or 0) for _, row in items], dtype=np.float64),
+            num_reviews=np.array([row[4] or 0 for _, row in items], dtype=np.float64),
+            categories=self._categories,
+            brands=self._brands,
+            built_at=self._base.built_at,
+        )
+
+    def get_stats(self):
+        return {
+            **self.stats,
+            'version': self._version,
+            'products': len(self._snapshot) if self._snapshot is not None else 0,
+            'pending_changes': len(self._changed_ids),
+            'overlay_products': len(self._extra_rows),
+            'rebuilding': self._rebuilding,
+            'age_seconds': round(time.time() - self._base.built_at, 1) if self._base is not None else None,
+        }
+
+
+# 싱글톤 인스턴스
+_feature_store_instance = None
+
+def get_feature_store() -> ProductFeatureStore:
+    """상품 피처 스토어 인스턴스 반환"""
+    global _feature_store_instance
+
+    if _feature_store_instance is None:
+        _feature_store_instance = ProductFeatureStore(ttl=settings.PRODUCT_FEATURE_STORE_TTL)
+
+    return _feature_store_instance
+
+
+def mark_products_changed(product_ids):
+    """상품 변경 알림 (피처 스토어를 사용하지 않으면 무시)"""
+    if not settings.PRODUCT_FEATURE_STORE_ENABLED:
+        return
+    try:
+        get_feature_store().mark_changed(product_ids)
+    except Exception as e:
+        logger.error(f"❌ 피처 스토어 변경 기록 실패: {e}")
@@ -0,0 +1,224 @@
+# AI 상품 정보(브랜드/카테고리/설명) 생성과 결과 캐시 모듈
+# - 판매자가 같은 이미지 + 상품명으로 여러 번 생성 요청을 보내는 경우가 많으므로
+#   sha256(이미지 바이트) + 정규화된 상품명 + 모델/프롬프트 버전을 키로 결과를 DB에 저장해두고 재사용한다.
+# - 항목 수가 PRODUCT_INFO_CACHE_MAX_ENTRIES 를 넘으면 가장 오래 사용하지 않은 항목부터 삭제한다 (LRU).
+
+import hashlib
+import json
+import logging
+import re
+import threading
+import unicodedata
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError
+from django.db.models import F
+from django.utils import timezone
+from base.models import ProductInfoCache
+from base.services.ai_clients import get_openai_client
+from base.services.image_preprocess_service import to_vision_data_url, check_image
+
+logger = logging.getLogger(__name__)
+
+# 허용 카테고리
+ALLOWED_CATEGORIES = [
+    "패션", "신발", "가방", "액세서리", "뷰티", "명품", "전자제품", "생활용품",
+    "식품", "가구", "키즈", "스포츠용품", "취미 컬렉션", "자동차용품", "반려동물용품"
+]
+
+# 파이프라인별 (모델, 프롬프트 버전) - 프롬프트나 모델이 바뀌면 버전을 올려서 기존 캐시를 무효화
+BASIC = "basic"
+LANGGRAPH = "langgraph"
+PIPELINES = {
+    BASIC: ("gpt-4o-mini", 2), # v2: 축소/재인코딩된 이미지 입력
+    LANGGRAPH: ("gpt-4o", 3), # v2: 브랜드/카테고리 병렬 분류, v3: 축소/재인코딩된 이미지 입력
+}
+
+# 프로세스 단위 적중/미스 카운터
+_stats = {'hits': 0, 'misses': 0, 'stores': 0, 'store_failures': 0, 'evictions': 0}
+_stats_lock = threading.Lock()
+
+
+class ProductInfoParseError(ValueError):
+    """GPT 응답을 JSON으로 해석하지 못한 경우"""
+
+    def __init__(self, raw_response):
+        super().__init__("AI 응답 JSON 파싱 실패")
+        self.raw_response = raw_response
+
+
+class ProductInfoGenerationError(RuntimeError):
+    """LangGraph 처리가 실패 결과를 돌려준 경우 (다시 시도하면 성공할 수 있음)"""
+
+
+def _count(name, n=1):
+    with _stats_lock:
+        _stats[name] += n
+
+
+def normalize_product_name(name):
+    """대소문자/전각/공백 차이를 없앤 상품명"""
+    name = unicodedata.normalize("NFKC", name or "")
+    return re.sub(r"\s+", " ", name).strip().casefold()
+
+
+def product_info_cache_key(image_bytes, product_name, pipeline):
+    """sha256(이미지) + 정규화 상품명 + 모델/프롬프트 버전 → 캐시 키"""
+    model, prompt_version = PIPELINES[pipeline]
+    image_hash = hashlib.sha256(image_bytes).hexdigest()
+    raw = f"{pipeline}|{model}|v{prompt_version}|{image_hash}|{normalize_product_name(product_name)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def get_cached_product_info(key):
+    """캐시된 결과 반환 (없으면 None) - 사용 시각을 갱신해서 LRU 순서 유지"""
+    entry = ProductInfoCache.objects.filter(key=key).only('result').first()
+    if entry is None:
+        _count('misses')
+        return None
+
+    try:
+        ProductInfoCache.objects.filter(pk=entry.pk).update(hits=F('hits') + 1, last_used_at=timezone.now())
+    except DatabaseError as e: # 사용 시각 갱신은 실패해도 결과는 그대로 사용
+        logger.warning(f"⚠️ 상품 정보 캐시 사용 기록 실패: {e}")
+    _count('hits')
+    return entry.result
+
+
+def store_product_info(key, pipeline, result):
+    """
+    결과 저장 후 최대 항목 수를 넘은 만큼 오래된 항목 삭제
+    - 저장은 최선 노력: 이미 비용을 내고 생성한 결과이므로 DB 오류(SQLite "database is locked" 등)가 나도
+      예외를 올리지 않고 로그만 남김
+    - 읽고 쓰는 트랜잭션(update_or_create) 대신 단일 UPDATE/INSERT 문만 사용 (SQLite 잠금 대기 시간 안에서 처리되도록)
+    """
+    now = timezone.now()
+    try:
+        updated = ProductInfoCache.objects.filter(key=key).update(pipeline=pipeline, result=result, last_used_at=now)
+        if not updated:
+            ProductInfoCache.objects.create(key=key, pipeline=pipeline, result=result, last_used_at=now)
+    except IntegrityError:
+        return # 다른 요청이 같은 결과를 먼저 저장한 경우
+    except DatabaseError as e:
+        _count('store_failures')
+        logger.warning(f"⚠️ 상품 정보 캐시 저장 실패 (결과는 그대로 반환): {e}")
+        return
+    _count('stores')
+
+    # LRU 정리 (실패해도 다음 저장 때 다시 정리)
+    try:
+        overflow = ProductInfoCache.objects.count() - settings.PRODUCT_INFO_CACHE_MAX_ENTRIES
+        if overflow > 0:
+            oldest = list(
+                ProductInfoCache.objects.order_by('last_used_at').values_list('pk', flat=True)[:overflow]
+            )
+            ProductInfoCache.objects.filter(pk__in=oldest).delete()
+            _count('evictions', len(oldest))
+    except DatabaseError as e:
+        logger.warning(f"⚠️ 상품 정보 캐시 정리 실패: {e}")
+
+
+def get_product_info_cache_stats():
+    """캐시 적중률 등 통계 (적중/미스는 현재 프로세스 기준, 항목 수는 DB 기준)"""
+    with _stats_lock:
+        stats = dict(_stats)
+
+    lookups = stats['hits'] + stats['misses']
+    return {
+        **stats,
+        'hit_ratio': round(stats['hits'] / lookups, 3) if lookups else 0,
+        'entries': ProductInfoCache.objects.count(),
+        'max_entries': settings.PRODUCT_INFO_CACHE_MAX_ENTRIES,
+    }
+
+
+def generate_product_info(product_name, image_data_url):
+    """
+    상품명 + 이미지(data URL)로 브랜드/카테고리/설명 생성 (gpt-4o-mini 1회 호출)
+    - 응답을 JSON으로 해석하지 못하면 ProductInfoParseError
+    """
+    prompt = f"""
+        당신은 전자상거래 상품 정보 분석 전문가입니다.
+        상품명: "{product_name}"
+        아래 규칙을 지켜주세요:
+        1. 브랜드 추출: 실제 존재하는 브랜드명을 영문으로 표기 (없으면 "Unknown")
+        2. 카테고리 선택: 반드시 {", ".join(ALLOWED_CATEGORIES)} 중 하나만 선택
+        3. 상품 설명: 100자 이상, 매력적인 마케팅 문구
+        응답 형식 (JSON):
+        {{
+            "brand": "브랜드명",
+            "category": "카테고리명",
+            "description": "상품 설명"
+        }}
+        """
+
+    client = get_openai_client() # 프로세스 공용 클라이언트 (연결 재사용)
+
+    response = client.chat.completions.create(
+        model=PIPELINES[BASIC][0],
+        messages=[
+            {"role": "system", "content": "너는 상품명과 이미지를 기반으로 브랜드/카테고리/설명을 생성하는 전문가야."},
+            {
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": prompt},
+                    {"type": "image_url", "image_url": {"url": image_data_url}}
+                ]
+            }
+        ],
+        max_tokens=500,
+        temperature=0.3
+    )
+
+    raw_text = response.choices[0].message.content.strip()
+    print("🔥 GPT 응답:", raw_text)
+
+    if raw_text.startswith("```"):
+        raw_text = raw_text.strip("`").replace("json", "", 1).strip()
+
+    try:
+        data = json.loads(raw_text)
+    except json.JSONDecodeError:
+        raise ProductInfoParseError(raw_text)
+
+    if data.get("category") not in ALLOWED_CATEGORIES:
+        data["category"] = "생활용품"
+
+    return data
+
+
+def generate_cached_product_info(pipeline, product_name, image_path, refresh=False):
+    """
+    캐시를 확인하고 없으면 파이프라인으로 생성 → (결과, 캐시 사용 여부)
+    - 작업 큐와 일괄 생성 명령이 공통으로 사용 (API 뷰는 요청 파일을 직접 다루므로 개별 처리)
+    - LangGraph 결과는 모든 노드가 성공한 경우만 저장
+    - 이미지가 아니면 InvalidImageError (재시도하지 않음)
+    """
+    with open(image_path, "rb") as f:
+        image_bytes = f.read()
+    check_image(image_bytes)
+    cache_key = product_info_cache_key(image_bytes, product_name, pipeline)
+    if not refresh:
+        cached = get_cached_product_info(cache_key)
+        if cached is not None:
+            return cached, True
+
+    if pipeline == BASIC:
+        result = generate_product_info(product_name, to_vision_data_url(image_bytes))
+        store_product_info(cache_key, BASIC, result)
+        return result, False
+
+    try:
+        from base.services.langgraph_service import get_langgraph_generator
+    except ImportError as e:
+        raise RuntimeError(f"LangGraph 서비스 로드 실패: {e}")
+
+    generator = get_langgraph_generator(settings.OPENAI_API_KEY)
+    if generator is None:
+        raise RuntimeError("LangGraph 생성기 초기화 실패")
+
+    result = generator.generate_product_info(product_name, image_path)
+    if "error" in result:
+        raise ProductInfoGenerationError("; ".join(result.get("errors") or [result["error"]]))
+    if not result.get("errors"):
+        store_product_info(cache_key, LANGGRAPH, result)
+    return result, False
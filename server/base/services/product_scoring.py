@@ -0,0 +1,71 @@
+# 추천 후보 상품 점수 계산 모듈 (NumPy 벡터화)
+# - 상품별 Python 루프 대신 컬럼 배열(카테고리 코드, 브랜드 코드, 리뷰 수, 평점)로 한 번에 점수 계산
+# - 상위 k개는 전체 정렬 없이 argpartition으로 선택
+
+import numpy as np
+
+
+def encode_column(values):
+    """
+    문자열 컬럼을 정수 코드 배열로 변환
+    - 반환값: (코드 배열, 코드 → 값 리스트)
+    """
+    vocab = {}
+    codes = np.fromiter(
+        (vocab.setdefault(value, len(vocab)) for value in values),
+        dtype=np.int32,
+        count=len(values),
+    )
+    return codes, list(vocab)
+
+
+def preference_weights(vocab, prefs, scale, cap=None):
+    """코드별 선호도 점수 테이블 (vocab 순서, 선호도 없으면 0)"""
+    weights = np.array([float(prefs.get(value, 0) or 0) * scale for value in vocab], dtype=np.float64)
+    if cap is not None:
+        weights = np.minimum(weights, cap)
+    return weights
+
+
+def score_products(category_codes, category_vocab, brand_codes, brand_vocab,
+                   num_reviews, ratings, category_prefs, brand_prefs):
+    """
+    상품 점수 계산 (CandidateFilterService 점수 규칙과 동일)
+    - 기본 점수 10점
+    - 카테고리 점수: 선호도 x 0.5
+    - 브랜드 점수: 선호도 x 3.0 (최대 50점)
+    - 인기도 점수: 리뷰가 있을 때만 min(리뷰 수 x 0.5, 15) + 평점 x 3.0
+    """
+    scores = np.full(len(category_codes), 10.0)
+
+    if category_prefs and len(category_vocab):
+        scores += preference_weights(category_vocab, category_prefs, 0.5)[category_codes]
+
+    if brand_prefs and len(brand_vocab):
+        scores += preference_weights(brand_vocab, brand_prefs, 3.0, cap=50.0)[brand_codes]
+
+    popularity = np.minimum(num_reviews * 0.5, 15.0) + ratings * 3.0
+    scores += np.where(num_reviews > 0, popularity, 0.0)
+
+    return scores
+
+
+def top_k_indices(scores, k):
+    """
+    점수 상위 k개의 인덱스 (점수 내림차순, 동점이면 원래 순서 유지)
+    - 전체 정렬 대신 k번째 점수를 기준으로 잘라낸 뒤 k개만 정렬
+    """
+    n = len(scores)
+    if n == 0 or k <= 0:
+        return np.empty(0, dtype=np.int64)
+
+    if n > k:
+        kth_score = np.partition(scores, n - k)[n - k] # k번째로 큰 점수
+        above = np.flatnonzero(scores > kth_score)
+        ties = np.flatnonzero(scores == kth_score)[:k - len(above)] # 동점은 앞에 있던 상품 우선
+        indices = np.concatenate([above, ties])
+    else:
+        indices = np.arange(n)
+
+    order = np.lexsort((indices, -scores[indices])) # 점수 내림차순 → 인덱스 오름차순
+    return indices[order]
@@ -0,0 +1,87 @@
+# 사용자 프로필(UserProfileService 결과)을 캐시하는 모듈
+# - 프로필은 사용자가 조회/구매/리뷰할 때만 바뀌므로 매 요청마다 다시 계산하지 않는다.
+# - 해당 이벤트가 DB에 반영되는 시점에 invalidate_user_profile()로 캐시를 지운다.
+# - 이벤트를 놓치더라도 PROFILE_CACHE_MAX_STALENESS(초)보다 오래된 프로필은 사용하지 않는다.
+# - 기본 백엔드(locmem)는 워커 프로세스 단위라서 무효화가 다른 gunicorn 워커에 전달되지 않는다.
+#   (다른 워커는 최대 PROFILE_CACHE_MAX_STALENESS 초 동안 이전 프로필 사용 → 여러 워커면 PROFILE_CACHE_BACKEND=file|redis)
+
+import threading
+import time
+from django.conf import settings
+from django.core.cache import caches
+from base.services.user_profile_service import UserProfileService
+
+PROFILE_CACHE_ALIAS = "profiles"
+KEY_PREFIX = "user_profile"
+
+# 프로세스 단위 적중/미스 카운터
+_stats = {'hits': 0, 'misses': 0, 'invalidations': 0, 'stale': 0}
+_stats_lock = threading.Lock()
+
+
+def _cache():
+    return caches[PROFILE_CACHE_ALIAS]
+
+
+def _key(user_id):
+    return f"{KEY_PREFIX}:{user_id}"
+
+
+def _count(name, n=1):
+    with _stats_lock:
+        _stats[name] += n
+
+
+def get_cached_profile(user, refresh=False):
+    """
+    캐시된 사용자 프로필 반환 (없거나 오래되었으면 새로 생성 후 저장)
+    - refresh=True 이면 캐시를 무시하고 다시 계산
+    """
+    max_staleness = settings.PROFILE_CACHE_MAX_STALENESS
+
+    if not refresh:
+        entry = _cache().get(_key(user.id))
+        if entry is not None:
+            if time.time() - entry['cached_at'] <= max_staleness:
+                _count('hits')
+                return entry['profile']
+            _count('stale') # 허용 시간을 넘긴 프로필
+
+    _count('misses')
+    profile = UserProfileService(user).generate_profile()
+    _cache().set(
+        _key(user.id),
+        {'profile': profile, 'cached_at': time.time()},
+        timeout=max_staleness,
+    )
+    return profile
+
+
+def invalidate_user_profile(user_id):
+    """사용자 1명의 프로필 캐시 삭제"""
+    _cache().delete(_key(user_id))
+    _count('invalidations')
+
+
+def invalidate_user_profiles(user_ids):
+    """여러 사용자의 프로필 캐시 일괄 삭제"""
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    _cache().delete_many([_key(user_id) for user_id in user_ids])
+    _count('invalidations', len(user_ids))
+
+
+def get_profile_cache_stats():
+    """캐시 적중률 등 통계 반환 (현재 프로세스 기준)"""
+    with _stats_lock:
+        stats = dict(_stats)
+
+    lookups = stats['hits'] + stats['misses']
+    backend = settings.CACHES[PROFILE_CACHE_ALIAS]['BACKEND']
+    return {
+        **stats,
+        'hit_ratio': round(stats['hits'] / lookups, 3) if lookups else 0,
+        'backend': backend.rsplit('.', 1)[-1],
+        'max_staleness_seconds': settings.PROFILE_CACHE_MAX_STALENESS,
+    }
@@ -0,0 +1,131 @@
+# LLM 추천 이유 응답 캐시 모듈
+# - 프롬프트에 들어가는 입력(프로필 요약 + 후보 상품 10개)이 같으면 GPT를 다시 호출하지 않는다.
+# - 프로필은 상위 카테고리/브랜드와 가격대만 남긴 지문(fingerprint)으로 정규화해서
+#   거의 같은 취향의 사용자들은 같은 캐시 결과를 공유한다.
+# - 캐시 결과를 다른 사용자에게 돌려주므로 프롬프트도 같은 지문(prompt_profile)으로만 만든다.
+#   (이름, 최근 관심 상품, 구매 횟수처럼 키에 없는 개인 정보가 추천 이유에 섞이지 않도록)
+# - 프로세스 메모리에 TTL + LRU 방식으로 보관한다.
+
+import hashlib
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+
+PROMPT_VERSION = 2 # 프롬프트 형식이 바뀌면 올려서 기존 캐시 무효화
+
+
+def _price_band(avg_price):
+    """평균 구매 가격 → 가격대 (2배 단위 구간)"""
+    avg_price = float(avg_price or 0)
+    return int(math.log2(avg_price)) if avg_price >= 1 else 0
+
+
+def prompt_profile(user_profile):
+    """프롬프트/캐시 키에 쓰는 프로필 요약: 상위 카테고리 3개, 상위 브랜드 3개, 가격대"""
+    return {
+        'categories': list(user_profile.get('category_preferences', {}))[:3],
+        'brands': list(user_profile.get('brand_preferences', {}))[:3],
+        'price_band': _price_band(user_profile.get('price_range', {}).get('avg', 0)),
+    }
+
+
+def price_band_range(price_band):
+    """가격대 → (하한, 상한) 원"""
+    return (0, 2) if price_band == 0 else (2 ** price_band, 2 ** (price_band + 1))
+
+
+def recommendation_fingerprint(user_profile, candidate_products):
+    """
+    캐시 키 생성
+    - 프로필: prompt_profile (프롬프트에 들어가는 프로필 정보 전체)
+    - 후보: 상품 순서(프롬프트의 상품 번호)와 가격
+    """
+    profile_key = prompt_profile(user_profile)
+    candidates_key = [[product._id, str(product.price)] for product in candidate_products]
+
+    raw = json.dumps([PROMPT_VERSION, profile_key, candidates_key], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class ReasonCache:
+    """파싱된 LLM 추천 결과 캐시 (TTL + LRU)"""
+
+    def __init__(self, max_entries=1000, ttl=3600):
+        self.max_entries = max_entries
+        self.ttl = ttl # 초
+        self._entries = OrderedDict() # {키: (저장 시각, 추천 목록, LLM 응답 시간)}
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0, 'saved_latency_seconds': 0.0, 'llm_latency_seconds': 0.0}
+
+    def get(self, key):
+        """캐시된 추천 목록 반환 (없거나 만료되면 None)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, recommendations, latency = entry
+                if time.time() - stored_at <= self.ttl:
+                    self._entries.move_to_end(key) # 최근 사용으로 이동
+                    self.stats['hits'] += 1
+                    self.stats['saved_latency_seconds'] += latency # 이번에 생략한 GPT 호출 시간
+                    return recommendations
+                del self._entries[key]
+                self.stats['expired'] += 1
+
+            self.stats['misses'] += 1
+            return None
+
+    def set(self, key, recommendations, latency=0.0):
+        """추천 목록 저장 (latency: 이 결과를 얻는 데 걸린 GPT 호출 시간)"""
+        with self._lock:
+            self._entries[key] = (time.time(), recommendations, latency)
+            self._entries.move_to_end(key)
+            self.stats['llm_latency_seconds'] += latency
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False) # 가장 오래 사용하지 않은 항목 제거
+                self.stats['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        """적중률, 절약한 LLM 대기 시간 등 통계 (현재 프로세스 기준)"""
+        with self._lock:
+            stats = dict(self.stats)
+            size = len(self._entries)
+
+        lookups = stats['hits'] + stats['misses']
+        return {
+            'hits': stats['hits'],
+            'misses': stats['misses'],
+            'expired': stats['expired'],
+            'evictions': stats['evictions'],
+            'size': size,
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl,
+            'hit_ratio': round(stats['hits'] / lookups, 3) if lookups else 0,
+            'saved_latency_seconds': round(stats['saved_latency_seconds'], 3),
+            'llm_latency_seconds': round(stats['llm_latency_seconds'], 3),
+        }
+
+
+# 싱글톤 인스턴스
+_reason_cache_instance = None
+_reason_cache_lock = threading.Lock()
+
+def get_reason_cache() -> ReasonCache:
+    """추천 이유 캐시 인스턴스 반환"""
+    global _reason_cache_instance
+
+    if _reason_cache_instance is None:
+        with _reason_cache_lock:
+            if _reason_cache_instance is None:
+                _reason_cache_instance = ReasonCache(
+                    max_entries=settings.RECOMMENDATION_REASON_CACHE_SIZE,
+                    ttl=settings.RECOMMENDATION_REASON_CACHE_TTL,
+                )
+
+    return _reason_cache_instance
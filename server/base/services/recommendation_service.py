@@ -0,0 +1,98 @@
+# 개인화 추천 결과를 만들고 저장/조회하는 모듈
+# - build_recommendations(): 프로필 → 후보 필터링 → LLM 추천 이유 생성 (실시간 계산)
+# - 야간 배치(precompute_recommendations 명령)가 활성 사용자 결과를 미리 저장해두면
+#   API는 저장된 결과를 바로 반환하고, 없거나 만료된 경우에만 실시간 계산한다.
+
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+from base.models import PrecomputedRecommendation
+from base.services.profile_cache_service import get_cached_profile
+from base.services.candidate_filter_service import CandidateFilterService
+from base.services.llm_service import LLMRecommendationService
+
+
+def build_recommendations(user, request=None, llm_timeout=None):
+    """
+    추천 API 응답 데이터 생성
+    - llm_timeout: GPT 응답 대기 한도(초), None이면 끝까지 기다림 (배치)
+    """
+
+    # 1. 사용자 프로필 조회 (캐시에 없으면 생성)
+    user_profile = get_cached_profile(user)
+
+    # 2. 후보 상품 필터링
+    filter_service = CandidateFilterService(user, user_profile)
+    candidate_products = filter_service.get_candidate_products(limit=20)
+
+    if not candidate_products:
+        return {
+            'message': '추천할 상품이 없습니다. 더 많은 상품을 조회해보세요!',
+            'recommendations': []
+        }
+
+    # 3. LLM으로 추천 이유 생성
+    llm_service = LLMRecommendationService(request=request, timeout=llm_timeout)
+    recommendations = llm_service.generate_recommendations_with_reasons(
+        user_profile, candidate_products, num_recommendations=5
+    )
+
+    data = {
+        'message': '추천 상품을 성공적으로 생성했습니다.',
+        'user_profile': user_profile,
+        'recommendations': [
+            {
+                'product': rec['product_data'],
+                'reason': rec['reason'],
+                'score': rec['score']
+            }
+            for rec in recommendations
+        ]
+    }
+
+    # 마감 시간 안에 GPT 응답이 없어 기본 추천으로 응답한 경우 → 나중에 조회할 토큰 전달
+    if llm_service.pending_token:
+        data['reasons_pending'] = True
+        data['reasons_token'] = llm_service.pending_token
+
+    return data
+
+
+def save_precomputed(results, ttl_seconds=None):
+    """{user_id: 응답 데이터} 를 사전 계산 테이블에 저장 (기존 결과 교체)"""
+    ttl_seconds = ttl_seconds or settings.RECOMMENDATION_PRECOMPUTE_TTL
+    expires_at = timezone.now() + timedelta(seconds=ttl_seconds)
+
+    PrecomputedRecommendation.objects.filter(user_id__in=list(results)).delete()
+    PrecomputedRecommendation.objects.bulk_create([
+        PrecomputedRecommendation(user_id=user_id, payload=payload, expires_at=expires_at)
+        for user_id, payload in results.items()
+    ])
+
+
+def get_precomputed(user, request=None):
+    """만료되지 않은 사전 계산 결과 반환 (없으면 None)"""
+    entry = (
+        PrecomputedRecommendation.objects
+        .filter(user=user, expires_at__gt=timezone.now())
+        .only('payload')
+        .first()
+    )
+    if entry is None:
+        return None
+
+    payload = entry.payload
+
+    # 배치에서는 request가 없어 상대 경로로 저장됨 → 요청 기준 전체 URL로 변환
+    if request is not None:
+        for rec in payload.get('recommendations', []):
+            image = rec['product'].get('image')
+            if image and image.startswith('/'):
+                rec['product']['image'] = request.build_absolute_uri(image)
+
+    return payload
+
+
+def invalidate_precomputed(user_id):
+    """사전 계산 결과 삭제 (구매 등으로 결과가 맞지 않게 된 경우)"""
+    PrecomputedRecommendation.objects.filter(user_id=user_id).delete()
@@ -0,0 +1,260 @@
+# 상담 챗봇 문서 검색 모듈 (BM25 + 벡터 하이브리드)
+# - 벡터 검색만으로는 "7일 이내", "30,000원", 정책 이름 같은 정확한 단어가 들어간 질문에 약하고,
+#   질문마다 OpenAI 임베딩 호출이 끝나야 검색할 수 있다.
+# - 벡터DB와 같은 문서 조각으로 워커마다 메모리에 BM25 역색인을 만들고,
+#   BM25 순위와 벡터 검색 순위를 RRF(Reciprocal Rank Fusion)로 합친다.
+# - 질문 임베딩이 CHATBOT_EMBEDDING_TIMEOUT 안에 오지 않거나 실패하면 BM25 결과만 사용한다.
+#   (늦게 도착한 임베딩은 임베딩 캐시에 저장되므로 같은 질문은 다음부터 바로 처리된다)
+# - 검색 방식은 CHATBOT_RETRIEVAL_MODE (hybrid | vector | bm25)
+
+import logging
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, List
+from django.conf import settings
+from langchain.schema import Document
+from langchain_core.retrievers import BaseRetriever
+from base.services.chatbot_service import get_vector_db, document_chunk_id
+
+logger = logging.getLogger(__name__)
+
+HYBRID, VECTOR, BM25 = "hybrid", "vector", "bm25"
+RETRIEVAL_MODES = (HYBRID, VECTOR, BM25)
+
+# RRF 상수 (순위 r 의 점수 = 1 / (RRF_K + r)) - 한쪽 상위 1~2개가 결과를 독차지하지 않도록 완만하게
+RRF_K = 60
+# 합치기 전에 각 검색기에서 가져오는 후보 수 = max(k * CANDIDATE_FACTOR, MIN_CANDIDATES)
+CANDIDATE_FACTOR = 4
+MIN_CANDIDATES = 10
+# 임베딩 호출이 실패/시간 초과된 뒤 이 시간(초) 동안은 기다리지 않고 바로 BM25만 사용
+EMBEDDING_COOLDOWN = 30
+
+_TOKEN_RE = re.compile(r"[0-9a-z]+|[가-힣]+")
+_HEADER_KEY_RE = re.compile(r"header\d: ")
+
+# 워커 단위 BM25 인덱스 (벡터DB 인스턴스가 바뀌면 = 인덱스가 다시 빌드되면 새로 만듦)
+_bm25_index = None
+_bm25_vectordb = None
+_bm25_lock = threading.Lock()
+
+_embed_executor = None
+_embed_lock = threading.Lock()
+_embedding_unavailable_until = 0.0
+
+# 프로세스 단위 통계 + 최근 검색 소요 시간
+_stats = {'searches': 0, 'bm25_fallbacks': 0, 'embedding_timeouts': 0, 'embedding_errors': 0, 'embedding_skipped': 0}
+_durations = {mode: deque(maxlen=500) for mode in RETRIEVAL_MODES}
+_stats_lock = threading.Lock()
+
+
+def _count(name, n=1):
+    with _stats_lock:
+        _stats[name] += n
+
+
+def _observe(mode, seconds):
+    with _stats_lock:
+        _durations[mode].append(seconds)
+
+
+def tokenize(text):
+    """
+    BM25 토큰
+    - 영문/숫자 단어는 그대로 ("30,000" → "30000")
+    - 한글은 어절 + 2글자씩 자른 조각 ("환불정책은" → 환불정책은, 환불, 불정, 정책, 책은) - 조사가 붙어도 매칭되도록
+    """
+    text = re.sub(r"(?<=\d),(?=\d)", "", text.lower())
+    tokens = []
+    for word in _TOKEN_RE.findall(text):
+        tokens.append(word)
+        if len(word) > 2 and "가" <= word[0] <= "힣":
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def document_text(doc):
+    """색인할 텍스트 = 헤더 제목 + 본문 (헤더는 Chroma 메타데이터에만 있음)"""
+    headers = _HEADER_KEY_RE.sub("", doc.metadata.get("headers", ""))
+    return f"{headers}\n{doc.page_content}"
+
+
+class BM25Index:
+    """문서 조각 역색인 (토큰 → [(문서 번호, 빈도)]) + Okapi BM25 점수"""
+
+    def __init__(self, documents, k1=1.5, b=0.75):
+        self.documents = documents
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(list)
+        self.lengths = []
+        for i, doc in enumerate(documents):
+            counts = Counter(tokenize(document_text(doc)))
+            self.lengths.append(sum(counts.values()))
+            for token, tf in counts.items():
+                self.postings[token].append((i, tf))
+
+        n = len(documents)
+        self.avg_length = sum(self.lengths) / n if n else 0
+        self.idf = {
+            token: math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for token, postings in self.postings.items()
+        }
+
+    def search(self, query, k):
+        """질문과 점수가 높은 조각 → [(Document, 점수)] (점수 0 인 조각은 제외)"""
+        scores = defaultdict(float)
+        for token in set(tokenize(query)):
+            idf = self.idf.get(token)
+            if idf is None:
+                continue
+            for i, tf in self.postings[token]:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[i] / self.avg_length)
+                scores[i] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [(self.documents[i], score) for i, score in ranked]
+
+
+def get_bm25_index():
+    """현재 벡터DB 조각으로 만든 BM25 인덱스 (워커 단위, 인덱스가 다시 빌드될 때만 새로 만듦)"""
+    global _bm25_index, _bm25_vectordb
+
+    vectordb = get_vector_db()
+    if _bm25_index is not None and _bm25_vectordb is vectordb:
+        return _bm25_index
+
+    with _bm25_lock:
+        if _bm25_index is None or _bm25_vectordb is not vectordb:
+            data = vectordb.get(include=["documents", "metadatas"])
+            documents = [
+                Document(page_content=content, metadata=metadata or {})
+                for content, metadata in zip(data["documents"], data["metadatas"])
+            ]
+            started = time.perf_counter()
+            _bm25_index, _bm25_vectordb = BM25Index(documents), vectordb
+            logger.info(f"✅ BM25 인덱스 생성 ({len(documents)}개 조각, {time.perf_counter() - started:.3f}s)")
+    return _bm25_index
+
+
+def _get_embed_executor():
+    global _embed_executor
+
+    if _embed_executor is None:
+        with _embed_lock:
+            if _embed_executor is None:
+                _embed_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="query-embed")
+    return _embed_executor
+
+
+def embed_query_with_timeout(embeddings, text, timeout=None):
+    """
+    질문 임베딩 → 벡터 또는 None (timeout 초 안에 못 받거나 실패한 경우)
+    - 실패/시간 초과 후 EMBEDDING_COOLDOWN 초 동안은 호출하지 않고 바로 None
+    """
+    global _embedding_unavailable_until
+
+    timeout = settings.CHATBOT_EMBEDDING_TIMEOUT if timeout is None else timeout
+    if time.monotonic() < _embedding_unavailable_until:
+        _count('embedding_skipped')
+        return None
+
+    future = _get_embed_executor().submit(embeddings.embed_query, text)
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeoutError:
+        _count('embedding_timeouts')
+        logger.warning(f"⚠️ 질문 임베딩 {timeout}초 초과 → BM25 검색만 사용")
+    except Exception as e:
+        _count('embedding_errors')
+        logger.warning(f"⚠️ 질문 임베딩 실패 → BM25 검색만 사용: {e}")
+    _embedding_unavailable_until = time.monotonic() + EMBEDDING_COOLDOWN
+    return None
+
+
+def reciprocal_rank_fusion(rankings, k):
+    """여러 검색 결과 순위를 RRF 점수로 합쳐 상위 k개 Document 반환 (같은 조각은 조각 해시로 합침)"""
+    scores = defaultdict(float)
+    documents = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, start=1):
+            doc_id = document_chunk_id(doc)
+            scores[doc_id] += 1 / (RRF_K + rank)
+            documents.setdefault(doc_id, doc)
+
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+    return [documents[doc_id] for doc_id, _ in ranked]
+
+
+def search_documents(query, k=3, mode=None, query_embedding=None):
+    """
+    📌 질문과 관련된 문서 조각 k개 검색 → (Document 목록, 실제 사용한 방식)
+    - hybrid: BM25 + 벡터 검색 결과를 RRF로 합침 (임베딩을 못 받으면 BM25만 → "bm25")
+    - vector: 벡터 검색만 / bm25: BM25만
+    - query_embedding 을 넘기면 질문 임베딩 호출을 생략
+    """
+    mode = mode or settings.CHATBOT_RETRIEVAL_MODE
+    if mode not in RETRIEVAL_MODES:
+        raise ValueError(f"지원하지 않는 검색 방식: {mode}")
+
+    started = time.perf_counter()
+    fetch_k = max(k * CANDIDATE_FACTOR, MIN_CANDIDATES)
+    vectordb = get_vector_db()
+
+    if mode == VECTOR:
+        embedding = query_embedding if query_embedding is not None else vectordb.embeddings.embed_query(query)
+        results = vectordb.similarity_search_by_vector(embedding, k=k)
+    else:
+        bm25_results = [doc for doc, _ in get_bm25_index().search(query, fetch_k)]
+        embedding = None
+        if mode == HYBRID:
+            embedding = query_embedding if query_embedding is not None else embed_query_with_timeout(vectordb.embeddings, query)
+        if embedding is None:
+            if mode == HYBRID:
+                _count('bm25_fallbacks')
+            mode = BM25
+            results = bm25_results[:k]
+        else:
+            vector_results = vectordb.similarity_search_by_vector(embedding, k=fetch_k)
+            results = reciprocal_rank_fusion([bm25_results, vector_results], k)
+
+    _count('searches')
+    _observe(mode, time.perf_counter() - started)
+    return results, mode
+
+
+class HybridRetriever(BaseRetriever):
+    """RetrievalQA 체인용 검색기 (search_documents 사용)"""
+
+    k: int = 3
+    mode: Any = None # None 이면 CHATBOT_RETRIEVAL_MODE
+
+    def _get_relevant_documents(self, query: str, *, run_manager: Any = None) -> List[Document]:
+        documents, _ = search_documents(query, k=self.k, mode=self.mode)
+        return documents
+
+
+def _percentiles(values):
+    values = sorted(values)
+    if not values:
+        return None
+    pick = lambda q: round(values[min(len(values) - 1, int(q * len(values)))], 4)
+    return {'count': len(values), 'p50': pick(0.5), 'p95': pick(0.95), 'max': round(values[-1], 4)}
+
+
+def get_retriever_stats():
+    """검색 통계 (현재 프로세스 기준, 소요 시간은 실제 사용한 방식별)"""
+    with _stats_lock:
+        stats = dict(_stats)
+        durations = {mode: list(values) for mode, values in _durations.items()}
+
+    return {
+        **stats,
+        'mode': settings.CHATBOT_RETRIEVAL_MODE,
+        'embedding_timeout': settings.CHATBOT_EMBEDDING_TIMEOUT,
+        'durations_seconds': {mode: _percentiles(values) for mode, values in durations.items()},
+        'bm25_documents': len(_bm25_index.documents) if _bm25_index is not None else 0,
+    }
@@ -2,6 +2,7 @@ from django.db import transaction
 from django.db.models import Avg
 from base.models import Review, Product
 from rest_framework.exceptions import ValidationError
+from base.services.profile_cache_service import invalidate_user_profile
 
 class ReviewService:
     """
@@ -37,6 +38,9 @@ class ReviewService:
             
             # 상품 전체 평점과 리뷰 개수 자동 업데이트
             ReviewService._update_product_rating(product)
+
+            # 작성자의 평균 평점이 바뀌므로 커밋 후 프로필 캐시 삭제
+            transaction.on_commit(lambda: invalidate_user_profile(user.id))
             
             return review
         
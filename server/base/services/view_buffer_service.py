@@ -0,0 +1,230 @@
+# 상품 조회 기록(ProductView)을 요청마다 DB에 쓰지 않고 메모리에 모았다가 한 번에 저장하는 모듈
+# - (user, product) 단위로 조회수 증가분을 합쳐두고
+# - 일정 시간(주기) 또는 일정 개수(크기)에 도달하면 배치 upsert로 DB에 반영한다.
+# - 프로세스 종료 시(atexit) 남은 이벤트를 저장하고, DB 저장에 실패하면 spool 파일로 남긴다.
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from django.conf import settings
+from django.db import transaction, IntegrityError, connection
+from django.db.models import F, Q
+from django.utils import timezone
+from base.models import Product, ProductView
+from base.services.profile_cache_service import invalidate_user_profiles
+
+logger = logging.getLogger(__name__)
+
+# DB 저장 실패 시 남은 이벤트를 기록하는 폴더 (flush_product_views 명령으로 재처리)
+SPOOL_DIR = Path(settings.BASE_DIR) / "var" / "product_view_spool"
+
+
+class ProductViewBuffer:
+    """
+    조회 이벤트 버퍼 (프로세스 단위)
+    - record()는 메모리 카운터만 증가시키고 바로 반환 (DB 접근 없음)
+    - flush()가 모아둔 증가분을 배치로 저장
+    """
+
+    def __init__(self, flush_interval=5.0, max_pending=500):
+        self.flush_interval = flush_interval # 주기적 flush 간격 (초)
+        self.max_pending = max_pending # 이 개수 이상 쌓이면 즉시 flush
+        self._pending = {} # {(user_id, product_id): 증가분}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock() # flush 동시 실행 방지
+        self._known_products = set() # 존재가 확인된 상품 ID (존재 확인 쿼리 생략용)
+        self._timer = None
+        self._closed = False
+        self.stats = {'recorded': 0, 'flushed': 0, 'flushes': 0, 'spooled': 0}
+
+    def product_exists(self, product_id):
+        """상품 존재 여부 확인 (한 번 확인된 상품은 메모리에서 바로 응답)"""
+        if product_id in self._known_products:
+            return True
+        if Product.objects.filter(_id=product_id).exists():
+            self._known_products.add(product_id)
+            return True
+        return False
+
+    def record(self, user_id, product_id, count=1):
+        """조회 이벤트 1건 기록"""
+        with self._lock:
+            key = (user_id, product_id)
+            self._pending[key] = self._pending.get(key, 0) + count
+            self.stats['recorded'] += count
+            size = len(self._pending)
+
+        self._ensure_timer()
+
+        if size >= self.max_pending: # 크기 임계치 도달 → 즉시 flush
+            self.flush()
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending)
+
+    def _ensure_timer(self):
+        """주기 flush 타이머 시작 (데몬 스레드)"""
+        if self._timer is not None or self._closed or self.flush_interval <= 0:
+            return
+        with self._lock:
+            if self._timer is not None:
+                return
+            self._timer = threading.Thread(target=self._run_timer, name="product-view-flush", daemon=True)
+            self._timer.start()
+
+    def _run_timer(self):
+        while not self._closed:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"❌ 조회 기록 주기 flush 실패: {e}")
+            finally:
+                connection.close() # 타이머 스레드의 DB 연결 정리
+
+    def _drain(self):
+        """대기 중인 증가분을 꺼내고 버퍼 비우기"""
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        return batch
+
+    def _restore(self, batch):
+        """저장 실패한 증가분을 버퍼에 되돌리기"""
+        with self._lock:
+            for key, count in batch.items():
+                self._pending[key] = self._pending.get(key, 0) + count
+
+    def flush(self):
+        """버퍼에 쌓인 조회수를 DB에 반영하고 반영된 (user, product) 개수 반환"""
+        with self._flush_lock:
+            batch = self._drain()
+            if not batch:
+                return 0
+            try:
+                write_view_counts(batch)
+            except Exception:
+                self._restore(batch)
+                raise
+
+            self.stats['flushed'] += len(batch)
+            self.stats['flushes'] += 1
+            return len(batch)
+
+    def close(self):
+        """프로세스 종료 시 호출 - 남은 이벤트 저장 (실패하면 spool 파일로 보존)"""
+        self._closed = True
+        batch = self._drain()
+        if not batch:
+            return
+        try:
+            write_view_counts(batch)
+            self.stats['flushed'] += len(batch)
+        except Exception as e:
+            logger.error(f"❌ 종료 시 조회 기록 저장 실패, spool 파일로 보존: {e}")
+            spool_view_counts(batch)
+            self.stats['spooled'] += len(batch)
+
+
+def write_view_counts(batch):
+    """
+    {(user_id, product_id): 증가분} 을 배치 upsert
+    - 기존 행: 한 번의 SELECT ... FOR UPDATE 후 bulk_update
+    - 새 행: bulk_create (다른 워커가 먼저 만든 경우 F() 증가로 재시도)
+    """
+    # 삭제된 상품에 대한 이벤트는 버림
+    product_ids = {product_id for _, product_id in batch}
+    valid_ids = set(Product.objects.filter(_id__in=product_ids).values_list('_id', flat=True))
+    batch = {key: count for key, count in batch.items() if key[1] in valid_ids}
+    if not batch:
+        return
+
+    now = timezone.now()
+    condition = Q()
+    for user_id, product_id in batch:
+        condition |= Q(user_id=user_id, product_id=product_id)
+
+    try:
+        with transaction.atomic():
+            existing = {
+                (pv.user_id, pv.product_id): pv
+                for pv in ProductView.objects.select_for_update().filter(condition)
+            }
+
+            # 1단계: 기존 행 조회수 증가
+            for key, pv in existing.items():
+                pv.view_count += batch[key]
+                pv.last_viewed = now
+            if existing:
+                ProductView.objects.bulk_update(existing.values(), ['view_count', 'last_viewed'])
+
+            # 2단계: 새 행 일괄 생성
+            ProductView.objects.bulk_create([
+                ProductView(user_id=user_id, product_id=product_id, view_count=count, last_viewed=now)
+                for (user_id, product_id), count in batch.items()
+                if (user_id, product_id) not in existing
+            ])
+    except IntegrityError:
+        # 다른 워커가 같은 (user, product) 행을 먼저 생성한 경우 → 행 단위 원자적 증가로 처리
+        for (user_id, product_id), count in batch.items():
+            updated = ProductView.objects.filter(user_id=user_id, product_id=product_id).update(
+                view_count=F('view_count') + count,
+                last_viewed=now,
+            )
+            if not updated:
+                ProductView.objects.create(user_id=user_id, product_id=product_id, view_count=count)
+
+    # 조회 이력이 바뀐 사용자들의 프로필 캐시 삭제
+    invalidate_user_profiles({user_id for user_id, _ in batch})
+
+
+def spool_view_counts(batch):
+    """저장하지 못한 증가분을 JSON 파일로 기록"""
+    SPOOL_DIR.mkdir(parents=True, exist_ok=True)
+    path = SPOOL_DIR / f"{os.getpid()}-{uuid.uuid4().hex}.json"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump([[user_id, product_id, count] for (user_id, product_id), count in batch.items()], f)
+    return path
+
+
+def replay_spool():
+    """spool 파일에 남은 이벤트를 DB에 반영하고 처리한 파일 수 반환"""
+    if not SPOOL_DIR.exists():
+        return 0
+
+    replayed = 0
+    for path in sorted(SPOOL_DIR.glob("*.json")):
+        with open(path, "r", encoding="utf-8") as f:
+            rows = json.load(f)
+        batch = {}
+        for user_id, product_id, count in rows:
+            batch[(user_id, product_id)] = batch.get((user_id, product_id), 0) + count
+        write_view_counts(batch)
+        path.unlink()
+        replayed += 1
+    return replayed
+
+
+# 싱글톤 인스턴스
+_view_buffer_instance = None
+_view_buffer_lock = threading.Lock()
+
+def get_view_buffer() -> ProductViewBuffer:
+    """조회 기록 버퍼 인스턴스 반환 (프로세스 종료 시 자동 flush 등록)"""
+    global _view_buffer_instance
+
+    if _view_buffer_instance is None:
+        with _view_buffer_lock:
+            if _view_buffer_instance is None:
+                _view_buffer_instance = ProductViewBuffer(
+                    flush_interval=getattr(settings, 'PRODUCT_VIEW_FLUSH_INTERVAL', 5.0),
+                    max_pending=getattr(settings, 'PRODUCT_VIEW_FLUSH_SIZE', 500),
+                )
+                atexit.register(_view_buffer_instance.close)
+
+    return _view_buffer_instance
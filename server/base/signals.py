@@ -0,0 +1,12 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from base.models import Product
+from base.services.product_feature_store import mark_products_changed
+
+# 상품이 저장/삭제되면 피처 스토어에 변경 알림 (커밋 후)
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def product_changed(sender, instance, **kwargs):
+    product_id = instance._id
+    transaction.on_commit(lambda: mark_products_changed([product_id]))
@@ -0,0 +1,80 @@
+from django.conf import settings
+from django.test import SimpleTestCase
+from base.services.faq_service import FAQIndex, parse_faq
+
+FAQ_TEXT = """# 자주 묻는 질문 (FAQ)
+
+## 회원가입은 어떻게 하나요?
+회원가입 버튼을 클릭하세요.
+
+---
+
+## 비회원으로도 구매할 수 있나요?
+네, 가능합니다.
+
+---
+
+## 주문 내역은 어디서 확인하나요?
+Profile > 주문 내역 메뉴에서 확인할 수 있습니다.
+
+---
+
+## 적립금은 어떻게 사용하나요?
+결제 단계에서 사용 가능합니다.
+
+---
+
+## 쿠폰은 어떻게 받나요?
+신규 회원 가입 시 자동 발급됩니다.
+
+---
+
+## 고객센터 운영 시간은 어떻게 되나요?
+평일 오전 9시 ~ 오후 6시입니다.
+"""
+
+
+class FAQIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.index = FAQIndex(parse_faq(FAQ_TEXT))
+
+    def match(self, question):
+        matched = self.index.match(question, settings.CHATBOT_FAQ_MATCH_THRESHOLD)
+        return matched.entry.question if matched else None
+
+    def test_parse_faq_splits_headed_pairs(self):
+        entries = self.index.entries
+        self.assertEqual(len(entries), 6)
+        self.assertEqual(entries[0].question, "회원가입은 어떻게 하나요?")
+        self.assertEqual(entries[0].answer, "회원가입 버튼을 클릭하세요.")
+
+    def test_paraphrases_match(self):
+        cases = {
+            "회원가입은 어떻게 하나요?": "회원가입은 어떻게 하나요?",
+            "회원가입 어떻게 해요?": "회원가입은 어떻게 하나요?",
+            "비회원도 구매할 수 있나요": "비회원으로도 구매할 수 있나요?",
+            "주문내역 어디서 확인해요?": "주문 내역은 어디서 확인하나요?",
+            "고객센터 운영시간이 어떻게 되나요?": "고객센터 운영 시간은 어떻게 되나요?",
+            "적립금은 어떻게 사용해요": "적립금은 어떻게 사용하나요?",
+        }
+        for question, expected in cases.items():
+            with self.subTest(question=question):
+                self.assertEqual(self.match(question), expected)
+
+    def test_near_miss_questions_fall_back_to_llm(self):
+        near_misses = [
+            "비회원으로도 환불할 수 있나요?",
+            "비회원으로도 교환할 수 있나요?",
+            "쿠폰은 어떻게 사용하나요?",
+            "주문 내역은 어디서 삭제하나요?",
+            "주문 취소는 어떻게 하나요?",
+            "회원탈퇴는 어떻게 하나요?",
+            "고객센터 운영 시간은 언제인가요?",
+        ]
+        for question in near_misses:
+            with self.subTest(question=question):
+                self.assertIsNone(self.match(question))
+
+    def test_unrelated_or_empty_questions(self):
+        self.assertIsNone(self.match("배송비는 얼마인가요?"))
+        self.assertIsNone(self.match("?"))
@@ -0,0 +1,79 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+from base.models import Product, Order, OrderItem
+from base.services.order_history_service import OrderHistoryService
+from base.views.product_views import getMyOrders
+
+# 주문 목록 1번 + 주문 항목(상품 JOIN) 1번
+ORDER_HISTORY_QUERIES = 2
+
+
+class OrderHistoryServiceTests(TestCase):
+    """주문 수와 관계없이 쿼리 수가 일정한지, keyset 페이지네이션이 이어지는지 확인"""
+
+    @classmethod
+    def setUpTestData(cls):
+        products = [Product.objects.create(name=f'order-history-{i}', category='전자제품', price=1000) for i in range(3)]
+        cls.one_order_user = cls._create_user_with_orders('one_order_user', 1, products)
+        cls.many_orders_user = cls._create_user_with_orders('many_orders_user', 25, products)
+
+    @staticmethod
+    def _create_user_with_orders(username, count, products):
+        user = User.objects.create(username=username)
+        for _ in range(count):
+            order = Order.objects.create(user=user, totalPrice=3000, isPaid=True)
+            OrderItem.objects.bulk_create([
+                OrderItem(order=order, product=product, name=product.name, qty=1, price=product.price)
+                for product in products
+            ])
+        return user
+
+    def _get_my_orders(self, user, **params):
+        request = APIRequestFactory().get('/api/products/orders/', params)
+        force_authenticate(request, user=user)
+        return getMyOrders(request)
+
+    def test_service_query_count_does_not_grow_with_orders(self):
+        for user, expected in ((self.one_order_user, 1), (self.many_orders_user, 25)):
+            with self.assertNumQueries(ORDER_HISTORY_QUERIES):
+                data, next_cursor = OrderHistoryService(user).get_orders()
+            self.assertEqual(len(data), expected)
+            self.assertIsNone(next_cursor)
+            self.assertTrue(all(item['category'] == '전자제품' for order in data for item in order['items']))
+
+    def test_view_query_count_does_not_grow_with_orders(self):
+        for user, expected in ((self.one_order_user, 1), (self.many_orders_user, 25)):
+            with self.assertNumQueries(ORDER_HISTORY_QUERIES):
+                response = self._get_my_orders(user)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.data), expected)
+
+    def test_keyset_pagination_returns_next_page(self):
+        history = OrderHistoryService(self.many_orders_user)
+        all_ids = [order['orderId'] for order in history.get_orders()[0]]
+
+        seen, cursor = [], None
+        while True:
+            with self.assertNumQueries(ORDER_HISTORY_QUERIES):
+                page, cursor = history.get_orders(limit=10, cursor=cursor)
+            self.assertLessEqual(len(page), 10)
+            seen += [order['orderId'] for order in page]
+            if cursor is None:
+                break
+
+        self.assertEqual(seen, all_ids) # 빠지거나 겹치는 주문 없이 최신순
+
+    def test_view_paginates_with_cursor(self):
+        first = self._get_my_orders(self.many_orders_user, limit=10)
+        self.assertEqual(len(first.data['results']), 10)
+        self.assertIsNotNone(first.data['next_cursor'])
+
+        second = self._get_my_orders(self.many_orders_user, limit=10, cursor=first.data['next_cursor'])
+        self.assertEqual(len(second.data['results']), 10)
+        first_ids = {order['orderId'] for order in first.data['results']}
+        self.assertFalse(first_ids & {order['orderId'] for order in second.data['results']})
+
+    def test_view_rejects_invalid_cursor(self):
+        response = self._get_my_orders(self.many_orders_user, limit=10, cursor='not-a-cursor')
+        self.assertEqual(response.status_code, 400)
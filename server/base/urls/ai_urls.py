@@ -1,6 +1,7 @@
 from django.urls import path
 from base.views import ai_views as views
 from base.views import chatbot_views
+from base.views import ai_job_views
 
 urlpatterns = [
     # 상품 정보 생성 API
@@ -8,11 +9,17 @@ urlpatterns = [
     path('generate-product-info-langgraph/', views.generateProductInfoWithLangGraph, name='generate_product_info_langgraph'),
     path('check-langgraph-status/', views.checkLangGraphStatus, name='check_langgraph_status'),
 
+    # 상품 정보 생성 작업 큐 API (작업 등록 후 상태 조회)
+    path('jobs/', ai_job_views.ai_jobs, name='ai_jobs'),
+    path('jobs/metrics/', ai_job_views.ai_job_metrics, name='ai_job_metrics'),
+    path('jobs/<int:pk>/', ai_job_views.ai_job_detail, name='ai_job_detail'),
+
     # 리뷰 분석 API
     path('review-analysis/<str:pk>/', views.getProductReviewAnalysis, name='product_review_analysis'),
     path('huggingface-status/', views.getHuggingFaceStatus, name='huggingface_status'),
 
     # 상담 챗봇 API
     path('chatbot/', chatbot_views.chatbot_query, name='chatbot_query'),
+    path('chatbot/stream/', chatbot_views.chatbot_stream, name='chatbot_stream'),
     path('chatbot/status/', chatbot_views.chatbot_status, name='chatbot_status'),
 ]
\ No newline at end of file
@@ -4,4 +4,8 @@ from base.views import recommendation_views as views
 urlpatterns = [
     path('', views.get_user_recommendations, name='user-recommendations'),
     path('profile/', views.get_user_profile, name='user-profile'),
+    path('reasons/<str:token>/', views.get_recommendation_reasons, name='recommendation-reasons'),
+    path('status/', views.get_recommendation_status, name='recommendation-status'),
+    path('similar/<str:pk>/', views.get_similar_products, name='similar-products'),
+    path('also-bought/<str:pk>/', views.get_also_bought_products, name='also-bought-products'),
 ]
\ No newline at end of file
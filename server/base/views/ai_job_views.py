@@ -0,0 +1,81 @@
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from base.models import AIGenerationJob
+from base.serializers import AIGenerationJobSerializer
+from base.services.product_info_service import PIPELINES, BASIC
+from base.services.ai_job_service import AIJobRejected, submit_job, get_ai_job_stats
+from base.services.image_preprocess_service import InvalidImageError, media_image_path
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([IsAuthenticated])
+def ai_jobs(request):
+    """
+    GET: 내 최근 생성 작업 목록
+    POST: 상품 정보 생성 작업 등록 (바로 작업 ID 반환, 결과는 ai/jobs/<id>/ 로 조회)
+    - name: 상품명
+    - image: 이미지 파일 또는 image_url: 업로드된 이미지 경로 (/media/...)
+    - pipeline: basic(기본) | langgraph
+    """
+    if request.method == 'GET':
+        jobs = AIGenerationJob.objects.filter(user=request.user).order_by('-created_at')[:20]
+        return Response(AIGenerationJobSerializer(jobs, many=True).data)
+
+    product_name = request.data.get("name", "").strip()
+    pipeline = request.data.get("pipeline", BASIC).strip()
+    image_file = request.FILES.get("image")
+    image_url = request.data.get("image_url", "").strip()
+
+    if not product_name:
+        return Response({"error": "상품명이 필요합니다."}, status=400)
+    if pipeline not in PIPELINES:
+        return Response({"error": f"pipeline 은 {', '.join(PIPELINES)} 중 하나여야 합니다."}, status=400)
+    if not image_file and not image_url:
+        return Response({"error": "상품 이미지 파일 또는 이미지 URL이 필요합니다."}, status=400)
+
+    image_bytes = image_path = None
+    if image_file:
+        image_bytes = image_file.read()
+    else:
+        image_path = media_image_path(image_url)
+        if image_path is None:
+            return Response({"error": "잘못된 이미지 경로입니다."}, status=400)
+        if not image_path.is_file():
+            return Response({"error": "이미지를 찾을 수 없습니다."}, status=404)
+        image_path = str(image_path)
+
+    try:
+        job = submit_job(
+            request.user, pipeline, product_name,
+            image_bytes=image_bytes, image_path=image_path,
+            refresh=request.GET.get("refresh") == "true",
+        )
+    except InvalidImageError:
+        return Response({"error": "이미지 파일이 아닙니다."}, status=400)
+    except AIJobRejected as e:
+        return Response({"error": str(e)}, status=e.status, headers={"Retry-After": str(e.retry_after)})
+
+    data = AIGenerationJobSerializer(job).data
+    data["status_url"] = request.build_absolute_uri(f"/api/ai/jobs/{job.id}/")
+    return Response(data, status=200 if job.cached else 202)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def ai_job_detail(request, pk):
+    """생성 작업 상태/결과 조회 (완료 전에는 status 만 확인하고 다시 조회)"""
+    try:
+        job = AIGenerationJob.objects.get(pk=pk, user=request.user)
+    except AIGenerationJob.DoesNotExist:
+        return Response({"detail": "존재하지 않는 작업입니다."}, status=404)
+
+    return Response(AIGenerationJobSerializer(job).data)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def ai_job_metrics(request):
+    """작업 큐 상태 (처리량, 재시도, 대기/실행 시간 분포)"""
+    return Response(get_ai_job_stats())
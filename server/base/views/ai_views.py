@@ -1,24 +1,28 @@
-from openai import OpenAI
-import json
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.http import JsonResponse
 from django.conf import settings
-import base64
 import os
-import httpx
 from django.core.files.storage import default_storage
 
 from base.services.review_analysis_service import get_review_analysis_service
 from base.models import Product
+from base.services.product_info_service import (
+    BASIC, LANGGRAPH, ProductInfoParseError, generate_product_info,
+    product_info_cache_key, get_cached_product_info, store_product_info, get_product_info_cache_stats
+)
+from base.services.image_preprocess_service import (
+    InvalidImageError, check_image, to_vision_data_url, media_image_path, get_image_preprocess_stats
+)
 import torch
 
 # LangGraph 서비스 import (안전하게)
 try:
     from base.services.langgraph_service import (
         is_langgraph_available, 
-        get_langgraph_generator
+        get_langgraph_generator,
+        get_langgraph_setup_stats
     )
     print("✅ LangGraph 서비스 로드 성공")
 except ImportError as e:
@@ -27,12 +31,8 @@ except ImportError as e:
         return False
     def get_langgraph_generator(api_key):
         return None
-
-# 허용 카테고리
-ALLOWED_CATEGORIES = [
-    "패션", "신발", "가방", "액세서리", "뷰티", "명품", "전자제품", "생활용품",
-    "식품", "가구", "키즈", "스포츠용품", "취미 컬렉션", "자동차용품", "반려동물용품"
-]
+    def get_langgraph_setup_stats():
+        return {}
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -40,6 +40,7 @@ def generateProductInfo(request):
     """
     ⭐️ [수정됨] 기본 상품 정보 생성 API (파일 직접 수신)
     - 이제 image_url 대신 image 파일을 직접 받습니다.
+    - 같은 이미지 + 상품명으로 다시 요청하면 저장된 결과를 바로 반환합니다. (?refresh=true 이면 새로 생성)
     """
     # --- 1. 데이터 수신 방식 변경 ---
     product_name = request.data.get("name", "").strip()
@@ -52,64 +53,36 @@ def generateProductInfo(request):
     if not image_file:
         return Response({"error": "상품 이미지 파일이 필요합니다."}, status=400)
     
-    # --- 2. Base64 인코딩 방식 변경 ---
+    # --- 2. 이미지 읽기 ---
     # 파일 경로를 찾는 대신, 메모리에 있는 파일 객체(image_file)를 바로 읽습니다.
     try:
-        image_base64 = base64.b64encode(image_file.read()).decode("utf-8")
+        image_bytes = image_file.read()
     except Exception as e:
         return Response({"error": f"이미지 파일을 처리하는 중 오류 발생: {e}"}, status=500)
-
-    # --- 3. GPT 프롬프트 및 호출 (이 부분은 동일) ---
-    prompt = f"""
-        당신은 전자상거래 상품 정보 분석 전문가입니다.
-        상품명: "{product_name}"
-        아래 규칙을 지켜주세요:
-        1. 브랜드 추출: 실제 존재하는 브랜드명을 영문으로 표기 (없으면 "Unknown")
-        2. 카테고리 선택: 반드시 {", ".join(ALLOWED_CATEGORIES)} 중 하나만 선택
-        3. 상품 설명: 100자 이상, 매력적인 마케팅 문구
-        응답 형식 (JSON):
-        {{
-            "brand": "브랜드명",
-            "category": "카테고리명",
-            "description": "상품 설명"
-        }}
-        """
     try:
-        http_client = httpx.Client()
-        api_key = settings.OPENAI_API_KEY
-        client = OpenAI(api_key=api_key, http_client=http_client)
-
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "너는 상품명과 이미지를 기반으로 브랜드/카테고리/설명을 생성하는 전문가야."},
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": prompt},
-                        {"type": "image_url", "image_url": {"url": f"data:image/webp;base64,{image_base64}"}}
-                    ]
-                }
-            ],
-            max_tokens=500,
-            temperature=0.3
-        )
+        check_image(image_bytes)
+    except InvalidImageError:
+        return Response({"error": "이미지 파일이 아닙니다."}, status=400)
 
-        raw_text = response.choices[0].message.content.strip()
-        print("🔥 GPT 응답:", raw_text)
+    # --- 3. 같은 이미지 + 상품명으로 생성한 결과가 있으면 재사용 ---
+    cache_key = product_info_cache_key(image_bytes, product_name, BASIC)
+    if request.GET.get("refresh") != "true":
+        cached = get_cached_product_info(cache_key)
+        if cached is not None:
+            return JsonResponse(cached, safe=False)
 
-        if raw_text.startswith("```"):
-            raw_text = raw_text.strip("`").replace("json", "", 1).strip()
-
-        try:
-            data = json.loads(raw_text)
-        except json.JSONDecodeError:
-            return JsonResponse({"error": "AI 응답 JSON 파싱 실패", "raw_response": raw_text}, status=500)
+    # --- 4. GPT 호출 ---
+    try:
+        # 축소 + EXIF 제거 + WebP 재인코딩한 이미지를 전송 (요청 크기/비전 토큰 절감)
+        data = generate_product_info(product_name, to_vision_data_url(image_bytes))
+        store_product_info(cache_key, BASIC, data)
+        return JsonResponse(data, safe=False)
 
-        if data.get("category") not in ALLOWED_CATEGORIES:
-            data["category"] = "생활용품"
+    except InvalidImageError:
+        return JsonResponse({"error": "이미지 파일이 아닙니다."}, status=400)
 
-        return JsonResponse(data, safe=False)
+    except ProductInfoParseError as e:
+        return JsonResponse({"error": "AI 응답 JSON 파싱 실패", "raw_response": e.raw_response}, status=500)
 
     except Exception as e:
         import traceback
@@ -140,24 +113,43 @@ def generateProductInfoWithLangGraph(request):
     if not image_url:
         return Response({"error": "상품 이미지 URL이 필요합니다."}, status=400)
     
-    # 이미지 경로 변환
-    image_path = os.path.join(settings.MEDIA_ROOT, image_url.replace("/media/", ""))
-    
-    if not os.path.exists(image_path):
+    # 이미지 경로 변환 (MEDIA_ROOT 밖을 가리키면 거부)
+    image_path = media_image_path(image_url)
+    if image_path is None:
+        return Response({"error": "잘못된 이미지 경로입니다."}, status=400)
+    if not image_path.is_file():
         return Response({"error": "이미지를 찾을 수 없습니다."}, status=404)
+    image_path = str(image_path)
     
     try:
-        # LangGraph 기반 처리기 초기화
-        generator = get_langgraph_generator(settings.OPENAI_API_KEY)
-        
-        if generator is None:
-            return Response({"error": "LangGraph 생성기 초기화 실패"}, status=500)
-        
-        # 상품 정보 생성
-        result = generator.generate_product_info(product_name, image_path)
+        # 같은 이미지 + 상품명으로 생성한 결과가 있으면 재사용 (?refresh=true 이면 새로 생성)
+        with open(image_path, "rb") as f:
+            image_bytes = f.read()
+        try:
+            check_image(image_bytes)
+        except InvalidImageError:
+            return Response({"error": "이미지 파일이 아닙니다."}, status=400)
+        cache_key = product_info_cache_key(image_bytes, product_name, LANGGRAPH)
+        result = None
+        if request.GET.get("refresh") != "true":
+            result = get_cached_product_info(cache_key)
         
-        if "error" in result:
-            return Response(result, status=500)
+        if result is None:
+            # LangGraph 기반 처리기 (워커 단위로 한 번만 생성된 인스턴스 재사용)
+            generator = get_langgraph_generator(settings.OPENAI_API_KEY)
+            
+            if generator is None:
+                return Response({"error": "LangGraph 생성기 초기화 실패"}, status=500)
+            
+            # 상품 정보 생성
+            result = generator.generate_product_info(product_name, image_path)
+            
+            if "error" in result:
+                return Response(result, status=500)
+            
+            # 모든 노드가 성공한 결과만 저장
+            if not result.get("errors"):
+                store_product_info(cache_key, LANGGRAPH, result)
         
         # 기본 형식으로 응답 (기존 API와 호환)
         response_data = {
@@ -189,7 +181,10 @@ def checkLangGraphStatus(request):
     """LangGraph 상태 확인 API"""
     return Response({
         "langgraph_available": is_langgraph_available(),
-        "message": "LangGraph가 사용 가능합니다." if is_langgraph_available() else "LangGraph가 사용 불가능합니다."
+        "message": "LangGraph가 사용 가능합니다." if is_langgraph_available() else "LangGraph가 사용 불가능합니다.",
+        "setup": get_langgraph_setup_stats(),
+        "product_info_cache": get_product_info_cache_stats(),
+        "image_preprocess": get_image_preprocess_stats()
     })
 
 
@@ -1,12 +1,23 @@
-from rest_framework.decorators import api_view
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.decorators import api_view, renderer_classes
+from rest_framework.renderers import BaseRenderer, JSONRenderer
 from rest_framework.response import Response
 from rest_framework import status
 from langchain.chains import RetrievalQA
-from langchain_openai import ChatOpenAI
 from langchain.prompts import PromptTemplate
-from base.services.chatbot_service import get_vector_db, check_docs_folder
-from django.conf import settings
+from base.services.chatbot_service import (
+    get_vector_db, get_vector_db_status, get_chunk_ids, document_chunk_id, check_docs_folder, record_served, get_served_stats
+)
+from base.services.ai_clients import get_chat_model, get_ai_client_stats
+from base.services.embedding_cache_service import get_embedding_cache_stats
+from base.services.answer_cache_service import get_answer_cache, get_answer_cache_stats
+from base.services.retrieval_service import HybridRetriever, search_documents, embed_query_with_timeout, get_retriever_stats
+from base.services.faq_service import FAQ_PATH, match_faq, get_faq_stats
+import json
 import logging
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -29,14 +40,94 @@ CUSTOM_PROMPT = PromptTemplate(
     input_variables=["context", "question"]
 )
 
+# RetrievalQA 체인 캐시 (벡터DB가 다시 만들어질 때만 새로 생성)
+_qa_chain = None
+_qa_chain_vectordb = None
+_qa_chain_lock = threading.Lock()
+
+def get_qa_chain():
+    """문서 검색(BM25 + 벡터) + LLM 답변 체인 반환 (프로세스 단위로 재사용)"""
+    global _qa_chain, _qa_chain_vectordb
+
+    # 1. 벡터DB 가져오기 (문서 검색용)
+    vectordb = get_vector_db()
+
+    with _qa_chain_lock:
+        if _qa_chain is not None and _qa_chain_vectordb is vectordb:
+            return _qa_chain
+
+        # 2. Retriever 설정 (BM25 + 벡터 검색 상위 3개, 임베딩이 늦으면 BM25만 - CHATBOT_RETRIEVAL_MODE)
+        retriever = HybridRetriever(k=3)
+
+        # 3. LLM 설정 (공용 연결 풀을 쓰는 인스턴스)
+        llm = get_chat_model(
+            model="gpt-4o-mini",  # 가벼운 모델 사용
+            temperature=0.3,  # 낮게 설정 → 일관성 있는 답변
+        )
+
+        # 4. RetrievalQA 체인 생성 (retriever로 찾은 문서를 LLM에 넣어 답변 생성)
+        _qa_chain = RetrievalQA.from_chain_type(
+            llm=llm,
+            chain_type="stuff",  # 검색된 문서를 한꺼번에 넣음
+            retriever=retriever,
+            return_source_documents=True,  # 참조한 문서도 반환
+            chain_type_kwargs={
+                "prompt": CUSTOM_PROMPT, # 위에서 정의한 프롬프트 적용
+                "verbose": True  # 디버깅 로그 출력
+            }
+        )
+        _qa_chain_vectordb = vectordb
+        return _qa_chain
+
+def _use_cache(request):
+    """FAQ/답변 캐시 사용 여부 (CHATBOT_ALLOW_CACHE_BYPASS 가 켜져 있고 "cache": false 면 건너뜀)"""
+    return not (settings.CHATBOT_ALLOW_CACHE_BYPASS and request.data.get("cache") is False)
+
+def _lookup_answer_cache(question, use_cache=True):
+    """
+    질문 임베딩 + 답변 캐시 조회 → (임베딩 또는 None, (ChatAnswerCache, 유사도) 또는 None)
+    - 질문 임베딩은 임베딩 캐시를 거침
+    - 임베딩이 늦거나 실패하면 답변 캐시는 건너뛰고 BM25 검색으로 답변
+    - use_cache=False 면 임베딩만 받고 답변 캐시는 조회하지 않음
+    """
+    vectordb = get_vector_db()
+    question_embedding = embed_query_with_timeout(vectordb.embeddings, question)
+    if question_embedding is None or not use_cache:
+        return question_embedding, None
+    cached = get_answer_cache().lookup(question_embedding, get_chunk_ids())
+    if cached is not None:
+        entry, similarity = cached
+        logger.info(f"✅ 답변 캐시 사용 (유사도 {similarity:.3f}: {entry.question})")
+    return question_embedding, cached
+
+def _source_info(documents):
+    """참조 문서 → (응답용 출처 목록, 조각 해시 목록)"""
+    sources = []
+    chunk_ids = []
+    for doc in documents:
+        sources.append({
+            "source": doc.metadata.get("source", "Unknown"),
+            "content_preview": doc.page_content[:200] + "..."
+        })
+        chunk_ids.append(document_chunk_id(doc))
+    return sources, chunk_ids
+
+def _faq_sources(matched):
+    return [{"source": FAQ_PATH.name, "content_preview": matched.entry.answer[:200] + "..."}]
+
 @api_view(["POST"])
 def chatbot_query(request):
     """
     📌 상담 챗봇 API 엔드포인트
     - 사용자가 질문을 보내면 → 벡터DB 검색 → LLM 답변 → 결과 반환
+    - faq.md 질문과 거의 같으면 FAQ 답변을 그대로 반환 (임베딩/GPT 호출 없음)
+    - 이전에 답한 질문과 의미가 거의 같으면 저장된 답변 반환
+    - served_by: faq | answer_cache | llm (경로별 응답 시간은 chatbot/status/)
+    - "cache": false (CHATBOT_ALLOW_CACHE_BYPASS 일 때만) → FAQ/답변 캐시를 건너뛰고 저장도 하지 않음
     """
     try:
         question = request.data.get("question") # 요청에서 질문 추출
+        use_cache = _use_cache(request)
         
         if not question: # 질문이 없으면 400 에러 반환
             return Response(
@@ -45,54 +136,58 @@ def chatbot_query(request):
             )
         
         logger.info(f"📝 받은 질문: {question}")
+        started = time.perf_counter()
         
-        # 1. 벡터DB 가져오기 (문서 검색용)
-        vectordb = get_vector_db()
+        # 0. FAQ 질문이면 FAQ 답변 그대로 반환
+        matched = match_faq(question) if use_cache else None
+        if matched is not None:
+            logger.info(f"✅ FAQ 답변 사용 (유사도 {matched.score:.3f}: {matched.entry.question})")
+            record_served("faq", time.perf_counter() - started)
+            return Response({
+                "question": question,
+                "answer": matched.entry.answer,
+                "sources": _faq_sources(matched),
+                "served_by": "faq",
+                "matched_question": matched.entry.question,
+                "similarity": round(matched.score, 4)
+            })
         
-        # 2. Retriever 설정 (상위 3개 유사 문서 검색)
-        retriever = vectordb.as_retriever(
-            search_type="similarity",
-            search_kwargs={"k": 3}
-        )
+        # 1. 비슷한 질문에 대한 답변이 캐시에 있으면 바로 반환
+        question_embedding, cached = _lookup_answer_cache(question, use_cache)
+        if cached is not None:
+            entry, similarity = cached
+            record_served("answer_cache", time.perf_counter() - started)
+            return Response({
+                "question": question,
+                "answer": entry.answer,
+                "sources": entry.sources,
+                "served_by": "answer_cache",
+                "similarity": round(similarity, 4)
+            })
         
-        # 3. LLM 설정
-        llm = ChatOpenAI(
-            model="gpt-4o-mini",  # 가벼운 모델 사용
-            temperature=0.3,  # 낮게 설정 → 일관성 있는 답변
-            api_key=settings.OPENAI_API_KEY
-        )
-        
-        # 4. RetrievalQA 체인 생성 (retriever로 찾은 문서를 LLM에 넣어 답변 생성)
-        qa = RetrievalQA.from_chain_type(
-            llm=llm,
-            chain_type="stuff",  # 검색된 문서를 한꺼번에 넣음
-            retriever=retriever,
-            return_source_documents=True,  # 참조한 문서도 반환
-            chain_type_kwargs={
-                "prompt": CUSTOM_PROMPT, # 위에서 정의한 프롬프트 적용
-                "verbose": True  # 디버깅 로그 출력
-            }
-        )
+        # 2~4. 벡터DB 검색 + LLM 답변 체인 (요청마다 새로 만들지 않고 재사용)
+        qa = get_qa_chain()
         
         # 5. 실제 답변 생성
         result = qa({"query": question})
         
         # 6. 참조 문서 정보 정리 (어떤 문서를 근거로 답했는지)
-        sources = []
-        if "source_documents" in result:
-            for doc in result["source_documents"]:
-                sources.append({
-                    "source": doc.metadata.get("source", "Unknown"),
-                    "content_preview": doc.page_content[:200] + "..."
-                })
+        sources, chunk_ids = _source_info(result.get("source_documents", []))
         
+        answer = result.get("result", "답변을 생성할 수 없습니다")
         logger.info(f"✅ 답변 생성 완료")
         
-        # 7. 최종 응답 반환
+        # 7. 근거 문서가 있는 답변만 캐시에 저장
+        if use_cache and chunk_ids and question_embedding is not None:
+            get_answer_cache().store(question, question_embedding, answer, sources, chunk_ids)
+        
+        # 8. 최종 응답 반환
+        record_served("llm", time.perf_counter() - started)
         return Response({
             "question": question,
-            "answer": result.get("result", "답변을 생성할 수 없습니다"),
-            "sources": sources
+            "answer": answer,
+            "sources": sources,
+            "served_by": "llm"
         })
         
     except Exception as e:
@@ -102,6 +197,105 @@ def chatbot_query(request):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+class EventStreamRenderer(BaseRenderer):
+    """Accept: text/event-stream 요청을 받기 위한 렌더러 (스트림 전 오류 응답은 JSON 문자열)"""
+    media_type = "text/event-stream"
+    format = "sse"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+def _sse(event, data):
+    """SSE 이벤트 1개 (event: 이름, data: JSON 한 줄)"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@api_view(["POST"])
+@renderer_classes([JSONRenderer, EventStreamRenderer])
+def chatbot_stream(request):
+    """
+    📌 상담 챗봇 스트리밍 API (Server-Sent Events)
+    - 답변 전체를 기다리지 않도록 검색한 출처를 먼저 보내고, 답변은 생성되는 대로 조각(token)으로 전송
+    - 이벤트 순서: sources → token (여러 번) → done | error
+    - FAQ/답변 캐시로 답하는 질문은 token 1번으로 전체 답변 전송 (done.served_by: faq | answer_cache | llm)
+    - 응답 형식만 다르고 검색/캐시 동작은 chatbot/ 와 같음 ("cache": false 포함)
+    """
+    question = request.data.get("question") # 요청에서 질문 추출
+    use_cache = _use_cache(request)
+
+    if not question: # 질문이 없으면 400 에러 반환 (스트림 시작 전)
+        return Response(
+            {"error": "질문을 입력해주세요"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    logger.info(f"📝 받은 질문 (stream): {question}")
+
+    def events():
+        started = time.perf_counter()
+        try:
+            # 0. FAQ 질문 확인
+            matched = match_faq(question) if use_cache else None
+            if matched is not None:
+                yield _sse("sources", {"question": question, "sources": _faq_sources(matched)})
+                yield _sse("token", {"text": matched.entry.answer})
+                record_served("faq", time.perf_counter() - started)
+                yield _sse("done", {
+                    "served_by": "faq",
+                    "matched_question": matched.entry.question,
+                    "similarity": round(matched.score, 4),
+                    "seconds": round(time.perf_counter() - started, 3)
+                })
+                return
+
+            # 1. 답변 캐시 확인
+            question_embedding, cached = _lookup_answer_cache(question, use_cache)
+            if cached is not None:
+                entry, similarity = cached
+                yield _sse("sources", {"question": question, "sources": entry.sources})
+                yield _sse("token", {"text": entry.answer})
+                record_served("answer_cache", time.perf_counter() - started)
+                yield _sse("done", {
+                    "served_by": "answer_cache",
+                    "similarity": round(similarity, 4),
+                    "seconds": round(time.perf_counter() - started, 3)
+                })
+                return
+
+            # 2. 문서 검색 → 출처 먼저 전송 (질문 임베딩은 위에서 받은 것 재사용)
+            documents, retrieval_mode = search_documents(question, k=3, query_embedding=question_embedding)
+            sources, chunk_ids = _source_info(documents)
+            yield _sse("sources", {"question": question, "sources": sources, "retrieval": retrieval_mode})
+
+            # 3. RetrievalQA(stuff)와 같은 프롬프트로 답변을 스트리밍 생성
+            llm = get_chat_model(model="gpt-4o-mini", temperature=0.3)
+            prompt = CUSTOM_PROMPT.format(
+                context="\n\n".join(doc.page_content for doc in documents),
+                question=question
+            )
+            answer = []
+            for chunk in llm.stream(prompt):
+                if chunk.content:
+                    answer.append(chunk.content)
+                    yield _sse("token", {"text": chunk.content})
+            answer = "".join(answer)
+            logger.info(f"✅ 답변 생성 완료 (stream)")
+
+            # 4. 근거 문서가 있는 답변만 캐시에 저장
+            if use_cache and chunk_ids and question_embedding is not None:
+                get_answer_cache().store(question, question_embedding, answer, sources, chunk_ids)
+
+            record_served("llm", time.perf_counter() - started)
+            yield _sse("done", {"served_by": "llm", "seconds": round(time.perf_counter() - started, 3)})
+
+        except Exception as e:
+            logger.error(f"❌ 챗봇 에러 (stream): {e}")
+            yield _sse("error", {"error": f"처리 중 오류가 발생했습니다: {str(e)}"})
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream; charset=utf-8")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no" # nginx 프록시 버퍼링 끄기 (조각을 바로 전달)
+    return response
+
 @api_view(["GET"])
 def chatbot_status(request):
     """
@@ -109,36 +303,45 @@ def chatbot_status(request):
     - 벡터DB 상태, 문서 개수 등 확인
     """
     try:
-        from base.services.chatbot_service import DOCS_PATH, _is_initialized, _vectordb_instance
+        from base.services.chatbot_service import DOCS_PATH
         
         # 1. docs 폴더 확인
         folder_exists, md_files = check_docs_folder()
         
-        # 2. 벡터DB 상태 확인
+        # 2. 벡터DB 상태 확인 (워커가 연 인덱스 + 마지막 빌드 정보)
         try:
-            if _is_initialized and _vectordb_instance:
-                collection_count = _vectordb_instance._collection.count()
-                db_status = "정상 (메모리)"
+            vector_db = get_vector_db_status()
+            collection_count = vector_db["document_count"]
+            if vector_db["opened"]:
+                db_status = "정상 (디스크)"
+            elif vector_db["built"]:
+                db_status = "빌드됨 (첫 질문 시 열림)"
             else:
-                collection_count = 0
-                db_status = "초기화 필요"
-        except:
+                db_status = "빌드 필요 (build_vectordb)"
+        except Exception as e:
+            vector_db = {"error": str(e)}
             collection_count = 0
             db_status = "오류"
         
         # 3. 결과 반환
         return Response({
-            "status": "ok" if folder_exists and collection_count > 0 else "error",
+            "status": "ok" if folder_exists and (collection_count > 0 or vector_db.get("built")) else "error",
             "docs_folder": {
                 "exists": folder_exists,
                 "path": str(DOCS_PATH),
                 "md_files": [f.name for f in md_files] if folder_exists else []
             },
             "vector_db": {
+                **vector_db,
                 "status": db_status,
-                "document_count": collection_count,
-                "type": "memory-based"  # 메모리 기반임을 표시
-            }
+                "type": "persistent"  # 디스크 기반 (CHROMA_PERSIST_DIR)
+            },
+            "served_by": get_served_stats(),
+            "faq": get_faq_stats(),
+            "retriever": get_retriever_stats(),
+            "answer_cache": get_answer_cache_stats(),
+            "embedding_cache": get_embedding_cache_stats(),
+            "ai_clients": get_ai_client_stats()
         })
         
     except Exception as e:
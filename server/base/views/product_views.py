@@ -5,9 +5,12 @@ from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
 from base.models import Product, Order, OrderItem, ProductView
 from base.serializers import ProductSerializer, ProductViewSerializer
+from base.services.inventory_service import InventoryService
+from base.services.view_buffer_service import get_view_buffer
+from base.services.order_history_service import OrderHistoryService
+from rest_framework.exceptions import ValidationError
 from django.shortcuts import get_object_or_404
 from django.db.models import F
-from datetime import datetime
 from decimal import Decimal, InvalidOperation
 
 # 전체 상품 목록 조회
@@ -65,38 +68,16 @@ def purchaseProduct(request, pk):
     user = request.user
     product = get_object_or_404(Product, _id=pk)
 
-    if product.countInStock < 1:
-        return Response({'detail': '재고가 없습니다.'}, status=status.HTTP_400_BAD_REQUEST)
-
-    # 주문 생성
-    order = Order.objects.create(
-        user=user,
-        paymentMethod='Card', # 하드코딩된 결제 수단
-        taxPrice=0.0, # 세금 없음
-        shippingPrice=0.0, # 배송비 없음
-        totalPrice=product.price, # 총액은 상품 가격
-        isPaid=True,
-        paidAt=datetime.now()
-    )
-
     # OrderItem의 image 필드도 전체 URL로 저장되도록 수정하면 좋습니다.
     image_url = ''
     if product.image and hasattr(product.image, 'url'):
         image_url = request.build_absolute_uri(product.image.url)
 
-    # 주문 항목 생성
-    OrderItem.objects.create(
-        product=product,
-        order=order,
-        name=product.name,
-        qty=1,
-        price=product.price,
-        image=image_url # 상대 경로 대신 전체 URL 저장
-    )
-
-    # 재고 차감
-    product.countInStock -= 1
-    product.save()
+    # 재고 예약 + 주문 생성 (조건부 UPDATE로 재고 차감, 하나의 트랜잭션)
+    try:
+        InventoryService.purchase(user, product, qty=1, image_url=image_url)
+    except ValidationError as e:
+        return Response({'detail': e.detail[0]}, status=status.HTTP_400_BAD_REQUEST)
 
     return Response({'detail': '구매가 완료되었습니다.'}, status=status.HTTP_200_OK)
 
@@ -106,32 +87,24 @@ def purchaseProduct(request, pk):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def getMyOrders(request):
-    user = request.user
-    orders = Order.objects.filter(user=user).order_by('-createdAt') # 최신순
-    data = []
-
-    for order in orders:
-        items = OrderItem.objects.filter(order=order)
-        item_list = [
-            {
-                'name': item.name,
-                'qty': item.qty,
-                'price': item.price,
-                'image': item.image,
-                'category': item.product.category if item.product else None,
-            } for item in items
-        ]
-
-        data.append({
-            'orderId': order._id,
-            'createdAt': order.createdAt,
-            'totalPrice': order.totalPrice,
-            'isPaid': order.isPaid,
-            'paidAt': order.paidAt,
-            'items': item_list,
-        })
-
-    return Response(data)
+    # 주문/주문 항목/상품을 한 번에 조회 (주문 수와 관계없이 쿼리 2번)
+    # ?limit=N&cursor=... 를 주면 keyset 페이지네이션 결과 반환
+    limit = request.query_params.get('limit')
+    cursor = request.query_params.get('cursor')
+
+    history = OrderHistoryService(request.user)
+
+    if not limit and not cursor:
+        data, _ = history.get_orders() # 기존 응답 형식 유지 (전체 목록)
+        return Response(data)
+
+    try:
+        limit = max(1, min(int(limit or 20), 100))
+        data, next_cursor = history.get_orders(limit=limit, cursor=cursor)
+    except ValueError:
+        return Response({'detail': '잘못된 페이지 요청입니다.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({'results': data, 'next_cursor': next_cursor})
 
 # 상품 조회 기록 추가
 @api_view(['POST'])
@@ -142,19 +115,16 @@ def add_product_view(request):
         return Response({'detail': 'product_id 누락'}, status=status.HTTP_400_BAD_REQUEST)
 
     try:
-        product = Product.objects.get(_id=product_id)
-    except Product.DoesNotExist:
+        product_id = int(product_id)
+    except (TypeError, ValueError):
         return Response({'detail': '상품 없음'}, status=status.HTTP_404_NOT_FOUND)
 
-    pv, created = ProductView.objects.get_or_create(
-        user=request.user, 
-        product=product,
-        defaults={'view_count': 1} # 새로 생성될 때는 1로 시작
-    )
-    
-    if not created:
-        pv.view_count += 1 # 기존 레코드가 있으면 카운트 증가
-        pv.save(update_fields=['view_count'])
+    # 조회 기록은 버퍼에 모았다가 배치로 저장 (요청마다 get_or_create + save 하지 않음)
+    view_buffer = get_view_buffer()
+    if not view_buffer.product_exists(product_id):
+        return Response({'detail': '상품 없음'}, status=status.HTTP_404_NOT_FOUND)
+
+    view_buffer.record(request.user.id, product_id)
     
     return Response({'detail': 'ok'}, status=status.HTTP_201_CREATED)
 
@@ -164,6 +134,7 @@ def add_product_view(request):
 @permission_classes([IsAuthenticated])
 def get_product_views(request):
     user = request.user
+    get_view_buffer().flush() # 버퍼에 남은 조회 기록을 먼저 반영 (방금 본 상품도 보이도록)
     views = ProductView.objects.filter(user=user).order_by('-last_viewed')[:10]
     serializer = ProductViewSerializer(views, many=True, context={'request': request})
     return Response(serializer.data)
\ No newline at end of file
@@ -2,49 +2,32 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+from django.conf import settings
 import traceback
 
-from base.services.user_profile_service import UserProfileService
-from base.services.candidate_filter_service import CandidateFilterService
-from base.services.llm_service import LLMRecommendationService
+from base.models import Product
+from base.serializers import ProductSerializer
+
+from base.services.profile_cache_service import get_cached_profile, get_profile_cache_stats
+from base.services.recommendation_service import build_recommendations, get_precomputed
+from base.services.reason_cache_service import get_reason_cache
+from base.services.llm_service import get_late_reasons, get_llm_stats
+from base.services.item_similarity_service import get_similarity_index, SIMILAR, ALSO_BOUGHT
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_user_recommendations(request):
     """사용자 맞춤 상품 추천 API"""
     try:
-        # 1. 사용자 프로필 생성
-        profile_service = UserProfileService(request.user)
-        user_profile = profile_service.generate_profile()
-        
-        # 2. 후보 상품 필터링
-        filter_service = CandidateFilterService(request.user, user_profile)
-        candidate_products = filter_service.get_candidate_products(limit=20)
-        
-        if not candidate_products:
-            return Response({
-                'message': '추천할 상품이 없습니다. 더 많은 상품을 조회해보세요!',
-                'recommendations': []
-            })
-        
-        # 3. LLM으로 추천 이유 생성
-        llm_service = LLMRecommendationService(request=request)
-        recommendations = llm_service.generate_recommendations_with_reasons(
-            user_profile, candidate_products, num_recommendations=5
-        )
-        
-        return Response({
-            'message': '추천 상품을 성공적으로 생성했습니다.',
-            'user_profile': user_profile,
-            'recommendations': [
-                {
-                    'product': rec['product_data'],
-                    'reason': rec['reason'],
-                    'score': rec['score']
-                }
-                for rec in recommendations
-            ]
-        })
+        # 1. 야간 배치로 미리 계산된 결과가 있으면 바로 반환
+        precomputed = get_precomputed(request.user, request=request)
+        if precomputed is not None:
+            return Response({**precomputed, 'source': 'precomputed'})
+
+        # 2. 없으면 실시간 계산 (프로필 → 후보 필터링 → LLM 추천 이유)
+        # - GPT가 RECOMMENDATION_LLM_TIMEOUT 안에 응답하지 않으면 기본 추천 + reasons_token 반환
+        data = build_recommendations(request.user, request=request, llm_timeout=settings.RECOMMENDATION_LLM_TIMEOUT)
+        return Response({**data, 'source': 'live'})
         
     except Exception as e:
         print("🔥🔥🔥 추천 생성 중 심각한 에러 발생! 🔥🔥🔥")
@@ -58,12 +41,70 @@ def get_user_recommendations(request):
 def get_user_profile(request):
     """사용자 프로필 조회 API (디버깅용)"""
     try:
-        profile_service = UserProfileService(request.user)
-        user_profile = profile_service.generate_profile()
+        refresh = request.GET.get("refresh") == "true" # ?refresh=true 이면 캐시 무시
+        user_profile = get_cached_profile(request.user, refresh=refresh)
         
         return Response(user_profile)
         
     except Exception as e:
         return Response({
             'error': f'프로필 생성 중 오류가 발생했습니다: {str(e)}'
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_recommendation_status(request):
+    """추천 시스템 캐시 상태 확인 API"""
+    return Response({
+        'profile_cache': get_profile_cache_stats(),
+        'reason_cache': get_reason_cache().get_stats(),
+        'llm': get_llm_stats(),
+    })
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_recommendation_reasons(request, token):
+    """마감 시간 이후 도착한 GPT 추천 결과 조회 API (reasons_token으로 폴링)"""
+    result = get_late_reasons(token)
+    if result is None:
+        return Response({'status': 'pending'}, status=status.HTTP_202_ACCEPTED)
+    if result['status'] == 'failed':
+        # GPT 호출 실패 → 폴링 종료 (처음 받은 기본 추천을 그대로 사용)
+        return Response({'status': 'failed', 'detail': '추천 이유를 생성하지 못했습니다.'})
+
+    return Response(result)
+
+
+def _neighbor_products_response(request, pk, kind):
+    """유사도 행렬에서 상위 k개 상품 조회 후 직렬화"""
+    try:
+        product_id = int(pk)
+        k = max(1, min(int(request.GET.get('k', 10)), 50))
+    except ValueError:
+        return Response({'detail': '잘못된 요청입니다.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    neighbors = get_similarity_index(kind).neighbors(product_id, k=k)
+    neighbor_ids = [neighbor_id for neighbor_id, _ in neighbors]
+    products = Product.objects.in_bulk(neighbor_ids)
+
+    return Response({
+        'product_id': product_id,
+        'results': [
+            {
+                'product': ProductSerializer(products[neighbor_id], context={'request': request}).data,
+                'score': round(score, 4),
+            }
+            for neighbor_id, score in neighbors
+            if neighbor_id in products
+        ]
+    })
+
+@api_view(['GET'])
+def get_similar_products(request, pk):
+    """비슷한 상품 API (함께 조회/구매된 상품)"""
+    return _neighbor_products_response(request, pk, SIMILAR)
+
+@api_view(['GET'])
+def get_also_bought_products(request, pk):
+    """이 상품을 구매한 고객이 함께 구매한 상품 API"""
+    return _neighbor_products_response(request, pk, ALSO_BOUGHT)
@@ -3,6 +3,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from base.services.review_service import ReviewService
+from base.services.profile_cache_service import invalidate_user_profile
 from base.models import Product, Review
 from base.serializers import ReviewSerializer
 from rest_framework.pagination import PageNumberPagination
@@ -98,6 +99,7 @@ def updateProductReview(request, pk, review_id):
             review.comment = comment
         
         review.save()
+        invalidate_user_profile(user.id) # 평균 평점이 바뀌므로 프로필 캐시 삭제
 
         # 상품 평점 재계산
         try:
@@ -149,6 +151,7 @@ def deleteProductReview(request, pk, review_id):
 
         # 리뷰 삭제
         review.delete()
+        invalidate_user_profile(user.id) # 평균 평점이 바뀌므로 프로필 캐시 삭제
 
         # 상품 평점 재계산
         try:
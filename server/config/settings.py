@@ -20,6 +20,12 @@ ALLOWED_HOSTS = ["*", "localhost", "127.0.0.1", "backend"]
 # OpenAI API (필요시)
 OPENAI_API_KEY = config("OPENAI_API_KEY", default="")
 os.environ["OPENAI_API_KEY"] = OPENAI_API_KEY
+OPENAI_BASE_URL = config("OPENAI_BASE_URL", default="")  # 비우면 api.openai.com (로컬 스텁 서버 테스트 시 http://127.0.0.1:8001/v1)
+
+# AI 서비스 공용 HTTP 연결 풀 (워커 프로세스 단위)
+AI_HTTP_MAX_CONNECTIONS = config("AI_HTTP_MAX_CONNECTIONS", default=20, cast=int)
+AI_HTTP_KEEPALIVE_EXPIRY = config("AI_HTTP_KEEPALIVE_EXPIRY", default=30.0, cast=float)  # 유휴 연결 유지 시간(초)
+AI_HTTP_TIMEOUT = config("AI_HTTP_TIMEOUT", default=60.0, cast=float)  # 요청 타임아웃(초)
 
 # JWT 설정
 SIMPLE_JWT = {
@@ -94,6 +100,8 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # 쓰기 잠금 대기 시간(초) - 작업 큐/일괄 생성 스레드가 동시에 쓸 때 "database is locked" 방지 (기본 5초)
+        'OPTIONS': {'timeout': 20},
     }
 }
 
@@ -132,5 +140,104 @@ APPEND_SLASH = False
 USE_X_FORWARDED_HOST = True
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'http')
 
+# 상품 조회 기록 버퍼 (주기 flush 간격(초) / 즉시 flush 임계 개수)
+PRODUCT_VIEW_FLUSH_INTERVAL = config("PRODUCT_VIEW_FLUSH_INTERVAL", default=5.0, cast=float)
+PRODUCT_VIEW_FLUSH_SIZE = config("PRODUCT_VIEW_FLUSH_SIZE", default=500, cast=int)
+
 # 프론트엔드에서 API 호출할 때 참조할 기본 도메인
-DEFAULT_DOMAIN = "http://localhost:8000"
\ No newline at end of file
+DEFAULT_DOMAIN = "http://localhost:8000"
+
+# 캐시 설정
+# - default: 프로세스 메모리 캐시
+# - profiles: 사용자 프로필 캐시 (PROFILE_CACHE_BACKEND = locmem | file | redis)
+#   redis는 로컬 Redis 호환 서버(redis-server, valkey 등)를 가리키도록 PROFILE_CACHE_REDIS_URL 설정 (redis 패키지 필요)
+#   ⚠️ 기본값 locmem 은 워커 프로세스마다 따로 있는 캐시라서, 한 워커에서 지운 프로필(invalidate)이 다른 gunicorn 워커에는
+#   남아 있고 (최대 PROFILE_CACHE_MAX_STALENESS 초), 마감 후 도착한 추천 이유(reasons_token)도 같은 워커에서만 조회된다.
+#   워커가 2개 이상이면 file 또는 redis 를 사용
+PROFILE_CACHE_BACKEND = config("PROFILE_CACHE_BACKEND", default="locmem")
+PROFILE_CACHE_MAX_STALENESS = config("PROFILE_CACHE_MAX_STALENESS", default=600, cast=int)  # 프로필 최대 허용 나이(초)
+
+_PROFILE_CACHE_BACKENDS = {
+    "locmem": {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'user-profiles',
+    },
+    "file": {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': str(BASE_DIR / 'var' / 'profile_cache'),
+    },
+    "redis": {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': config("PROFILE_CACHE_REDIS_URL", default="redis://127.0.0.1:6379/1"),
+    },
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'profiles': {
+        **_PROFILE_CACHE_BACKENDS[PROFILE_CACHE_BACKEND],
+        'TIMEOUT': PROFILE_CACHE_MAX_STALENESS,
+    },
+}
+
+# 상품 피처 스토어 (추천 후보를 메모리 스냅샷에서 필터링)
+PRODUCT_FEATURE_STORE_ENABLED = config("PRODUCT_FEATURE_STORE_ENABLED", default=True, cast=bool)
+PRODUCT_FEATURE_STORE_TTL = config("PRODUCT_FEATURE_STORE_TTL", default=300, cast=int)  # 전체 재생성 주기(초)
+
+# 함께 본/구매한 상품(co-occurrence) 후보 개수 (추천 후보 20개 중)
+CO_OCCURRENCE_CANDIDATES = config("CO_OCCURRENCE_CANDIDATES", default=5, cast=int)
+
+# 야간 배치로 미리 계산한 추천 결과 유효 시간(초) (precompute_recommendations 명령)
+RECOMMENDATION_PRECOMPUTE_TTL = config("RECOMMENDATION_PRECOMPUTE_TTL", default=60 * 60 * 24, cast=int)
+
+# LLM 추천 이유 캐시 (프로필 지문 + 후보 상품이 같으면 GPT 재호출 생략)
+RECOMMENDATION_REASON_CACHE_SIZE = config("RECOMMENDATION_REASON_CACHE_SIZE", default=1000, cast=int)  # 최대 항목 수 (LRU)
+RECOMMENDATION_REASON_CACHE_TTL = config("RECOMMENDATION_REASON_CACHE_TTL", default=60 * 60, cast=int)  # 유효 시간(초)
+
+# 추천 API의 GPT 응답 대기 한도(초) - 넘기면 휴리스틱 추천으로 즉시 응답하고
+# GPT 결과는 recommendations/reasons/<token>/ 으로 나중에 조회
+RECOMMENDATION_LLM_TIMEOUT = config("RECOMMENDATION_LLM_TIMEOUT", default=2.5, cast=float)
+RECOMMENDATION_LLM_WORKERS = config("RECOMMENDATION_LLM_WORKERS", default=4, cast=int)  # 워커당 GPT 호출 스레드 수
+
+# AI 상품 정보 생성 결과 캐시 최대 항목 수 (넘으면 오래 사용하지 않은 것부터 삭제)
+PRODUCT_INFO_CACHE_MAX_ENTRIES = config("PRODUCT_INFO_CACHE_MAX_ENTRIES", default=5000, cast=int)
+
+# 비전 모델 호출 전 이미지 전처리 (긴 변 축소 + EXIF 제거 + 재인코딩)
+VISION_IMAGE_MAX_SIDE = config("VISION_IMAGE_MAX_SIDE", default=1024, cast=int)  # 긴 변 최대 픽셀
+VISION_IMAGE_FORMAT = config("VISION_IMAGE_FORMAT", default="webp")  # webp | jpeg
+VISION_IMAGE_QUALITY = config("VISION_IMAGE_QUALITY", default=80, cast=int)
+VISION_IMAGE_CACHE_MAX_BYTES = config("VISION_IMAGE_CACHE_MAX_BYTES", default=512 * 1024 * 1024, cast=int)  # var/vision_images 최대 크기
+VISION_IMAGE_CACHE_MAX_AGE = config("VISION_IMAGE_CACHE_MAX_AGE", default=60 * 60 * 24 * 30, cast=int)  # 이 기간(초) 동안 사용하지 않은 파일 삭제
+
+# AI 상품 정보 생성 작업 큐 (ai/jobs/)
+AI_JOB_WORKERS = config("AI_JOB_WORKERS", default=4, cast=int)  # 워커 프로세스당 작업 실행 스레드 수
+AI_JOB_MAX_ACTIVE_PER_USER = config("AI_JOB_MAX_ACTIVE_PER_USER", default=3, cast=int)  # 사용자당 대기+실행 중 작업 수 (넘으면 429)
+AI_JOB_MAX_QUEUED = config("AI_JOB_MAX_QUEUED", default=100, cast=int)  # 전체 대기+실행 중 작업 수 (넘으면 503)
+AI_JOB_MAX_ATTEMPTS = config("AI_JOB_MAX_ATTEMPTS", default=3, cast=int)
+AI_JOB_RETRY_BACKOFF = config("AI_JOB_RETRY_BACKOFF", default=2.0, cast=float)  # 첫 재시도 대기(초), 이후 2배씩
+AI_JOB_STALE_SECONDS = config("AI_JOB_STALE_SECONDS", default=600, cast=int)  # 이보다 오래 실행 중이면 중단된 작업으로 간주
+AI_JOB_SWEEP_INTERVAL = config("AI_JOB_SWEEP_INTERVAL", default=60, cast=int)  # 워커마다 멈춘 작업을 다시 등록하는 주기(초), 0이면 사용 안 함
+
+# 상담 챗봇 벡터DB 저장 위치 (build_vectordb 명령으로 빌드, 워커는 읽기만 함)
+CHROMA_PERSIST_DIR = config("CHROMA_PERSIST_DIR", default=str(BASE_DIR / "chroma_db"))
+
+# 임베딩 캐시 ((모델, 텍스트 해시) → 벡터, 워커 간 공유 SQLite 파일)
+EMBEDDING_CACHE_PATH = config("EMBEDDING_CACHE_PATH", default=str(BASE_DIR / "var" / "embedding_cache.sqlite3"))
+EMBEDDING_CACHE_MAX_ENTRIES = config("EMBEDDING_CACHE_MAX_ENTRIES", default=100000, cast=int)
+
+# 상담 챗봇 답변 캐시 (질문 임베딩 코사인 유사도가 기준 이상이면 저장된 답변 사용)
+CHATBOT_ANSWER_CACHE_THRESHOLD = config("CHATBOT_ANSWER_CACHE_THRESHOLD", default=0.95, cast=float)
+CHATBOT_ANSWER_CACHE_TTL = config("CHATBOT_ANSWER_CACHE_TTL", default=60 * 60 * 24 * 7, cast=int)  # 유효 시간(초)
+CHATBOT_ANSWER_CACHE_MAX_ENTRIES = config("CHATBOT_ANSWER_CACHE_MAX_ENTRIES", default=2000, cast=int)
+
+# 상담 챗봇 문서 검색 방식 (hybrid: BM25 + 벡터 RRF | vector | bm25)
+CHATBOT_RETRIEVAL_MODE = config("CHATBOT_RETRIEVAL_MODE", default="hybrid")
+CHATBOT_EMBEDDING_TIMEOUT = config("CHATBOT_EMBEDDING_TIMEOUT", default=1.5, cast=float)  # 질문 임베딩 대기(초), 넘으면 BM25만 사용
+
+# 상담 챗봇 FAQ 바로 답변 (docs/faq.md 질문과 유사도가 기준 이상이면 GPT 호출 없이 FAQ 본문 반환)
+CHATBOT_FAQ_MATCH_THRESHOLD = config("CHATBOT_FAQ_MATCH_THRESHOLD", default=0.85, cast=float)
+
+# True 이면 요청 본문에 "cache": false 를 보낸 질문은 FAQ/답변 캐시를 건너뛰고 GPT로 답변 (bench_chatbot_stream 측정용, 운영에서는 끔)
+CHATBOT_ALLOW_CACHE_BYPASS = config("CHATBOT_ALLOW_CACHE_BYPASS", default=False, cast=bool)
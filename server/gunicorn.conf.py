@@ -0,0 +1,33 @@
+# gunicorn 설정 (server 폴더에서 실행하면 자동으로 읽힘)
+# - 워커가 뜰 때 AI 클라이언트와 LangGraph 워크플로우를 미리 만들고 챗봇 벡터DB(디스크 인덱스)와 FAQ 색인을 열어서
+#   첫 요청이 준비 비용을 내지 않도록 한다.
+# - 연결 풀/이벤트 루프 스레드는 fork 이후(워커 안에서) 만들어야 하므로 post_worker_init 에서 실행한다.
+# - 이전 워커가 끝내지 못한 AI 생성 작업도 이때 다시 등록하고, 이후에도 주기적으로 점검하는 스레드를 시작한다
+#   (같은 작업은 한 워커만 실행).
+
+
+def post_worker_init(worker):
+    from django.conf import settings
+    from base.services.ai_clients import get_openai_client
+
+    try:
+        get_openai_client()
+        from base.services.langgraph_service import warm_up_langgraph
+        if warm_up_langgraph(settings.OPENAI_API_KEY):
+            worker.log.info("✅ LangGraph 워크플로우 워밍업 완료")
+        from base.services.chatbot_service import warm_up_vector_db
+        if warm_up_vector_db():
+            worker.log.info("✅ 챗봇 벡터DB 열기 완료")
+        from base.services.faq_service import get_faq_index
+        get_faq_index()
+    except Exception as e:
+        worker.log.warning(f"⚠️ AI 워밍업 실패 (첫 요청에서 다시 생성): {e}")
+
+    try:
+        from base.services.ai_job_service import recover_ai_jobs, start_ai_job_sweeper
+        requeued, _ = recover_ai_jobs()
+        if requeued:
+            worker.log.info(f"✅ 대기 중인 AI 생성 작업 {requeued}개 재등록")
+        start_ai_job_sweeper()
+    except Exception as e:
+        worker.log.warning(f"⚠️ AI 생성 작업 복구 실패: {e}")